@@ -1,134 +1,1051 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3
-from typing import List, Tuple, Optional
-import os
+from tkinter import ttk, messagebox, filedialog
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from bisect import bisect_left
+from typing import List, Tuple, Optional, Dict, Any, Callable, Union
 
-class Banco:
-    def __init__(self, arquivo_db="notas_alunos.db"):
-        # VERIFICAR BANCO
-        self.arquivo_db = arquivo_db
-        self.conexao = sqlite3.connect(self.arquivo_db)
-        self.cursor = self.conexao.cursor()
-        self.criar_tabelas()
-    
-    def criar_tabelas(self):
-        # TABELA DE ALUNOS
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS alunos (
-            matricula TEXT PRIMARY KEY,
-            nome TEXT NOT NULL
-        )
-        ''')
-        
-        # TABELA DE NOTAS
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS notas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            disciplina TEXT NOT NULL,
-            valor REAL NOT NULL,
-            aluno_matricula TEXT NOT NULL,
-            FOREIGN KEY (aluno_matricula) REFERENCES alunos (matricula),
-            UNIQUE(disciplina, aluno_matricula)
-        )
-        ''')
-        
-        self.conexao.commit()
+from banco import (
+    Banco, Evento, ResultadoImportacao, ler_registros, escrever_boletins,
+    ALUNO_INSERIDO, ALUNO_EXCLUIDO, NOTA_INSERIDA, NOTA_EXCLUIDA, NOTA_ALTERADA,
+    ALUNOS_RECARREGADOS, NOTAS_RECARREGADAS, LIMITE_GRADE,
+)
+
+# INTERVALO (ms) COM QUE A TELA BUSCA RESPOSTAS DA THREAD DO BANCO
+INTERVALO_DESPACHO = 30
+# TEMPO (ms) DE ESPERA ANTES DE MOSTRAR O INDICADOR DE OCUPADO
+ATRASO_INDICADOR = 250
+# MÁXIMO DE SUGESTÕES NA LISTA DO AUTOCOMPLETAR DE DISCIPLINAS
+LIMITE_SUGESTOES = 30
+# BUSCA DE ALUNOS ENQUANTO DIGITA: ESPERA (ms) DEPOIS DA ÚLTIMA TECLA E QUANTIDADE DE RESULTADOS
+ESPERA_BUSCA = 150
+LIMITE_BUSCA = 15
+# JANELA DE DIAGNÓSTICO: INTERVALO (ms) ENTRE ATUALIZAÇÕES E ARQUIVO DO REGISTRO DE CONSULTAS LENTAS
+INTERVALO_DIAGNOSTICO = 1000
+# INTERVALO (ms) ENTRE ATUALIZAÇÕES DA JANELA DE PROGRESSO DOS BOLETINS
+INTERVALO_PROGRESSO = 100
+ARQUIVO_CONSULTAS_LENTAS = "consultas_lentas.log"
+# MÁXIMO DE ALUNOS LISTADOS (E EXCLUÍDOS DE UMA VEZ) NA EXCLUSÃO PELA BUSCA
+LIMITE_EXCLUSAO = 10000
+
+
+class _Pedido:
+    __slots__ = ("operacao", "args", "kwargs", "future", "chave", "geracao",
+                 "ao_concluir", "ao_erro", "descricao")
     
-    def cadastrar_aluno(self, matricula: str, nome: str) -> bool:
-        try:
-            self.cursor.execute("INSERT INTO alunos VALUES (?, ?)", (matricula, nome))
-            self.conexao.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # TESTA CHAVE DUPLICADA
-            return False
-        except Exception as e:
-            print(f"Erro ao cadastrar aluno: {e}")
-            return False
+    def __init__(self, operacao, args, kwargs, chave, geracao, ao_concluir, ao_erro, descricao):
+        self.operacao = operacao
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.chave = chave
+        self.geracao = geracao
+        self.ao_concluir = ao_concluir
+        self.ao_erro = ao_erro
+        self.descricao = descricao
+
+
+class BancoAssincrono:
+    # FACHADA DO Banco: UMA THREAD DEDICADA É DONA DA CONEXÃO E EXECUTA OS PEDIDOS EM ORDEM.
+    # AS RESPOSTAS E OS EVENTOS SÓ CHEGAM À TELA QUANDO ELA CHAMA despachar() NA THREAD DO TK.
+    def __init__(self, fabrica: Callable[[], Banco] = Banco):
+        self.pedidos: "queue.Queue[Optional[_Pedido]]" = queue.Queue()
+        self.respostas: "queue.Queue[Union[_Pedido, Evento]]" = queue.Queue()
+        self.ouvintes: List[Callable[[Evento], None]] = []
+        
+        # ESTADO ABAIXO SÓ É MEXIDO PELA THREAD DA TELA
+        self.geracoes: Dict[str, int] = {}
+        self.aguardando: Dict[str, _Pedido] = {}
+        self.em_andamento: List[_Pedido] = []
+        
+        self.thread = threading.Thread(target=self._executar, args=(fabrica,), name="banco", daemon=True)
+        self.thread.start()
     
-    def cadastrar_nota(self, disciplina: str, valor: float, aluno_matricula: str) -> bool:
-        try:
-            self.cursor.execute(
-                "INSERT INTO notas (disciplina, valor, aluno_matricula) VALUES (?, ?, ?)",
-                (disciplina, valor, aluno_matricula)
-            )
-            self.conexao.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # ERRO CHAVE DUPLICADA (ALUNO JÁ TEM ESSA DISCIPLINA)
-            return False
-        except Exception as e:
-            print(f"Erro ao cadastrar nota: {e}")
-            return False
+    def inscrever(self, ouvinte: Callable[[Evento], None]):
+        # OUVINTES SÃO CHAMADOS NA THREAD DA TELA, DENTRO DE despachar()
+        self.ouvintes.append(ouvinte)
     
-    def excluir_aluno(self, matricula: str) -> bool:
-        try:
-            # EXCLUINDO DISCIPLINAS
-            self.cursor.execute("DELETE FROM notas WHERE aluno_matricula = ?", (matricula,))
+    def chamar(self, operacao: Union[str, Callable[..., Any]], *args,
+               ao_concluir: Optional[Callable[[Any], None]] = None,
+               ao_erro: Optional[Callable[[Exception], None]] = None,
+               chave: Optional[str] = None,
+               descricao: Optional[str] = None, **kwargs) -> Future:
+        # operacao É O NOME DE UM MÉTODO DO Banco OU UMA FUNÇÃO QUE RECEBE O Banco.
+        # PEDIDOS COM A MESMA chave SE SUBSTITUEM: O QUE AINDA NÃO COMEÇOU É CANCELADO
+        # E SÓ A RESPOSTA DO MAIS RECENTE É ENTREGUE.
+        geracao = 0
+        if chave is not None:
+            geracao = self.geracoes.get(chave, 0) + 1
+            self.geracoes[chave] = geracao
+            anterior = self.aguardando.pop(chave, None)
+            if anterior is not None and anterior.future.cancel():
+                self.em_andamento.remove(anterior)
+        
+        pedido = _Pedido(operacao, args, kwargs, chave, geracao, ao_concluir, ao_erro, descricao)
+        if chave is not None:
+            self.aguardando[chave] = pedido
+        self.em_andamento.append(pedido)
+        self.pedidos.put(pedido)
+        return pedido.future
+    
+    def despachar(self):
+        # ENTREGA RESPOSTAS E EVENTOS PRONTOS; CHAMAR PERIODICAMENTE NA THREAD DA TELA
+        while True:
+            try:
+                item = self.respostas.get_nowait()
+            except queue.Empty:
+                return
             
-            # EXCLUINDO ALUNO
-            self.cursor.execute("DELETE FROM alunos WHERE matricula = ?", (matricula,))
+            if isinstance(item, Evento):
+                for ouvinte in self.ouvintes:
+                    try:
+                        ouvinte(item)
+                    except Exception as e:
+                        print(f"Erro ao tratar evento {item.tipo}: {e}")
+                continue
             
-            self.conexao.commit()
-            return True
-        except Exception as e:
-            print(f"Erro ao excluir aluno: {e}")
-            return False
+            self.em_andamento.remove(item)
+            if item.chave is not None:
+                if self.aguardando.get(item.chave) is item:
+                    del self.aguardando[item.chave]
+                if self.geracoes.get(item.chave) != item.geracao:
+                    # RESPOSTA DE UM PEDIDO JÁ SUBSTITUÍDO: NÃO VALE MAIS PARA A TELA
+                    continue
+            
+            erro = item.future.exception()
+            try:
+                if erro is not None:
+                    if item.ao_erro:
+                        item.ao_erro(erro)
+                    else:
+                        print(f"Erro no banco: {erro}")
+                elif item.ao_concluir:
+                    item.ao_concluir(item.future.result())
+            except Exception as e:
+                print(f"Erro ao aplicar resposta do banco: {e}")
     
-    def excluir_nota(self, disciplina: str, aluno_matricula: str) -> bool:
-        try:
-            self.cursor.execute(
-                "DELETE FROM notas WHERE disciplina = ? AND aluno_matricula = ?", 
-                (disciplina, aluno_matricula)
-            )
-            self.conexao.commit()
-            return True
-        except Exception as e:
-            print(f"Erro ao excluir nota: {e}")
-            return False
+    def ocupado(self) -> bool:
+        return bool(self.em_andamento)
+    
+    def aguardar(self, limite: Optional[float] = None) -> bool:
+        # BLOQUEIA ATÉ TODOS OS PEDIDOS SEREM RESPONDIDOS E DESPACHADOS (USO SEM MAINLOOP)
+        fim = None if limite is None else time.monotonic() + limite
+        while True:
+            self.despachar()
+            if not self.em_andamento:
+                return True
+            if fim is not None and time.monotonic() >= fim:
+                return False
+            time.sleep(0.001)
+    
+    def descricao_atual(self) -> Optional[str]:
+        # DESCRIÇÃO DA OPERAÇÃO LONGA MAIS ANTIGA AINDA EM ANDAMENTO
+        for pedido in self.em_andamento:
+            if pedido.descricao:
+                return pedido.descricao
+        return None
     
-    def buscar_aluno(self, matricula: str) -> Optional[Tuple[str, str]]:
+    def fechar(self, espera: float = 5.0):
+        self.pedidos.put(None)
+        self.thread.join(espera)
+    
+    def _executar(self, fabrica: Callable[[], Banco]):
         try:
-            self.cursor.execute("SELECT matricula, nome FROM alunos WHERE matricula = ?", (matricula,))
-            return self.cursor.fetchone()
+            banco = fabrica()
+            banco.inscrever(self.respostas.put)
+            erro_abertura = None
         except Exception as e:
-            print(f"Erro ao buscar aluno: {e}")
+            # SEM BANCO, TODO PEDIDO VOLTA COM O ERRO DE ABERTURA EM VEZ DE FICAR ESPERANDO
+            banco = None
+            erro_abertura = e
+        
+        try:
+            while True:
+                pedido = self.pedidos.get()
+                if pedido is None:
+                    return
+                if not pedido.future.set_running_or_notify_cancel():
+                    continue
+                
+                try:
+                    if erro_abertura is not None:
+                        raise erro_abertura
+                    if isinstance(pedido.operacao, str):
+                        resultado = getattr(banco, pedido.operacao)(*pedido.args, **pedido.kwargs)
+                    else:
+                        resultado = pedido.operacao(banco, *pedido.args, **pedido.kwargs)
+                    pedido.future.set_result(resultado)
+                except Exception as e:
+                    pedido.future.set_exception(e)
+                self.respostas.put(pedido)
+        finally:
+            if banco is not None:
+                banco.fechar()
+
+
+def _buscar_janela_alunos(banco: Banco, atual: List[Tuple[str, str]], inicio: int,
+                          posicao: int, altura: int) -> List[Tuple[str, str]]:
+    # RODA NA THREAD DO BANCO: MONTA A JANELA A PARTIR DA JANELA ATUAL (atual COMEÇA EM inicio)
+    delta = posicao - inicio
+    
+    if atual and 0 <= delta <= len(atual):
+        # ROLAGEM PARA BAIXO OU REDIMENSIONAMENTO: REAPROVEITA O QUE JÁ ESTÁ CARREGADO
+        janela = atual[delta:delta + altura]
+        ultimo = janela[-1] if janela else atual[-1]
+    elif atual and 0 < -delta < altura:
+        # ROLAGEM PARA CIMA
+        matricula, nome = atual[0]
+        anteriores = banco.listar_alunos_pagina(antes=(nome, matricula), limite=-delta)
+        janela = (anteriores + atual)[:altura]
+        ultimo = janela[-1]
+    else:
+        # SALTO (BARRA DE ROLAGEM OU RECARGA)
+        anterior = banco.chave_aluno_posicao(posicao - 1) if posicao > 0 else None
+        return banco.listar_alunos_pagina(apos=anterior, limite=altura)
+    
+    # COMPLETA O FINAL DA JANELA QUANDO ELA CRESCEU
+    faltam = altura - len(janela)
+    if faltam > 0:
+        matricula, nome = ultimo
+        janela += banco.listar_alunos_pagina(apos=(nome, matricula), limite=faltam)
+    return janela
+
+
+class TabelaVirtual:
+    # MANTÉM NO TREEVIEW SÓ AS LINHAS DA JANELA VISÍVEL E BUSCA NO BANCO CONFORME A ROLAGEM
+    def __init__(self, tabela: ttk.Treeview, scrollbar: ttk.Scrollbar, banco: BancoAssincrono):
+        self.tabela = tabela
+        self.scrollbar = scrollbar
+        self.banco = banco
+        
+        self.total = 0
+        self.inicio = 0
+        self.linhas: List[Tuple[str, str]] = []
+        self.altura = int(str(tabela.cget("height")))
+        
+        # POSIÇÃO PEDIDA AO BANCO E AINDA NÃO APLICADA (ROLAGENS RÁPIDAS SE JUNTAM NUM PEDIDO SÓ)
+        self.destino: Optional[int] = None
+        self.chave_pedido = f"janela{tabela}"
+        # depois DE CADA PEDIDO, CHAMADOS QUANDO A PRÓXIMA JANELA FOR APLICADA: UM PEDIDO JUNTADO
+        # COM OUTRO (MESMA chave) NÃO PERDE O SEU
+        self.esperando: List[Callable[[], None]] = []
+        
+        # A BARRA DE ROLAGEM PASSA A CONTROLAR A POSIÇÃO NO BANCO, NÃO NO TREEVIEW
+        self.scrollbar.configure(command=self.rolar)
+        self.tabela.configure(yscrollcommand="")
+        
+        for sequencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tabela.bind(sequencia, self._roda_mouse)
+        self.tabela.bind("<Up>", lambda e: self._tecla(-1))
+        self.tabela.bind("<Down>", lambda e: self._tecla(1))
+        self.tabela.bind("<Prior>", lambda e: self._pagina(-1))
+        self.tabela.bind("<Next>", lambda e: self._pagina(1))
+        self.tabela.bind("<Configure>", self._redimensionar, add="+")
+    
+    def recarregar(self, depois: Optional[Callable[[], None]] = None):
+        self.linhas = []
+        self.mostrar(self.inicio, forcar=True, recontar=True, depois=depois)
+    
+    def mostrar(self, posicao: int, forcar: bool = False, recontar: bool = False,
+                depois: Optional[Callable[[], None]] = None):
+        if not recontar:
+            maximo = max(0, self.total - self.altura)
+            posicao = max(0, min(posicao, maximo))
+            atual = self.inicio if self.destino is None else self.destino
+            if posicao == atual and self.linhas and not forcar:
+                return
+        
+        # A OPERAÇÃO LEVA UMA CÓPIA DO ESTADO ATUAL PARA A THREAD DO BANCO
+        linhas, inicio, altura, total = list(self.linhas), self.inicio, self.altura, self.total
+        
+        def operacao(banco: Banco):
+            nonlocal posicao, total
+            if recontar:
+                total = banco.contar_alunos()
+                posicao = max(0, min(posicao, max(0, total - altura)))
+            return total, posicao, _buscar_janela_alunos(banco, linhas, inicio, posicao, altura)
+        
+        def aplicar(resultado):
+            self.destino = None
+            self.total, self.inicio, self.linhas = resultado
+            self._renderizar()
+            esperando, self.esperando = self.esperando, []
+            for funcao in esperando:
+                funcao()
+        
+        if depois:
+            self.esperando.append(depois)
+        self.destino = posicao
+        self.banco.chamar(operacao, chave=self.chave_pedido, ao_concluir=aplicar)
+    
+    def inserir(self, matricula: str, nome: str):
+        # APLICA UM ALUNO NOVO SEM CONSULTAR O BANCO
+        self.total += 1
+        if self.destino is not None:
+            self._refazer_pedido()
+            return
+        
+        chave = (nome, matricula)
+        chaves = [(n, m) for m, n in self.linhas]
+        indice = bisect_left(chaves, chave)
+        
+        if indice == 0 and self.inicio > 0:
+            # ENTROU ANTES DA JANELA: AS MESMAS LINHAS CONTINUAM VISÍVEIS, SÓ UMA POSIÇÃO ABAIXO
+            self.inicio += 1
+        elif indice < self.altura:
+            self.linhas.insert(indice, (matricula, nome))
+            self.tabela.insert("", indice, iid=matricula, values=(matricula, nome))
+            if len(self.linhas) > self.altura:
+                saiu, _ = self.linhas.pop()
+                self.tabela.delete(saiu)
+        self._atualizar_scrollbar()
+    
+    def nome(self, matricula: str) -> Optional[str]:
+        # NOME DE UMA LINHA VISÍVEL (O Tk DEVOLVE OS values CONVERTIDOS: "0012" VIRIA COMO 12)
+        for linha_matricula, nome in self.linhas:
+            if linha_matricula == matricula:
+                return nome
+        return None
+    
+    def remover(self, matricula: str, nome: str):
+        self.total -= 1
+        if self.destino is not None:
+            self._refazer_pedido()
+            return
+        
+        visiveis = [m for m, _ in self.linhas]
+        
+        if matricula in visiveis:
+            # A JANELA SE COMPLETA COM UMA LINHA VIZINHA (CONSULTA DO TAMANHO DA JANELA, NÃO DA TABELA)
+            self.linhas.pop(visiveis.index(matricula))
+            self.tabela.delete(matricula)
+            self.mostrar(self.inicio, forcar=True)
+            return
+        
+        if self.linhas and (nome, matricula) < (self.linhas[0][1], self.linhas[0][0]):
+            self.inicio -= 1
+        self._atualizar_scrollbar()
+    
+    def _refazer_pedido(self):
+        # A JANELA A CAMINHO FOI MONTADA SOBRE LINHAS DE ANTES DESTA MUDANÇA:
+        # DESCARTA O QUE ESTÁ CARREGADO E PEDE A MESMA POSIÇÃO DIRETO DO BANCO
+        self.linhas = []
+        self.mostrar(self.destino, forcar=True, recontar=True)
+    
+    def _renderizar(self):
+        selecionados = self.tabela.selection()
+        self.tabela.delete(*self.tabela.get_children())
+        
+        for matricula, nome in self.linhas:
+            self.tabela.insert("", "end", iid=matricula, values=(matricula, nome))
+        
+        # RESTAURA A SELEÇÃO DAS LINHAS QUE CONTINUAM VISÍVEIS
+        manter = [iid for iid in selecionados if self.tabela.exists(iid)]
+        if manter:
+            self.tabela.selection_set(manter)
+        
+        self._atualizar_scrollbar()
+    
+    def _atualizar_scrollbar(self):
+        if self.total == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.inicio / self.total, (self.inicio + len(self.linhas)) / self.total)
+    
+    def rolar(self, *args):
+        if args[0] == "moveto":
+            self.mostrar(round(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            passo = int(args[1])
+            if args[2] == "pages":
+                passo *= self.altura
+            self.mostrar(self.inicio + passo)
+    
+    def _roda_mouse(self, event):
+        if event.num == 4:
+            passo = -3
+        elif event.num == 5:
+            passo = 3
+        else:
+            passo = -3 if event.delta > 0 else 3
+        self.mostrar(self.inicio + passo)
+        return "break"
+    
+    def _tecla(self, passo: int):
+        # SETAS NA BORDA DA JANELA ROLAM A TABELA EM VEZ DE PARAR NA ÚLTIMA LINHA VISÍVEL
+        itens = self.tabela.get_children()
+        if not itens:
+            return None
+        borda = itens[-1] if passo > 0 else itens[0]
+        if self.tabela.focus() != borda:
             return None
+        
+        def selecionar_borda():
+            itens = self.tabela.get_children()
+            if itens:
+                novo = itens[-1] if passo > 0 else itens[0]
+                self.tabela.selection_set(novo)
+                self.tabela.focus(novo)
+        
+        self.mostrar(self.inicio + passo, depois=selecionar_borda)
+        return "break"
     
-    def listar_alunos(self) -> List[Tuple[str, str]]:
-        try:
-            self.cursor.execute("SELECT matricula, nome FROM alunos ORDER BY nome")
-            return self.cursor.fetchall()
-        except Exception as e:
-            print(f"Erro ao listar alunos: {e}")
-            return []
+    def _pagina(self, passo: int):
+        self.mostrar(self.inicio + passo * self.altura)
+        return "break"
     
-    def buscar_notas_aluno(self, matricula: str) -> List[Tuple[str, float]]:
-        try:
-            self.cursor.execute(
-                "SELECT disciplina, valor FROM notas WHERE aluno_matricula = ? ORDER BY disciplina",
-                (matricula,)
+    def _redimensionar(self, event):
+        itens = self.tabela.get_children()
+        if not itens:
+            return
+        caixa = self.tabela.bbox(itens[0])
+        if not caixa:
+            return
+        
+        # CABEÇALHO FICA ACIMA DA PRIMEIRA LINHA; O RESTO DIVIDE PELA ALTURA DA LINHA
+        topo, altura_linha = caixa[1], caixa[3]
+        altura = max(1, (event.height - topo) // max(1, altura_linha))
+        if altura != self.altura:
+            self.altura = altura
+            self.mostrar(self.inicio, forcar=True)
+
+
+class SeletorAluno(ttk.Frame):
+    # CAMPO DE BUSCA DE ALUNO POR NOME OU MATRÍCULA COM SUGESTÕES ENQUANTO O USUÁRIO DIGITA
+    TECLAS_IGNORADAS = {"Up", "Down", "Left", "Right", "Return", "KP_Enter", "Escape", "Tab",
+                        "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R", "Home", "End"}
+    
+    def __init__(self, master, banco: BancoAssincrono, ao_selecionar: Callable[[str], None], width: int = 50):
+        super().__init__(master)
+        self.banco = banco
+        self.ao_selecionar = ao_selecionar
+        
+        # ALUNO ESCOLHIDO (CONTINUA VALENDO ENQUANTO O USUÁRIO DIGITA UMA NOVA BUSCA)
+        self.matricula: Optional[str] = None
+        self.nome: Optional[str] = None
+        
+        self.resultados: List[Tuple[str, str]] = []
+        self.id_espera: Optional[str] = None
+        self.chave_pedido = f"busca{self}"
+        
+        self.entry = ttk.Entry(self, width=width)
+        self.entry.pack(fill="x")
+        self.entry.bind("<KeyRelease>", self._digitado)
+        self.entry.bind("<Down>", self._descer)
+        self.entry.bind("<Return>", self._confirmar)
+        self.entry.bind("<Escape>", self._cancelar)
+        self.entry.bind("<FocusOut>", self._saiu)
+        
+        # LISTA DE SUGESTÕES FLUTUANTE, ABERTA LOGO ABAIXO DO CAMPO
+        self.popup = tk.Toplevel(self)
+        self.popup.withdraw()
+        self.popup.overrideredirect(True)
+        self.lista = tk.Listbox(self.popup, height=LIMITE_BUSCA, exportselection=False)
+        self.lista.pack(fill="both", expand=True)
+        self.lista.bind("<ButtonRelease-1>", self._confirmar)
+        self.lista.bind("<Return>", self._confirmar)
+        self.lista.bind("<Escape>", self._cancelar)
+        self.lista.bind("<FocusOut>", self._saiu)
+    
+    def selecionar(self, matricula: str, nome: str):
+        self.matricula = matricula
+        self.nome = nome
+        self._mostrar_escolhido()
+    
+    def limpar(self):
+        self.matricula = None
+        self.nome = None
+        self._mostrar_escolhido()
+    
+    def _mostrar_escolhido(self):
+        self.entry.delete(0, tk.END)
+        if self.matricula is not None:
+            self.entry.insert(0, f"{self.matricula} - {self.nome}")
+    
+    def _digitado(self, event):
+        if event.keysym in self.TECLAS_IGNORADAS:
+            return
+        
+        # DEBOUNCE: SÓ CONSULTA QUANDO O USUÁRIO PARA DE DIGITAR
+        if self.id_espera is not None:
+            self.after_cancel(self.id_espera)
+            self.id_espera = None
+        termo = self.entry.get().strip()
+        if not termo:
+            self._fechar_lista()
+            return
+        self.id_espera = self.after(ESPERA_BUSCA, self._buscar, termo)
+    
+    def _buscar(self, termo: str):
+        self.id_espera = None
+        
+        def mostrar(resultados: List[Tuple[str, str]]):
+            # O TEXTO MUDOU DEPOIS DO PEDIDO (E NÃO GEROU OUTRO, EX.: FOI APAGADO): DESCARTA
+            if self.entry.get().strip() == termo:
+                self._mostrar_resultados(resultados)
+        
+        # PEDIDOS COM A MESMA CHAVE SE SUBSTITUEM: BUSCAS VELHAS SÃO CANCELADAS OU IGNORADAS
+        self.banco.chamar("buscar_alunos", termo, LIMITE_BUSCA, chave=self.chave_pedido, ao_concluir=mostrar)
+    
+    def _mostrar_resultados(self, resultados: List[Tuple[str, str]]):
+        self.resultados = resultados
+        self.lista.delete(0, tk.END)
+        if not resultados:
+            self.lista.insert(tk.END, "Nenhum aluno encontrado")
+        for matricula, nome in resultados:
+            self.lista.insert(tk.END, f"{matricula} - {nome}")
+        self.lista.configure(height=max(1, len(resultados)))
+        
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.popup.geometry(f"{self.entry.winfo_width()}x{self.lista.winfo_reqheight()}+{x}+{y}")
+        self.popup.deiconify()
+        self.popup.lift()
+    
+    def _fechar_lista(self):
+        self.popup.withdraw()
+        self.resultados = []
+    
+    def _descer(self, event):
+        if self.resultados and self.popup.winfo_viewable():
+            self.lista.focus_set()
+            self.lista.selection_clear(0, tk.END)
+            self.lista.selection_set(0)
+            self.lista.activate(0)
+        return "break"
+    
+    def _confirmar(self, event):
+        if not self.resultados:
+            return "break"
+        
+        selecao = self.lista.curselection()
+        matricula, nome = self.resultados[selecao[0] if selecao else 0]
+        self._fechar_lista()
+        self.selecionar(matricula, nome)
+        self.entry.focus_set()
+        self.ao_selecionar(matricula)
+        return "break"
+    
+    def _cancelar(self, event):
+        self._fechar_lista()
+        self._mostrar_escolhido()
+        self.entry.focus_set()
+        return "break"
+    
+    def _saiu(self, event):
+        # O FOCO PASSA DO CAMPO PARA A LISTA AO USAR AS SETAS; SÓ FECHA SE SAIU DOS DOIS
+        self.after(100, self._verificar_foco)
+    
+    def _verificar_foco(self):
+        foco = self.focus_get()
+        if foco not in (self.entry, self.lista):
+            self._fechar_lista()
+            self._mostrar_escolhido()
+
+
+def _exportar_boletins(banco: Banco, arquivo: str) -> int:
+    # RODA NA THREAD DO BANCO: OS BOLETINS VÃO DIRETO DA CONSULTA PARA O ARQUIVO
+    return escrever_boletins(arquivo, banco.percorrer_boletins(), disciplinas=banco.listar_disciplinas())
+
+
+def _ligar_instrumentacao(banco: Banco, limite_lento_ms: float, arquivo_lento: str):
+    # RODA NA THREAD DO BANCO. instrumentacao SÓ É IMPORTADO QUANDO A MEDIÇÃO É LIGADA
+    from instrumentacao import Instrumentacao
+    
+    if banco.instrumentacao is None:
+        banco.instrumentar(Instrumentacao(limite_lento_ms, arquivo_lento))
+    else:
+        banco.instrumentacao.limite_lento_ms = limite_lento_ms
+
+
+def _relatorio_instrumentacao(banco: Banco) -> Optional[str]:
+    return banco.instrumentacao.relatorio(limite=30) if banco.instrumentacao is not None else None
+
+
+class JanelaDiagnostico:
+    # MOSTRA O QUE A INSTRUMENTAÇÃO DO BANCO COLETOU. OS NÚMEROS PERTENCEM À THREAD DO BANCO,
+    # ENTÃO SÃO SEMPRE PEDIDOS A ELA PELO BancoAssincrono, COMO QUALQUER CONSULTA
+    def __init__(self, master, banco: BancoAssincrono):
+        self.banco = banco
+        self.janela = tk.Toplevel(master)
+        self.janela.title("Diagnóstico do Banco de Dados")
+        self.janela.geometry("900x500")
+        
+        barra = ttk.Frame(self.janela)
+        barra.pack(fill="x", padx=10, pady=5)
+        
+        self.medindo = tk.BooleanVar(value=False)
+        ttk.Checkbutton(barra, text="Medir consultas", variable=self.medindo, command=self.alternar).pack(side=tk.LEFT)
+        ttk.Label(barra, text="Lentas a partir de (ms):").pack(side=tk.LEFT, padx=(20, 5))
+        self.spin_limite = ttk.Spinbox(barra, from_=1, to=60000, width=7)
+        self.spin_limite.set("100")
+        self.spin_limite.pack(side=tk.LEFT)
+        ttk.Button(barra, text="Salvar JSON...", command=self.salvar).pack(side=tk.RIGHT)
+        ttk.Button(barra, text="Zerar", command=self.zerar).pack(side=tk.RIGHT, padx=5)
+        
+        frame = ttk.Frame(self.janela)
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.texto = tk.Text(frame, font="TkFixedFont", wrap="none", state="disabled")
+        rolagem_y = ttk.Scrollbar(frame, orient="vertical", command=self.texto.yview)
+        rolagem_x = ttk.Scrollbar(frame, orient="horizontal", command=self.texto.xview)
+        self.texto.configure(yscrollcommand=rolagem_y.set, xscrollcommand=rolagem_x.set)
+        rolagem_y.pack(side=tk.RIGHT, fill="y")
+        rolagem_x.pack(side=tk.BOTTOM, fill="x")
+        self.texto.pack(fill="both", expand=True)
+        
+        self.janela.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.id_atualizacao: Optional[str] = None
+        self.atualizar()
+    
+    def existe(self) -> bool:
+        return bool(self.janela.winfo_exists())
+    
+    def alternar(self):
+        if self.medindo.get():
+            try:
+                limite = float(self.spin_limite.get())
+            except ValueError:
+                limite = 100.0
+            self.banco.chamar(_ligar_instrumentacao, limite, ARQUIVO_CONSULTAS_LENTAS)
+        else:
+            self.banco.chamar("instrumentar", None)
+        self.atualizar()
+    
+    def zerar(self):
+        self.banco.chamar(lambda banco: banco.instrumentacao and banco.instrumentacao.limpar())
+        self.atualizar()
+    
+    def salvar(self):
+        arquivo = filedialog.asksaveasfilename(
+            parent=self.janela, title="Salvar diagnóstico", defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Todos os arquivos", "*.*")]
+        )
+        if not arquivo:
+            return
+        
+        def gravar(dados: Optional[Dict[str, Any]]):
+            if dados is None:
+                messagebox.showinfo("Diagnóstico", "A medição está desligada.", parent=self.janela)
+                return
+            try:
+                with open(arquivo, "w", encoding="utf-8") as f:
+                    json.dump(dados, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                messagebox.showerror("Erro", f"Erro ao salvar diagnóstico: {e}", parent=self.janela)
+        
+        self.banco.chamar(lambda banco: banco.instrumentacao and banco.instrumentacao.dados(), ao_concluir=gravar)
+    
+    def atualizar(self):
+        if self.id_atualizacao is not None:
+            self.janela.after_cancel(self.id_atualizacao)
+        self.banco.chamar(_relatorio_instrumentacao, chave="diagnostico", ao_concluir=self.mostrar)
+        self.id_atualizacao = self.janela.after(INTERVALO_DIAGNOSTICO, self.atualizar)
+    
+    def mostrar(self, relatorio: Optional[str]):
+        if not self.existe():
+            return
+        self.medindo.set(relatorio is not None)
+        if relatorio is None:
+            relatorio = (
+                "A medição está desligada. Ligue \"Medir consultas\" para registrar o tempo de cada "
+                f"método e comando SQL;\nos mais lentos que o limite também vão para {ARQUIVO_CONSULTAS_LENTAS}."
             )
-            return self.cursor.fetchall()
-        except Exception as e:
-            print(f"Erro ao buscar notas do aluno: {e}")
-            return []
+        
+        # MANTÉM A POSIÇÃO DE LEITURA ENTRE AS ATUALIZAÇÕES
+        posicao = self.texto.yview()[0]
+        self.texto.configure(state="normal")
+        self.texto.delete("1.0", "end")
+        self.texto.insert("1.0", relatorio)
+        self.texto.configure(state="disabled")
+        self.texto.yview_moveto(posicao)
+    
+    def fechar(self):
+        # A MEDIÇÃO CONTINUA LIGADA; REABRIR A JANELA MOSTRA O QUE FOI COLETADO NESSE MEIO TEMPO
+        if self.id_atualizacao is not None:
+            self.janela.after_cancel(self.id_atualizacao)
+            self.id_atualizacao = None
+        self.janela.destroy()
+
+
+class GradeNotas:
+    # LANÇAMENTO DAS NOTAS DE UMA DISCIPLINA EM GRADE, UM ALUNO POR LINHA. O QUE É DIGITADO FICA
+    # PENDENTE (LINHA DESTACADA) ATÉ "Salvar", QUE GRAVA TUDO NUM ÚNICO COMMIT (Banco.salvar_notas)
+    def __init__(self, master, banco: BancoAssincrono, disciplinas: List[str], disciplina: str = ""):
+        self.banco = banco
+        # DISCIPLINA CARREGADA NA GRADE; NOME E NOTA GRAVADA NO BANCO DE CADA LINHA (A MATRÍCULA É O iid,
+        # E NADA É RELIDO DOS values, QUE O Tk DEVOLVE CONVERTIDOS); NOTAS AINDA NÃO SALVAS
+        self.disciplina: Optional[str] = None
+        self.nomes: Dict[str, str] = {}
+        self.gravadas: Dict[str, Optional[float]] = {}
+        self.pendentes: Dict[str, Optional[float]] = {}
+        self.editor: Optional[ttk.Entry] = None
+        self.linha_editada: Optional[str] = None
+        
+        self.janela = tk.Toplevel(master)
+        self.janela.title("Lançar Notas em Grade")
+        self.janela.geometry("700x550")
+        
+        barra = ttk.Frame(self.janela)
+        barra.pack(fill="x", padx=10, pady=5)
+        ttk.Label(barra, text="Disciplina:").pack(side=tk.LEFT)
+        self.combo_disciplina = ttk.Combobox(barra, values=disciplinas, width=25)
+        self.combo_disciplina.set(disciplina)
+        self.combo_disciplina.pack(side=tk.LEFT, padx=5)
+        self.combo_disciplina.bind("<<ComboboxSelected>>", lambda event: self.carregar())
+        self.combo_disciplina.bind("<Return>", lambda event: self.carregar())
+        ttk.Label(barra, text="Alunos:").pack(side=tk.LEFT, padx=(15, 0))
+        self.entry_filtro = ttk.Entry(barra, width=20)
+        self.entry_filtro.pack(side=tk.LEFT, padx=5)
+        self.entry_filtro.bind("<Return>", lambda event: self.carregar())
+        ttk.Button(barra, text="Carregar", command=self.carregar).pack(side=tk.LEFT)
+        
+        frame = ttk.Frame(self.janela)
+        frame.pack(fill="both", expand=True, padx=10)
+        colunas = ("Matrícula", "Nome", "Nota")
+        self.tabela = ttk.Treeview(frame, columns=colunas, show="headings", selectmode="extended")
+        for col, largura in zip(colunas, (120, 380, 80)):
+            self.tabela.heading(col, text=col)
+            self.tabela.column(col, width=largura)
+        self.tabela.tag_configure("pendente", background="#fff3c4")
+        rolagem = ttk.Scrollbar(frame, orient="vertical", command=self.tabela.yview)
+        self.tabela.configure(yscrollcommand=rolagem.set)
+        rolagem.pack(side=tk.RIGHT, fill="y")
+        self.tabela.pack(fill="both", expand=True)
+        
+        # DUPLO CLIQUE OU ENTER EDITA A NOTA; DELETE APAGA AS NOTAS DAS LINHAS SELECIONADAS
+        self.tabela.bind("<Double-1>", self._clicado)
+        self.tabela.bind("<Return>", lambda event: self.editar(self.tabela.focus()))
+        self.tabela.bind("<Delete>", self._apagar)
+        
+        rodape = ttk.Frame(self.janela)
+        rodape.pack(fill="x", padx=10, pady=10)
+        self.label_status = ttk.Label(rodape, text="Escolha a disciplina e clique em Carregar.")
+        self.label_status.pack(side=tk.LEFT)
+        ttk.Button(rodape, text="Salvar", command=self.salvar).pack(side=tk.RIGHT)
+        ttk.Button(rodape, text="Descartar", command=self.descartar).pack(side=tk.RIGHT, padx=5)
+        
+        self.janela.protocol("WM_DELETE_WINDOW", self.fechar)
+        if disciplina:
+            self.carregar()
+    
+    def existe(self) -> bool:
+        return bool(self.janela.winfo_exists())
+    
+    def confirmar_descarte(self) -> bool:
+        return not self.pendentes or messagebox.askyesno(
+            "Notas não salvas", f"Descartar {len(self.pendentes)} nota(s) não salva(s)?", parent=self.janela
+        )
+    
+    def carregar(self):
+        disciplina = self.combo_disciplina.get().strip()
+        if not disciplina:
+            messagebox.showerror("Erro", "Informe a disciplina!", parent=self.janela)
+            return
+        if not self.confirmar_descarte():
+            return
+        self.fechar_editor(salvar=False)
+        self.banco.chamar("listar_notas_disciplina", disciplina, self.entry_filtro.get(), LIMITE_GRADE,
+                          chave="grade_notas", ao_concluir=lambda linhas: self.preencher(disciplina, linhas),
+                          ao_erro=lambda erro: messagebox.showerror("Erro", str(erro), parent=self.janela))
+    
+    def preencher(self, disciplina: str, linhas: List[Tuple[str, str, Optional[float]]]):
+        if not self.existe():
+            return
+        self.disciplina = disciplina
+        self.pendentes.clear()
+        self.nomes = {matricula: nome for matricula, nome, _ in linhas}
+        self.gravadas = {matricula: valor for matricula, _, valor in linhas}
+        self.tabela.delete(*self.tabela.get_children())
+        for matricula, nome, valor in linhas:
+            self.tabela.insert("", "end", iid=matricula, values=(matricula, nome, _texto_nota(valor)))
+        
+        texto = f"{disciplina}: {len(linhas)} aluno(s)"
+        if len(linhas) == LIMITE_GRADE:
+            texto += f" (só os {LIMITE_GRADE} primeiros; filtre os alunos para ver outros)"
+        self.label_status.config(text=texto)
+        if linhas:
+            self.tabela.focus(linhas[0][0])
+            self.tabela.selection_set(linhas[0][0])
+            self.tabela.focus_set()
+    
+    def _clicado(self, event):
+        linha = self.tabela.identify_row(event.y)
+        if linha:
+            self.editar(linha)
+    
+    def editar(self, linha: str):
+        # CAIXA DE TEXTO POR CIMA DA CÉLULA DA NOTA (O Treeview NÃO EDITA CÉLULAS)
+        self.fechar_editor()
+        if not linha or not self.tabela.exists(linha):
+            return
+        self.tabela.see(linha)
+        caixa = self.tabela.bbox(linha, "Nota")
+        if not caixa:
+            return
+        x, y, largura, altura = caixa
+        
+        self.linha_editada = linha
+        self.editor = ttk.Entry(self.tabela)
+        self.editor.insert(0, _texto_nota(self.pendentes.get(linha, self.gravadas.get(linha))))
+        self.editor.select_range(0, tk.END)
+        self.editor.place(x=x, y=y, width=largura, height=altura)
+        self.editor.focus_set()
+        # ENTER/SETA PARA BAIXO GRAVA E DESCE, COMO NUMA PLANILHA
+        self.editor.bind("<Return>", lambda event: self._confirmar(1))
+        self.editor.bind("<Down>", lambda event: self._confirmar(1))
+        self.editor.bind("<Up>", lambda event: self._confirmar(-1))
+        self.editor.bind("<Escape>", lambda event: self.fechar_editor(salvar=False) or "break")
+        self._vigiar_foco(self.editor)
+    
+    def _vigiar_foco(self, editor: ttk.Entry):
+        # CLICAR FORA DO EDITOR GRAVA A NOTA, SE ELE AINDA FOR O EDITOR ABERTO
+        if editor is self.editor:
+            editor.bind("<FocusOut>", lambda event: self.fechar_editor())
+    
+    def _confirmar(self, passo: int) -> str:
+        linha = self.linha_editada
+        if self.fechar_editor() and linha is not None:
+            proxima = self.tabela.next(linha) if passo > 0 else self.tabela.prev(linha)
+            if proxima:
+                self.tabela.selection_set(proxima)
+                self.tabela.focus(proxima)
+                self.editar(proxima)
+        # NÃO DEIXA O Treeview TRATAR A MESMA TECLA
+        return "break"
+    
+    def fechar_editor(self, salvar: bool = True) -> bool:
+        # FALSE QUANDO O VALOR DIGITADO É INVÁLIDO E A EDIÇÃO CONTINUA
+        if self.editor is None:
+            return True
+        editor, linha = self.editor, self.linha_editada
+        if salvar:
+            texto = editor.get().strip().replace(",", ".")
+            try:
+                valor = float(texto) if texto else None
+                if valor is not None and not 0 <= valor <= 10:
+                    raise ValueError
+            except ValueError:
+                # A MENSAGEM TIRA O FOCO DO EDITOR: O <FocusOut> CHAMARIA ESTE MÉTODO DE NOVO NO MEIO
+                # DESTE. ELE SÓ VOLTA DEPOIS QUE O FOCO VOLTAR AO EDITOR
+                editor.unbind("<FocusOut>")
+                messagebox.showerror("Erro", "A nota deve ser um número entre 0 e 10!", parent=self.janela)
+                editor.focus_set()
+                editor.after_idle(self._vigiar_foco, editor)
+                return False
+        
+        self.editor = None
+        self.linha_editada = None
+        editor.destroy()
+        self.tabela.focus_set()
+        if salvar:
+            self.marcar(linha, valor)
+        return True
+    
+    def _apagar(self, event):
+        for linha in self.tabela.selection():
+            self.marcar(linha, None)
+    
+    def marcar(self, matricula: str, valor: Optional[float]):
+        # VOLTAR AO VALOR GRAVADO DESFAZ A PENDÊNCIA
+        if valor == self.gravadas.get(matricula):
+            self.pendentes.pop(matricula, None)
+        else:
+            self.pendentes[matricula] = valor
+        self._mostrar_linha(matricula)
+    
+    def _mostrar_linha(self, matricula: str):
+        valor = self.pendentes.get(matricula, self.gravadas.get(matricula))
+        tags = ("pendente",) if matricula in self.pendentes else ()
+        self.tabela.item(matricula, values=(matricula, self.nomes[matricula], _texto_nota(valor)), tags=tags)
+    
+    def salvar(self):
+        if not self.fechar_editor():
+            return
+        if not self.pendentes:
+            self.label_status.config(text="Nenhuma nota alterada.")
+            return
+        
+        lote = dict(self.pendentes)
+        
+        def concluido(salvas: bool):
+            if not salvas:
+                messagebox.showerror("Erro", "Erro ao salvar as notas. Nada foi gravado.", parent=self.janela)
+                return
+            for matricula, valor in lote.items():
+                self.gravadas[matricula] = valor
+                if matricula in self.pendentes and self.pendentes[matricula] == valor:
+                    del self.pendentes[matricula]
+                if self.tabela.exists(matricula):
+                    self._mostrar_linha(matricula)
+            self.label_status.config(text=f"{len(lote)} nota(s) de {self.disciplina} salva(s).")
+        
+        self.banco.chamar("salvar_notas", self.disciplina, list(lote.items()), descricao="Salvando notas...",
+                          ao_concluir=concluido,
+                          ao_erro=lambda erro: messagebox.showerror("Erro", str(erro), parent=self.janela))
+    
+    def descartar(self):
+        self.fechar_editor(salvar=False)
+        for matricula in list(self.pendentes):
+            del self.pendentes[matricula]
+            self._mostrar_linha(matricula)
+    
+    def aplicar_evento(self, evento: Evento):
+        # MUDANÇAS FEITAS EM OUTRO LUGAR (OU POR OUTRO USUÁRIO): NOTAS PENDENTES AQUI NÃO SÃO TOCADAS
+        if evento.tipo in (NOTA_INSERIDA, NOTA_ALTERADA, NOTA_EXCLUIDA):
+            if evento.disciplina == self.disciplina and self.tabela.exists(evento.matricula):
+                self.gravadas[evento.matricula] = evento.valor if evento.tipo != NOTA_EXCLUIDA else None
+                if evento.matricula not in self.pendentes:
+                    self._mostrar_linha(evento.matricula)
+        elif evento.tipo == ALUNO_EXCLUIDO and self.tabela.exists(evento.matricula):
+            self.pendentes.pop(evento.matricula, None)
+            self.gravadas.pop(evento.matricula, None)
+            self.nomes.pop(evento.matricula, None)
+            self.tabela.delete(evento.matricula)
+        elif evento.tipo == NOTAS_RECARREGADAS and self.disciplina and not self.pendentes:
+            self.combo_disciplina.set(self.disciplina)
+            self.carregar()
     
     def fechar(self):
-        if self.conexao:
-            self.conexao.close()
+        if not self.confirmar_descarte():
+            return
+        self.janela.destroy()
+
+
+def _texto_nota(valor: Optional[float]) -> str:
+    return "" if valor is None else f"{valor:g}"
+
+
+class ExclusaoAlunos:
+    # EXCLUSÃO EM MASSA (EX.: FORMANDOS NO FIM DO ANO): A BUSCA MOSTRA QUEM SERÁ EXCLUÍDO E SÓ
+    # ESSES ALUNOS SÃO EXCLUÍDOS, NUM ÚNICO COMANDO E COMMIT (Banco.excluir_alunos)
+    def __init__(self, master, banco: BancoAssincrono, ao_excluir: Callable[[List[str]], None]):
+        self.banco = banco
+        self.ao_excluir = ao_excluir
+        self.encontrados: List[str] = []
+        
+        self.janela = tk.Toplevel(master)
+        self.janela.title("Excluir Alunos pela Busca")
+        self.janela.geometry("600x500")
+        
+        barra = ttk.Frame(self.janela)
+        barra.pack(fill="x", padx=10, pady=5)
+        ttk.Label(barra, text="Nome ou matrícula:").pack(side=tk.LEFT)
+        self.entry_termo = ttk.Entry(barra, width=30)
+        self.entry_termo.pack(side=tk.LEFT, padx=5)
+        self.entry_termo.bind("<Return>", lambda event: self.buscar())
+        self.entry_termo.focus_set()
+        ttk.Button(barra, text="Buscar", command=self.buscar).pack(side=tk.LEFT)
+        
+        frame = ttk.Frame(self.janela)
+        frame.pack(fill="both", expand=True, padx=10)
+        colunas = ("Matrícula", "Nome")
+        self.tabela = ttk.Treeview(frame, columns=colunas, show="headings", selectmode="none")
+        self.tabela.heading("Matrícula", text="Matrícula")
+        self.tabela.heading("Nome", text="Nome")
+        self.tabela.column("Matrícula", width=120)
+        self.tabela.column("Nome", width=400)
+        rolagem = ttk.Scrollbar(frame, orient="vertical", command=self.tabela.yview)
+        self.tabela.configure(yscrollcommand=rolagem.set)
+        rolagem.pack(side=tk.RIGHT, fill="y")
+        self.tabela.pack(fill="both", expand=True)
+        
+        rodape = ttk.Frame(self.janela)
+        rodape.pack(fill="x", padx=10, pady=10)
+        self.label_status = ttk.Label(rodape, text="Busque os alunos a excluir.")
+        self.label_status.pack(side=tk.LEFT)
+        ttk.Button(rodape, text="Excluir Todos", command=self.excluir).pack(side=tk.RIGHT)
+    
+    def existe(self) -> bool:
+        return bool(self.janela.winfo_exists())
+    
+    def buscar(self):
+        termo = self.entry_termo.get().strip()
+        if not termo:
+            return
+        self.banco.chamar("buscar_alunos", termo, LIMITE_EXCLUSAO + 1, chave="exclusao_alunos",
+                          ao_concluir=self.mostrar, ao_erro=lambda erro: messagebox.showerror("Erro", str(erro), parent=self.janela))
+    
+    def mostrar(self, alunos: List[Tuple[str, str]]):
+        if not self.existe():
+            return
+        self.tabela.delete(*self.tabela.get_children())
+        if len(alunos) > LIMITE_EXCLUSAO:
+            # MUITOS DE UMA VEZ: NINGUÉM CONFERE ISSO NA TELA
+            self.encontrados = []
+            self.label_status.config(text=f"Mais de {LIMITE_EXCLUSAO} alunos encontrados; refine a busca.")
+            return
+        
+        self.encontrados = [matricula for matricula, _ in alunos]
+        for matricula, nome in alunos:
+            self.tabela.insert("", "end", iid=matricula, values=(matricula, nome))
+        self.label_status.config(text=f"{len(alunos)} aluno(s) encontrado(s).")
+    
+    def excluir(self):
+        if not self.encontrados:
+            return
+        matriculas = list(self.encontrados)
+        if not messagebox.askyesno(
+            "Confirmar Exclusão",
+            f"Deseja realmente excluir os {len(matriculas)} alunos listados?\n\n"
+            "ATENÇÃO: Todas as notas destes alunos também serão excluídas!",
+            parent=self.janela
+        ):
+            return
+        
+        def concluido(excluidas: Optional[List[str]]):
+            if excluidas is None:
+                messagebox.showerror("Erro", "Erro ao excluir os alunos! Nenhum aluno foi excluído.", parent=self.janela)
+                return
+            self.ao_excluir(excluidas)
+            if self.existe():
+                self.encontrados = []
+                self.tabela.delete(*self.tabela.get_children())
+                self.label_status.config(text=f"{len(excluidas)} aluno(s) excluído(s).")
+        
+        self.banco.chamar("excluir_alunos", matriculas, descricao="Excluindo alunos...", ao_concluir=concluido)
 
 
 class Aplicacao:
-    def __init__(self, root):
+    def __init__(self, root, fabrica: Callable[[], Banco] = Banco, titulo: Optional[str] = None,
+                 ao_medir_abertura: Optional[Callable[[str, float], None]] = None, remoto: bool = False):
+        # fabrica ABRE O BANCO NA THREAD DELE: O ARQUIVO LOCAL OU UM ClienteRemoto DO servidor.py
+        # (remoto=True: O QUE PRECISA DO ARQUIVO OU DA CONEXÃO DO Banco FICA DESATIVADO NO MENU).
+        # ao_medir_abertura(ETAPA, SEGUNDOS) RECEBE O TEMPO DESDE AQUI ATÉ A JANELA SER DESENHADA
+        # ("janela") E ATÉ A PRIMEIRA PÁGINA DE ALUNOS APARECER ("alunos")
+        self.inicio_abertura = time.perf_counter()
+        self.ao_medir_abertura = ao_medir_abertura
+        self.tempos_abertura: Dict[str, float] = {}
+        self.remoto = remoto
         self.root = root
-        self.root.title("Sistema de Cadastro e Consulta de Notas")
+        self.root.title(titulo or "Sistema de Cadastro e Consulta de Notas")
         self.root.geometry("800x600")
         self.root.resizable(True, True)
         
-        # INICIANDO BANCCO DE DADOS
-        self.banco = Banco()
+        # INICIANDO BANCCO DE DADOS (NUMA THREAD PRÓPRIA PARA A JANELA NUNCA TRAVAR)
+        self.banco = BancoAssincrono(fabrica)
+        self.banco.inscrever(self.aplicar_evento)
+        
+        # DICIONÁRIO DE DISCIPLINAS PARA O AUTOCOMPLETAR
+        self.disciplinas: List[str] = []
+        self.janela_diagnostico: Optional[JanelaDiagnostico] = None
+        self.grade_notas: Optional[GradeNotas] = None
+        self.exclusao_alunos: Optional[ExclusaoAlunos] = None
+        
+        # PRIMEIRO ALUNO DA LISTA, ONDE COMEÇAM OS SELETORES DAS ABAS DE NOTAS. VEM DA MESMA BUSCA
+        # QUE PREENCHE A TABELA DE ALUNOS (carregar_alunos), SEM CONSULTA PRÓPRIA
+        self.primeiro_aluno: Optional[Tuple[str, str]] = None
+        self.alunos_carregados = False
+        # SELETOR, TABELA E RECARGA DE CADA ABA DE NOTAS JÁ MONTADA
+        self.paineis_notas: List[Tuple[SeletorAluno, ttk.Treeview, Callable[[Any], None]]] = []
+        
+        # MENU
+        self.configurar_menu()
+        
+        # BARRA DE STATUS COM INDICADOR DE OCUPADO
+        self.configurar_barra_status()
         
         # CRIANDO ABAS
         self.notebook = ttk.Notebook(root)
@@ -138,23 +1055,145 @@ class Aplicacao:
         self.tab_cadastro_aluno = ttk.Frame(self.notebook)
         self.tab_cadastro_nota = ttk.Frame(self.notebook)
         self.tab_consulta = ttk.Frame(self.notebook)
+        self.tab_estatisticas = ttk.Frame(self.notebook)
         
         self.notebook.add(self.tab_cadastro_aluno, text="Cadastro de Alunos")
         self.notebook.add(self.tab_cadastro_nota, text="Cadastro de Notas")
         self.notebook.add(self.tab_consulta, text="Consulta de Notas")
+        self.notebook.add(self.tab_estatisticas, text="Estatísticas")
+        
+        # CADA ABA (WIDGETS E DADOS) É MONTADA SÓ NA PRIMEIRA VEZ QUE APARECE: A JANELA ABRE
+        # COM A ABA VISÍVEL PRONTA E AS OUTRAS NÃO CUSTAM NADA ATÉ SEREM ABERTAS
+        self.montagens = {
+            str(self.tab_cadastro_aluno): self.montar_aba_cadastro_aluno,
+            str(self.tab_cadastro_nota): self.montar_aba_cadastro_nota,
+            str(self.tab_consulta): self.montar_aba_consulta,
+            str(self.tab_estatisticas): self.montar_aba_estatisticas,
+        }
+        
+        # ESTATÍSTICAS SÓ SÃO BUSCADAS COM A ABA VISÍVEL; MUDANÇAS COM ELA ESCONDIDA
+        # MARCAM PARA ATUALIZAR QUANDO ELA FOR ABERTA
+        self.estatisticas_desatualizadas = True
+        self.notebook.bind("<<NotebookTabChanged>>", self.trocar_aba)
+        self.trocar_aba(None)
+        
+        # PRIMEIRO DESENHO DA JANELA, PARA ao_medir_abertura
+        self.id_pintura = self.root.bind("<Expose>", self.janela_desenhada, add="+")
+        
+        # RECEBENDO RESPOSTAS DA THREAD DO BANCO
+        self.ocupado_desde: Optional[float] = None
+        self.id_despacho = self.root.after(INTERVALO_DESPACHO, self.processar_banco)
+        
+        # CONFIGURANDO FECHAMENTO
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
+    
+    def configurar_menu(self):
+        menu = tk.Menu(self.root)
+        # PELO SERVIDOR NÃO HÁ COMO PERCORRER OS BOLETINS, LER O ARQUIVO DO BANCO (QUE ESTÁ NO DISCO
+        # DELE) NEM LIGAR A MEDIÇÃO: ESSES ITENS APARECEM DESATIVADOS
+        so_local = tk.DISABLED if self.remoto else tk.NORMAL
+        
+        menu_arquivo = tk.Menu(menu, tearoff=0)
+        menu_arquivo.add_command(label="Importar Alunos...", command=self.importar_alunos)
+        menu_arquivo.add_command(label="Importar Notas...", command=self.importar_notas)
+        menu_arquivo.add_command(label="Exportar Boletins...", command=self.exportar_boletins, state=so_local)
+        menu_arquivo.add_command(label="Gerar Boletins em Paralelo...", command=self.gerar_boletins, state=so_local)
+        menu_arquivo.add_command(label="Fazer Cópia de Segurança...", command=self.copiar_banco, state=so_local)
+        menu_arquivo.add_separator()
+        menu_arquivo.add_command(label="Sair", command=self.fechar)
+        menu.add_cascade(label="Arquivo", menu=menu_arquivo)
+        
+        menu_ferramentas = tk.Menu(menu, tearoff=0)
+        menu_ferramentas.add_command(label="Diagnóstico do Banco...", command=self.abrir_diagnostico, state=so_local)
+        menu.add_cascade(label="Ferramentas", menu=menu_ferramentas)
+        
+        self.root.config(menu=menu)
+    
+    def abrir_diagnostico(self):
+        if self.janela_diagnostico is not None and self.janela_diagnostico.existe():
+            self.janela_diagnostico.janela.lift()
+            return
+        self.janela_diagnostico = JanelaDiagnostico(self.root, self.banco)
+    
+    def abrir_grade_notas(self):
+        if self.grade_notas is not None and self.grade_notas.existe():
+            self.grade_notas.janela.lift()
+            return
+        self.grade_notas = GradeNotas(self.root, self.banco, self.disciplinas, self.entry_disciplina.get().strip())
+    
+    def configurar_barra_status(self):
+        barra = ttk.Frame(self.root)
+        barra.pack(side=tk.BOTTOM, fill="x", padx=10, pady=(0, 5))
+        
+        self.label_status = ttk.Label(barra, text="")
+        self.label_status.pack(side=tk.LEFT)
+        
+        self.progresso = ttk.Progressbar(barra, mode="indeterminate", length=150)
+        self.progresso.pack(side=tk.RIGHT)
+    
+    def processar_banco(self):
+        self.banco.despachar()
+        self.atualizar_indicador()
+        self.id_despacho = self.root.after(INTERVALO_DESPACHO, self.processar_banco)
+    
+    def atualizar_indicador(self):
+        if not self.banco.ocupado():
+            if self.ocupado_desde is not None:
+                self.ocupado_desde = None
+                self.progresso.stop()
+                self.label_status.config(text="")
+                self.root.config(cursor="")
+            return
         
-        # CONBFIGURANDO ABAS
+        agora = time.monotonic()
+        if self.ocupado_desde is None:
+            self.ocupado_desde = agora
+        
+        # CONSULTAS RÁPIDAS NÃO PISCAM O INDICADOR; OPERAÇÕES LONGAS APARECEM NA HORA
+        descricao = self.banco.descricao_atual()
+        if descricao or (agora - self.ocupado_desde) * 1000 >= ATRASO_INDICADOR:
+            if not self.label_status.cget("text"):
+                self.progresso.start(10)
+                self.root.config(cursor="watch")
+            self.label_status.config(text=descricao or "Consultando o banco de dados...")
+    
+    def mostrar_erro_banco(self, erro: Exception):
+        messagebox.showerror("Erro", f"Erro no banco de dados: {erro}")
+    
+    def aba_montada(self, aba: ttk.Frame) -> bool:
+        return str(aba) not in self.montagens
+    
+    def montar_aba_cadastro_aluno(self):
         self.configurar_aba_cadastro_aluno()
+        self.carregar_alunos(selecionar=True)
+    
+    def montar_aba_cadastro_nota(self):
         self.configurar_aba_cadastro_nota()
+        self.paineis_notas.append((self.seletor_notas, self.tabela_notas, self.exibir_notas_aluno))
+        self.selecionar_primeiro_aluno()
+        self.carregar_disciplinas()
+    
+    def montar_aba_consulta(self):
         self.configurar_aba_consulta()
-        
-        # INICIANDO TABELAS E COMBOBOX
-        self.atualizar_tabela_alunos()
-        self.atualizar_combobox_alunos()
-        self.atualizar_combobox_consulta()
-        
-        # CONFIGURANDO FECHAMENTO
-        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.paineis_notas.append((self.seletor_consulta, self.tabela_consulta, self.consultar_notas_aluno))
+        self.selecionar_primeiro_aluno()
+    
+    def montar_aba_estatisticas(self):
+        # OS DADOS VÊM DE trocar_aba, QUE ATUALIZA AS ESTATÍSTICAS QUANDO A ABA FICA VISÍVEL
+        self.configurar_aba_estatisticas()
+        self.carregar_disciplinas()
+    
+    def janela_desenhada(self, event):
+        # O DESENHO ACONTECE NAS TAREFAS OCIOSAS DO Tk QUE ESTE EVENTO AGENDOU: MEDE DEPOIS DELAS
+        self.root.unbind("<Expose>", self.id_pintura)
+        self.root.after_idle(self.marcar_abertura, "janela")
+    
+    def marcar_abertura(self, etapa: str):
+        if etapa in self.tempos_abertura:
+            return
+        self.tempos_abertura[etapa] = time.perf_counter() - self.inicio_abertura
+        if self.ao_medir_abertura is not None:
+            self.ao_medir_abertura(etapa, self.tempos_abertura[etapa])
     
     def configurar_aba_cadastro_aluno(self):
         frame = ttk.LabelFrame(self.tab_cadastro_aluno, text="Dados do Aluno")
@@ -180,12 +1219,16 @@ class Aplicacao:
         btn_excluir = ttk.Button(frame_botoes, text="Excluir Aluno", command=self.excluir_aluno)
         btn_excluir.pack(side=tk.LEFT, padx=5)
         
+        btn_excluir_busca = ttk.Button(frame_botoes, text="Excluir pela Busca...", command=self.abrir_exclusao_alunos)
+        btn_excluir_busca.pack(side=tk.LEFT, padx=5)
+        
         # LISTA DE ALUNOS CADASTRADOS
         ttk.Label(frame, text="Alunos Cadastrados:").grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky="w")
         
         # TABELA DE ALUNOS
         colunas = ("Matrícula", "Nome")
-        self.tabela_alunos = ttk.Treeview(frame, columns=colunas, show="headings", height=10)
+        # CTRL/SHIFT + CLIQUE SELECIONAM VÁRIOS ALUNOS PARA EXCLUIR DE UMA VEZ
+        self.tabela_alunos = ttk.Treeview(frame, columns=colunas, show="headings", height=10, selectmode="extended")
         
         for col in colunas:
             self.tabela_alunos.heading(col, text=col)
@@ -197,10 +1240,10 @@ class Aplicacao:
         # SELEÇÃO DE TABELA
         self.tabela_alunos.bind("<<TreeviewSelect>>", self.selecionar_aluno)
         
-        # SCROLLBAR PARA TABELA
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tabela_alunos.yview)
+        # SCROLLBAR PARA TABELA (CONTROLADA PELA TABELA VIRTUAL)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical")
         scrollbar.grid(row=4, column=2, sticky="ns")
-        self.tabela_alunos.configure(yscrollcommand=scrollbar.set)
+        self.tabela_virtual = TabelaVirtual(self.tabela_alunos, scrollbar, self.banco)
         
         # EXPANSÃO DE TABELA
         frame.columnconfigure(1, weight=1)
@@ -212,14 +1255,14 @@ class Aplicacao:
         
         # SELECIONANDO ALUNO
         ttk.Label(frame, text="Aluno:").grid(row=0, column=0, padx=10, pady=10, sticky="w")
-        self.combo_alunos_notas = ttk.Combobox(frame, width=50, state="readonly")
-        self.combo_alunos_notas.grid(row=0, column=1, padx=10, pady=10, sticky="w")
-        self.combo_alunos_notas.bind("<<ComboboxSelected>>", self.exibir_notas_aluno)
+        self.seletor_notas = SeletorAluno(frame, self.banco, lambda matricula: self.exibir_notas_aluno(None))
+        self.seletor_notas.grid(row=0, column=1, padx=10, pady=10, sticky="w")
         
         # DISCIPLINA
         ttk.Label(frame, text="Disciplina:").grid(row=1, column=0, padx=10, pady=10, sticky="w")
-        self.entry_disciplina = ttk.Entry(frame, width=30)
+        self.entry_disciplina = ttk.Combobox(frame, width=30)
         self.entry_disciplina.grid(row=1, column=1, padx=10, pady=10, sticky="w")
+        self.entry_disciplina.bind("<KeyRelease>", self.completar_disciplina)
         
         # VALOR NOTA
         ttk.Label(frame, text="Valor da Nota:").grid(row=2, column=0, padx=10, pady=10, sticky="w")
@@ -236,6 +1279,9 @@ class Aplicacao:
         btn_excluir = ttk.Button(frame_botoes, text="Excluir Nota", command=self.excluir_nota)
         btn_excluir.pack(side=tk.LEFT, padx=5)
         
+        btn_grade = ttk.Button(frame_botoes, text="Lançar em Grade...", command=self.abrir_grade_notas)
+        btn_grade.pack(side=tk.LEFT, padx=5)
+        
         # NOTAS DO ALUNO SELECIONADO
         ttk.Label(frame, text="Notas do Aluno:").grid(row=4, column=0, columnspan=2, padx=10, pady=5, sticky="w")
         
@@ -267,9 +1313,8 @@ class Aplicacao:
         
         # SELEÇÃO DE ALUNO
         ttk.Label(frame, text="Selecione o Aluno:").grid(row=0, column=0, padx=10, pady=10, sticky="w")
-        self.combo_alunos_consulta = ttk.Combobox(frame, width=50, state="readonly")
-        self.combo_alunos_consulta.grid(row=0, column=1, padx=10, pady=10, sticky="w")
-        self.combo_alunos_consulta.bind("<<ComboboxSelected>>", self.consultar_notas_aluno)
+        self.seletor_consulta = SeletorAluno(frame, self.banco, lambda matricula: self.consultar_notas_aluno(None))
+        self.seletor_consulta.grid(row=0, column=1, padx=10, pady=10, sticky="w")
         
         # TABELA DE NOTA DE ALUNO
         ttk.Label(frame, text="Notas do Aluno:").grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky="w")
@@ -288,10 +1333,64 @@ class Aplicacao:
         scrollbar.grid(row=2, column=2, sticky="ns")
         self.tabela_consulta.configure(yscrollcommand=scrollbar.set)
         
+        # MÉDIA DO ALUNO E POSIÇÃO NA CLASSIFICAÇÃO GERAL
+        self.label_media_consulta = ttk.Label(frame, text="")
+        self.label_media_consulta.grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+        
         # EXPANSÃO DE TABELA
         frame.columnconfigure(1, weight=1)
         frame.rowconfigure(2, weight=1)
     
+    def configurar_aba_estatisticas(self):
+        # DESEMPENHO POR DISCIPLINA
+        frame_disciplinas = ttk.LabelFrame(self.tab_estatisticas, text="Desempenho por Disciplina")
+        frame_disciplinas.pack(fill="both", expand=True, padx=20, pady=(20, 10))
+        
+        colunas = ("Disciplina", "Notas", "Média", "Mediana", "Desvio Padrão", "Aprovação (%)")
+        self.tabela_estatisticas = ttk.Treeview(frame_disciplinas, columns=colunas, show="headings", height=8)
+        
+        for col in colunas:
+            self.tabela_estatisticas.heading(col, text=col)
+            self.tabela_estatisticas.column(col, width=90)
+        
+        self.tabela_estatisticas.column("Disciplina", width=200)
+        self.tabela_estatisticas.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+        
+        scrollbar = ttk.Scrollbar(frame_disciplinas, orient="vertical", command=self.tabela_estatisticas.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.tabela_estatisticas.configure(yscrollcommand=scrollbar.set)
+        
+        frame_disciplinas.columnconfigure(0, weight=1)
+        frame_disciplinas.rowconfigure(0, weight=1)
+        
+        # CLASSIFICAÇÃO PELA MÉDIA GERAL OU POR UMA DISCIPLINA
+        frame_classificacao = ttk.LabelFrame(self.tab_estatisticas, text="Classificação")
+        frame_classificacao.pack(fill="both", expand=True, padx=20, pady=(10, 20))
+        
+        ttk.Label(frame_classificacao, text="Classificar por:").grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        self.combo_classificacao = ttk.Combobox(frame_classificacao, width=30, state="readonly")
+        self.combo_classificacao['values'] = ("Média geral",)
+        self.combo_classificacao.set("Média geral")
+        self.combo_classificacao.grid(row=0, column=1, padx=10, pady=10, sticky="w")
+        self.combo_classificacao.bind("<<ComboboxSelected>>", lambda event: self.atualizar_classificacao())
+        
+        colunas = ("Posição", "Matrícula", "Nome", "Nota")
+        self.tabela_classificacao = ttk.Treeview(frame_classificacao, columns=colunas, show="headings", height=10)
+        
+        for col in colunas:
+            self.tabela_classificacao.heading(col, text=col)
+            self.tabela_classificacao.column(col, width=80)
+        
+        self.tabela_classificacao.column("Nome", width=300)
+        self.tabela_classificacao.grid(row=1, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+        
+        scrollbar = ttk.Scrollbar(frame_classificacao, orient="vertical", command=self.tabela_classificacao.yview)
+        scrollbar.grid(row=1, column=2, sticky="ns")
+        self.tabela_classificacao.configure(yscrollcommand=scrollbar.set)
+        
+        frame_classificacao.columnconfigure(1, weight=1)
+        frame_classificacao.rowconfigure(1, weight=1)
+    
     def selecionar_aluno(self, event):
         # PUXAR ITEM SELECIONADO DA TABELA
         selecao = self.tabela_alunos.selection()
@@ -333,48 +1432,69 @@ class Aplicacao:
             return
         
         # VERIFICAÇÃO DE ALUNO JÁ EXISTENTE NO BANCO
+        def concluido(cadastrado: bool):
+            if cadastrado:
+                messagebox.showinfo("Sucesso", "Aluno cadastrado com sucesso!")
+                self.entry_matricula.delete(0, tk.END)
+                self.entry_nome.delete(0, tk.END)
+            else:
+                messagebox.showerror("Erro", f"Já existe um aluno com a matrícula {matricula}!")
         
-        if self.banco.cadastrar_aluno(matricula, nome):
-            messagebox.showinfo("Sucesso", "Aluno cadastrado com sucesso!")
-            self.entry_matricula.delete(0, tk.END)
-            self.entry_nome.delete(0, tk.END)
-            self.atualizar_tabela_alunos()
-            self.atualizar_combobox_alunos()
-            self.atualizar_combobox_consulta()
-        else:
-            messagebox.showerror("Erro", f"Já existe um aluno com a matrícula {matricula}!")
+        self.banco.chamar("cadastrar_aluno", matricula, nome,
+                          ao_concluir=concluido, ao_erro=self.mostrar_erro_banco)
     
     def excluir_aluno(self):
-        # VERIFICA ALUNO EXISTENTE NA TABELA
-        selecao = self.tabela_alunos.selection()
+        # VERIFICA ALUNOS SELECIONADOS NA TABELA (AS LINHAS USAM A MATRÍCULA COMO ID)
+        selecao = list(self.tabela_alunos.selection())
         if not selecao:
             messagebox.showwarning("Aviso", "Selecione um aluno para excluir!")
             return
         
-        # PUXA OS DADOS DO ALUNO SELECIONADO
-        item = self.tabela_alunos.item(selecao[0])
-        matricula, nome = item['values']
-        
         # CONFIRMAÇÃO DE EXCLUSÃO
-        resposta = messagebox.askyesno(
-            "Confirmar Exclusão",
-            f"Deseja realmente excluir o aluno {nome} (Matrícula: {matricula})?\n\n" +
-            "ATENÇÃO: Todas as notas deste aluno também serão excluídas!"
-        )
+        if len(selecao) == 1:
+            matricula = selecao[0]
+            nome = self.tabela_virtual.nome(matricula) or matricula
+            resposta = messagebox.askyesno(
+                "Confirmar Exclusão",
+                f"Deseja realmente excluir o aluno {nome} (Matrícula: {matricula})?\n\n" +
+                "ATENÇÃO: Todas as notas deste aluno também serão excluídas!"
+            )
+            sucesso = f"Aluno {nome} excluído com sucesso!"
+        else:
+            resposta = messagebox.askyesno(
+                "Confirmar Exclusão",
+                f"Deseja realmente excluir os {len(selecao)} alunos selecionados?\n\n" +
+                "ATENÇÃO: Todas as notas destes alunos também serão excluídas!"
+            )
+            sucesso = f"{len(selecao)} alunos excluídos com sucesso!"
         
         if resposta:
-            if self.banco.excluir_aluno(matricula):
-                messagebox.showinfo("Sucesso", f"Aluno {nome} excluído com sucesso!")
-                self.entry_matricula.delete(0, tk.END)
-                self.entry_nome.delete(0, tk.END)
-                self.atualizar_tabela_alunos()
-                self.atualizar_combobox_alunos()
-                self.atualizar_combobox_consulta()
-            else:
-                messagebox.showerror("Erro", f"Erro ao excluir o aluno {nome}!")
+            def concluido(excluidas: Optional[List[str]]):
+                if excluidas is not None:
+                    self.alunos_excluidos(excluidas)
+                    messagebox.showinfo("Sucesso", sucesso)
+                    self.entry_matricula.delete(0, tk.END)
+                    self.entry_nome.delete(0, tk.END)
+                else:
+                    messagebox.showerror("Erro", "Erro ao excluir! Nenhum aluno foi excluído.")
+            
+            # TODOS NUM ÚNICO COMANDO E COMMIT; A TABELA É ATUALIZADA PELOS EVENTOS DO BANCO
+            self.banco.chamar("excluir_alunos", selecao,
+                              ao_concluir=concluido, ao_erro=self.mostrar_erro_banco)
+    
+    def abrir_exclusao_alunos(self):
+        if self.exclusao_alunos is not None and self.exclusao_alunos.existe():
+            self.exclusao_alunos.janela.lift()
+            return
+        self.exclusao_alunos = ExclusaoAlunos(self.root, self.banco, self.alunos_excluidos)
+    
+    def alunos_excluidos(self, matriculas: List[str]):
+        # EXCLUSÕES GRANDES CHEGAM COMO RECARGA, SEM UM EVENTO POR ALUNO: A SELEÇÃO É LIMPA AQUI
+        for matricula in matriculas:
+            self.desselecionar_aluno(matricula)
     
     def cadastrar_nota(self):
-        if not self.combo_alunos_notas.get():
+        if not self.seletor_notas.matricula:
             messagebox.showerror("Erro", "Selecione um aluno!")
             return
         
@@ -392,28 +1512,28 @@ class Aplicacao:
             messagebox.showerror("Erro", "Digite um valor de nota válido!")
             return
         
-        matricula = self.combo_alunos_notas.get().split(" - ")[0]
+        matricula = self.seletor_notas.matricula
         
         # VERIFICAÇÃO DE NOTA DUPLICADA NO BANCO
+        def concluido(cadastrada: Optional[bool]):
+            if cadastrada:
+                # LIMPAR CAMPO (AS TABELAS SÃO ATUALIZADAS PELO EVENTO DO BANCO)
+                self.entry_disciplina.delete(0, tk.END)
+                self.entry_nota.delete(0, tk.END)
+                
+                # CURSOR PERSISTENTE EM DISCIPLINA
+                self.entry_disciplina.focus_set()
+            elif cadastrada is None:
+                messagebox.showerror("Erro", f"Aluno {matricula} não encontrado! Ele pode ter sido excluído.")
+            else:
+                messagebox.showerror("Erro", f"Já existe uma nota para a disciplina '{disciplina}' para este aluno!")
         
-        if self.banco.cadastrar_nota(disciplina, valor_nota, matricula):
-            # LIMPAR CAMPO E ATUALIZAR TABELA
-            self.entry_disciplina.delete(0, tk.END)
-            self.entry_nota.delete(0, tk.END)
-            self.exibir_notas_aluno(None)
-            
-            # CURSOR PERSISTENTE EM DISCIPLINA
-            self.entry_disciplina.focus_set()
-            
-            # ATUALIZAR ALUNO NA VISUALIZAÇÃO
-            if self.combo_alunos_consulta.get() and self.combo_alunos_consulta.get().split(" - ")[0] == matricula:
-                self.consultar_notas_aluno(None)
-        else:
-            messagebox.showerror("Erro", f"Já existe uma nota para a disciplina '{disciplina}' para este aluno!")
+        self.banco.chamar("cadastrar_nota", disciplina, valor_nota, matricula,
+                          ao_concluir=concluido, ao_erro=self.mostrar_erro_banco)
     
     def excluir_nota(self):
         # VERIFICA ALUNO NO COMBOX
-        if not self.combo_alunos_notas.get():
+        if not self.seletor_notas.matricula:
             messagebox.showwarning("Aviso", "Selecione um aluno!")
             return
         
@@ -428,7 +1548,7 @@ class Aplicacao:
         disciplina, valor = item['values']
         
         # PUXA A MATRÍCULA DO ALUNO SELECIONADO
-        matricula = self.combo_alunos_notas.get().split(" - ")[0]
+        matricula = self.seletor_notas.matricula
         
         # CONFIRMA EXCCLUSÃO
         resposta = messagebox.askyesno(
@@ -437,84 +1557,440 @@ class Aplicacao:
         )
         
         if resposta:
-            if self.banco.excluir_nota(disciplina, matricula):
-                messagebox.showinfo("Sucesso", f"Nota da disciplina '{disciplina}' excluída com sucesso!")
-                self.entry_disciplina.delete(0, tk.END)
-                self.entry_nota.delete(0, tk.END)
-                self.exibir_notas_aluno(None)
-                
-                # ATUALIZAR ALUNO NA VISUALIZAÇÃO
-                if self.combo_alunos_consulta.get() and self.combo_alunos_consulta.get().split(" - ")[0] == matricula:
-                    self.consultar_notas_aluno(None)
+            def concluido(excluida: bool):
+                if excluida:
+                    messagebox.showinfo("Sucesso", f"Nota da disciplina '{disciplina}' excluída com sucesso!")
+                    self.entry_disciplina.delete(0, tk.END)
+                    self.entry_nota.delete(0, tk.END)
+                else:
+                    messagebox.showerror("Erro", f"Erro ao excluir a nota da disciplina '{disciplina}'!")
+            
+            self.banco.chamar("excluir_nota", disciplina, matricula,
+                              ao_concluir=concluido, ao_erro=self.mostrar_erro_banco)
+    
+    def escolher_arquivo_importacao(self, titulo: str) -> str:
+        return filedialog.askopenfilename(
+            title=titulo,
+            filetypes=[("CSV ou JSONL", "*.csv *.jsonl *.json"), ("Todos os arquivos", "*.*")]
+        )
+    
+    def mostrar_resultado_importacao(self, resultado: ResultadoImportacao, tipo: str):
+        if resultado.erro:
+            messagebox.showerror("Erro", f"Nada foi importado. Erro ao importar {tipo}: {resultado.erro}")
+            return
+        
+        mensagem = f"{resultado.inseridos} {tipo} importados."
+        if resultado.rejeitados:
+            mensagem += f"\n\n{len(resultado.rejeitados)} linhas recusadas:"
+            # MOSTRA SÓ AS PRIMEIRAS PARA A JANELA NÃO FICAR GIGANTE
+            for linha, motivo in resultado.rejeitados[:15]:
+                mensagem += f"\nLinha {linha}: {motivo}"
+            if len(resultado.rejeitados) > 15:
+                mensagem += "\n..."
+        messagebox.showinfo("Importação", mensagem)
+    
+    def importar_alunos(self):
+        arquivo = self.escolher_arquivo_importacao("Importar Alunos")
+        if not arquivo:
+            return
+        
+        try:
+            registros = ler_registros(arquivo)
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
+        
+        # O ARQUIVO É LIDO NA THREAD DO BANCO, JUNTO COM A GRAVAÇÃO
+        self.banco.chamar(
+            "importar_alunos", registros,
+            descricao="Importando alunos...",
+            ao_concluir=lambda resultado: self.mostrar_resultado_importacao(resultado, "alunos"),
+            ao_erro=self.mostrar_erro_banco
+        )
+    
+    def importar_notas(self):
+        arquivo = self.escolher_arquivo_importacao("Importar Notas")
+        if not arquivo:
+            return
+        
+        try:
+            registros = ler_registros(arquivo)
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
+        
+        # O ARQUIVO É LIDO NA THREAD DO BANCO, JUNTO COM A GRAVAÇÃO
+        self.banco.chamar(
+            "importar_notas", registros,
+            descricao="Importando notas...",
+            ao_concluir=lambda resultado: self.mostrar_resultado_importacao(resultado, "notas"),
+            ao_erro=self.mostrar_erro_banco
+        )
+    
+    def exportar_boletins(self):
+        arquivo = filedialog.asksaveasfilename(
+            title="Exportar Boletins", defaultextension=".html",
+            filetypes=[("Página HTML", "*.html"), ("CSV", "*.csv"), ("JSONL", "*.jsonl"), ("Todos os arquivos", "*.*")]
+        )
+        if not arquivo:
+            return
+        
+        self.banco.chamar(
+            _exportar_boletins, arquivo,
+            descricao="Exportando boletins...",
+            ao_concluir=lambda total: messagebox.showinfo("Exportação", f"{total} boletins exportados para {arquivo}."),
+            ao_erro=lambda erro: messagebox.showerror("Erro", f"Erro ao exportar boletins: {erro}")
+        )
+    
+    def gerar_boletins(self):
+        # UM ARQUIVO HTML POR FAIXA DE MATRÍCULAS, EM PROCESSOS SEPARADOS COM CONEXÕES SÓ DE LEITURA.
+        # O CAMINHO DO BANCO VEM DA THREAD DO BANCO, QUE É QUEM O ABRIU
+        pasta = filedialog.askdirectory(title="Pasta dos Boletins")
+        if not pasta:
+            return
+        self.banco.chamar(lambda banco: banco.arquivo_db, ao_erro=self.mostrar_erro_banco,
+                          ao_concluir=lambda arquivo_db: self.iniciar_boletins(arquivo_db, pasta))
+    
+    def iniciar_boletins(self, arquivo_db: str, pasta: str):
+        def gerar(progresso: Callable[[int, int], None]):
+            from boletins import gerar_boletins_paralelo
+            return gerar_boletins_paralelo(arquivo_db, pasta, progresso=progresso)
+        
+        def concluido(resultado: Tuple[int, List[str]]):
+            total, arquivos = resultado
+            messagebox.showinfo("Boletins", f"{total} boletins gravados em {len(arquivos)} arquivos na pasta {pasta}.")
+        
+        self.executar_com_progresso("Boletins", "Gerando boletins", gerar, concluido, "Erro ao gerar boletins")
+    
+    def copiar_banco(self):
+        # CÓPIA DE SEGURANÇA COM A JANELA ABERTA, EM PASSOS E NUMA CONEXÃO PRÓPRIA (replicacao.py)
+        destino = filedialog.asksaveasfilename(
+            title="Cópia de Segurança", defaultextension=".db",
+            filetypes=[("Banco SQLite", "*.db"), ("Todos os arquivos", "*.*")]
+        )
+        if not destino:
+            return
+        self.banco.chamar(lambda banco: banco.arquivo_db, ao_erro=self.mostrar_erro_banco,
+                          ao_concluir=lambda arquivo_db: self.iniciar_copia(arquivo_db, destino))
+    
+    def iniciar_copia(self, arquivo_db: str, destino: str):
+        def copiar(progresso: Callable[[int, int], None]):
+            from replicacao import copiar_banco
+            return copiar_banco(arquivo_db, destino, progresso=progresso)
+        
+        self.executar_com_progresso(
+            "Cópia de Segurança", "Copiando páginas do banco", copiar,
+            lambda paginas: messagebox.showinfo("Cópia de Segurança", f"Banco copiado para {destino}."),
+            "Erro ao copiar o banco"
+        )
+    
+    def executar_com_progresso(self, titulo: str, texto: str, tarefa: Callable[[Callable[[int, int], None]], Any],
+                               ao_concluir: Callable[[Any], None], mensagem_erro: str):
+        # tarefa(progresso) RODA NUMA THREAD PRÓPRIA: A THREAD DO BANCO CONTINUA ATENDENDO A JANELA.
+        # O PROGRESSO CHEGA POR UMA FILA, LIDA PELO Tk A CADA INTERVALO_PROGRESSO
+        avisos: "queue.Queue[tuple]" = queue.Queue()
+        
+        def executar():
+            try:
+                resultado = tarefa(lambda feitos, total: avisos.put(("progresso", feitos, total)))
+                avisos.put(("fim", resultado))
+            except Exception as e:
+                avisos.put(("erro", e))
+        
+        janela = tk.Toplevel(self.root)
+        janela.title(titulo)
+        janela.transient(self.root)
+        janela.protocol("WM_DELETE_WINDOW", lambda: None)
+        label = ttk.Label(janela, text=f"{texto}...")
+        label.pack(padx=20, pady=(20, 5))
+        barra = ttk.Progressbar(janela, mode="determinate", length=300)
+        barra.pack(padx=20, pady=(5, 20))
+        
+        threading.Thread(target=executar, name=titulo, daemon=True).start()
+        self.root.after(INTERVALO_PROGRESSO, self.acompanhar_progresso, avisos, janela, label, barra,
+                        texto, ao_concluir, mensagem_erro)
+    
+    def acompanhar_progresso(self, avisos: "queue.Queue[tuple]", janela: tk.Toplevel, label: ttk.Label,
+                             barra: ttk.Progressbar, texto: str, ao_concluir: Callable[[Any], None],
+                             mensagem_erro: str):
+        while True:
+            try:
+                aviso = avisos.get_nowait()
+            except queue.Empty:
+                break
+            
+            if aviso[0] == "progresso":
+                _, feitos, total = aviso
+                barra.configure(maximum=max(total, 1), value=feitos)
+                label.config(text=f"{texto}: {feitos} de {total}")
+                continue
+            
+            janela.destroy()
+            if aviso[0] == "fim":
+                ao_concluir(aviso[1])
             else:
-                messagebox.showerror("Erro", f"Erro ao excluir a nota da disciplina '{disciplina}'!")
+                messagebox.showerror("Erro", f"{mensagem_erro}: {aviso[1]}")
+            return
+        
+        self.root.after(INTERVALO_PROGRESSO, self.acompanhar_progresso, avisos, janela, label, barra,
+                        texto, ao_concluir, mensagem_erro)
     
     def atualizar_tabela_alunos(self):
-        # LIMPAR TABELA
-        for item in self.tabela_alunos.get_children():
-            self.tabela_alunos.delete(item)
-        
-        # PREENCHER COM BANDO DE DADOS
-        for aluno in self.banco.listar_alunos():
-            self.tabela_alunos.insert("", "end", values=aluno)
-    
-    def atualizar_combobox_alunos(self):
-        alunos = self.banco.listar_alunos()
-        opcoes = [f"{a[0]} - {a[1]}" for a in alunos]
-        self.combo_alunos_notas['values'] = opcoes
-        
-        # SELECIONAR PRIMEIRO ITEM
-        if opcoes:
-            self.combo_alunos_notas.current(0)
-            self.exibir_notas_aluno(None)
-    
-    def atualizar_combobox_consulta(self):
-        alunos = self.banco.listar_alunos()
-        opcoes = [f"{a[0]} - {a[1]}" for a in alunos]
-        self.combo_alunos_consulta['values'] = opcoes
-        
-        # SELECIONAR O PRIMEIRO ITEM
-        if opcoes:
-            self.combo_alunos_consulta.current(0)
-            self.consultar_notas_aluno(None)
+        # SÓ A JANELA VISÍVEL É BUSCADA NO BANCO
+        self.tabela_virtual.recarregar()
     
-    def exibir_notas_aluno(self, event):
-        if not self.combo_alunos_notas.get():
+    def carregar_alunos(self, selecionar: bool = False):
+        # UMA BUSCA SÓ (TOTAL E PRIMEIRA PÁGINA) PREENCHE A TABELA DE ALUNOS E DIZ QUEM É O PRIMEIRO
+        # ALUNO PARA OS SELETORES DAS OUTRAS ABAS. selecionar SÓ NA PRIMEIRA CARGA: NAS RECARGAS
+        # (IMPORTAÇÃO, SINCRONIZAÇÃO) OS SELETORES QUE O USUÁRIO DEIXOU VAZIOS CONTINUAM VAZIOS
+        self.alunos_carregados = False
+        self.tabela_virtual.recarregar(depois=lambda: self.lista_alunos_carregada(selecionar))
+    
+    def lista_alunos_carregada(self, selecionar: bool):
+        self.root.after_idle(self.marcar_abertura, "alunos")
+        if self.tabela_virtual.inicio == 0:
+            self.definir_primeiro_aluno(self.tabela_virtual.linhas[:1], selecionar)
+        else:
+            # TABELA ROLADA: A JANELA CARREGADA NÃO COMEÇA NO PRIMEIRO ALUNO
+            self.buscar_primeiro_aluno(selecionar)
+    
+    def buscar_primeiro_aluno(self, selecionar: bool = True):
+        self.banco.chamar("listar_alunos_pagina", limite=1, chave="primeiro_aluno",
+                          ao_concluir=lambda alunos: self.definir_primeiro_aluno(alunos, selecionar))
+    
+    def definir_primeiro_aluno(self, alunos: List[Tuple[str, str]], selecionar: bool = True):
+        self.primeiro_aluno = alunos[0] if alunos else None
+        self.alunos_carregados = True
+        if selecionar:
+            self.selecionar_primeiro_aluno()
+    
+    def selecionar_primeiro_aluno(self):
+        # COMO ANTES COM OS COMBOBOX, OS SELETORES SEM ALUNO ESCOLHIDO COMEÇAM NO PRIMEIRO DA LISTA.
+        # ANTES DE A LISTA CHEGAR NÃO HÁ O QUE FAZER: definir_primeiro_aluno CHAMA DE NOVO
+        if not self.alunos_carregados or self.primeiro_aluno is None:
             return
+        matricula, nome = self.primeiro_aluno
+        for seletor, _, recarregar in self.paineis_notas:
+            if seletor.matricula is None:
+                seletor.selecionar(matricula, nome)
+                recarregar(None)
+    
+    def carregar_disciplinas(self):
+        def carregadas(disciplinas: List[str]):
+            self.disciplinas = disciplinas
+            self.mostrar_disciplinas()
         
-        matricula = self.combo_alunos_notas.get().split(" - ")[0]
+        self.banco.chamar("listar_disciplinas", chave="disciplinas", ao_concluir=carregadas)
+    
+    def mostrar_disciplinas(self):
+        # SÓ NAS ABAS JÁ MONTADAS; AS OUTRAS CARREGAM AS DISCIPLINAS AO SEREM MONTADAS
+        if self.aba_montada(self.tab_cadastro_nota):
+            self.entry_disciplina['values'] = self.disciplinas[:LIMITE_SUGESTOES]
+        if self.aba_montada(self.tab_estatisticas):
+            self.combo_classificacao['values'] = ["Média geral"] + self.disciplinas
+    
+    def completar_disciplina(self, event):
+        # O QUE O USUÁRIO DIGITOU VAI ATÉ O CURSOR; O RESTO SELECIONADO É SUGESTÃO
+        prefixo = self.entry_disciplina.get()[:self.entry_disciplina.index(tk.INSERT)]
+        dobrado = prefixo.casefold()
+        opcoes = [d for d in self.disciplinas if d.casefold().startswith(dobrado)]
+        self.entry_disciplina['values'] = opcoes[:LIMITE_SUGESTOES]
+        
+        # COMPLETA NO PRÓPRIO CAMPO SÓ QUANDO UM CARACTERE FOI DIGITADO (NÃO EM APAGAR/SETAS)
+        if prefixo and opcoes and event.char and event.char.isprintable():
+            self.entry_disciplina.delete(0, tk.END)
+            self.entry_disciplina.insert(0, opcoes[0])
+            self.entry_disciplina.icursor(len(prefixo))
+            self.entry_disciplina.selection_range(len(prefixo), tk.END)
+    
+    def aplicar_evento(self, evento: Evento):
+        if evento.tipo == ALUNO_INSERIDO:
+            self.tabela_virtual.inserir(evento.matricula, evento.nome)
+            primeiro = self.primeiro_aluno
+            # SÓ ATUALIZA QUEM É O PRIMEIRO: UM ALUNO NOVO (TALVEZ DE OUTRO USUÁRIO) NÃO MEXE NOS SELETORES
+            if self.alunos_carregados and (primeiro is None or (evento.nome, evento.matricula) < (primeiro[1], primeiro[0])):
+                self.primeiro_aluno = (evento.matricula, evento.nome)
+        elif evento.tipo == ALUNO_EXCLUIDO:
+            self.tabela_virtual.remover(evento.matricula, evento.nome)
+            self.desselecionar_aluno(evento.matricula)
+            if self.primeiro_aluno is not None and self.primeiro_aluno[0] == evento.matricula:
+                # SÓ ATUALIZA QUEM É O PRIMEIRO: OS SELETORES LIMPOS CONTINUAM VAZIOS, COMO ANTES
+                self.buscar_primeiro_aluno(selecionar=False)
+        elif evento.tipo in (NOTA_INSERIDA, NOTA_ALTERADA):
+            indice = bisect_left(self.disciplinas, evento.disciplina)
+            if indice == len(self.disciplinas) or self.disciplinas[indice] != evento.disciplina:
+                self.disciplinas.insert(indice, evento.disciplina)
+                if self.aba_montada(self.tab_estatisticas):
+                    self.combo_classificacao['values'] = ["Média geral"] + self.disciplinas
+            for tabela in self.tabelas_notas_de(evento.matricula):
+                self.inserir_nota_tabela(tabela, evento.disciplina, evento.valor)
+        elif evento.tipo == NOTA_EXCLUIDA:
+            for tabela in self.tabelas_notas_de(evento.matricula):
+                if tabela.exists(evento.disciplina):
+                    tabela.delete(evento.disciplina)
+        elif evento.tipo == ALUNOS_RECARREGADOS:
+            self.carregar_alunos()
+        elif evento.tipo == NOTAS_RECARREGADAS:
+            if self.aba_montada(self.tab_cadastro_nota) or self.aba_montada(self.tab_estatisticas):
+                self.carregar_disciplinas()
+            for _, _, recarregar in self.paineis_notas:
+                recarregar(None)
+        
+        if self.grade_notas is not None and self.grade_notas.existe():
+            self.grade_notas.aplicar_evento(evento)
+        
+        # QUALQUER NOTA QUE MUDA (TAMBÉM AS DE UM ALUNO EXCLUÍDO) MEXE NOS RESUMOS
+        if evento.tipo in (NOTA_INSERIDA, NOTA_ALTERADA, NOTA_EXCLUIDA, NOTAS_RECARREGADAS, ALUNO_EXCLUIDO):
+            if (evento.tipo != NOTAS_RECARREGADAS and self.aba_montada(self.tab_consulta)
+                    and evento.matricula == self.seletor_consulta.matricula):
+                self.atualizar_media_consulta()
+            self.estatisticas_desatualizadas = True
+            if self.aba_estatisticas_visivel():
+                self.atualizar_estatisticas()
+    
+    def desselecionar_aluno(self, matricula: str):
+        # ALUNO EXCLUÍDO ESTAVA SELECIONADO: LIMPA A SELEÇÃO E AS NOTAS DELE
+        for seletor, tabela, _ in self.paineis_notas:
+            if seletor.matricula == matricula:
+                seletor.limpar()
+                self.limpar_tabela(tabela)
+        if self.aba_montada(self.tab_consulta) and self.seletor_consulta.matricula is None:
+            self.label_media_consulta.config(text="")
+    
+    def tabelas_notas_de(self, matricula: str) -> List[ttk.Treeview]:
+        # TABELAS DE NOTAS QUE ESTÃO MOSTRANDO O ALUNO INFORMADO
+        return [tabela for seletor, tabela, _ in self.paineis_notas if seletor.matricula == matricula]
+    
+    def inserir_nota_tabela(self, tabela: ttk.Treeview, disciplina: str, valor: float):
+        if tabela.exists(disciplina):
+            tabela.item(disciplina, values=(disciplina, valor))
+            return
         
-        # LIMPAR TABELA
-        for item in self.tabela_notas.get_children():
-            self.tabela_notas.delete(item)
+        # AS LINHAS USAM A DISCIPLINA COMO ID, ENTÃO A POSIÇÃO ORDENADA SAI DIRETO DOS IDS
+        indice = bisect_left(tabela.get_children(), disciplina)
+        tabela.insert("", indice, iid=disciplina, values=(disciplina, valor))
+    
+    def limpar_tabela(self, tabela: ttk.Treeview):
+        tabela.delete(*tabela.get_children())
+    
+    def exibir_notas_aluno(self, event):
+        matricula = self.seletor_notas.matricula
+        if not matricula:
+            return
+        
+        def preencher(notas: List[Tuple[str, float]]):
+            # LIMPAR TABELA
+            self.limpar_tabela(self.tabela_notas)
+            
+            # PREENCHER COM DADOS DO ALUNO
+            for disciplina, valor in notas:
+                self.tabela_notas.insert("", "end", iid=disciplina, values=(disciplina, valor))
         
-        # PREENCHER COM DADOS DO ALUNO
-        notas = self.banco.buscar_notas_aluno(matricula)
-        for nota in notas:
-            self.tabela_notas.insert("", "end", values=nota)
+        # SÓ A RESPOSTA DA ÚLTIMA SELEÇÃO É APLICADA
+        self.banco.chamar("buscar_notas_aluno", matricula, chave="notas_cadastro", ao_concluir=preencher)
     
     def consultar_notas_aluno(self, event):
-        if not self.combo_alunos_consulta.get():
+        matricula = self.seletor_consulta.matricula
+        if not matricula:
+            return
+        
+        def preencher(notas: List[Tuple[str, float]]):
+            # LIMPAR TABELA
+            self.limpar_tabela(self.tabela_consulta)
+            
+            # PREENCHER COM DADOS DO ALUNO
+            for disciplina, valor in notas:
+                self.tabela_consulta.insert("", "end", iid=disciplina, values=(disciplina, valor))
+        
+        # SÓ A RESPOSTA DA ÚLTIMA SELEÇÃO É APLICADA
+        self.banco.chamar("buscar_notas_aluno", matricula, chave="notas_consulta", ao_concluir=preencher)
+        self.atualizar_media_consulta()
+    
+    def atualizar_media_consulta(self):
+        matricula = self.seletor_consulta.matricula
+        if not matricula:
             return
         
-        matricula = self.combo_alunos_consulta.get().split(" - ")[0]
+        def mostrar(media: Optional[Tuple[float, int, int]]):
+            if media is None:
+                self.label_media_consulta.config(text="Aluno sem notas cadastradas")
+                return
+            valor, quantidade, posicao = media
+            self.label_media_consulta.config(
+                text=f"Média: {valor:.2f} em {quantidade} disciplina(s) - {posicao}º na classificação geral"
+            )
+        
+        self.banco.chamar("media_aluno", matricula, chave="media_consulta", ao_concluir=mostrar)
+    
+    def aba_estatisticas_visivel(self) -> bool:
+        return self.notebook.select() == str(self.tab_estatisticas)
+    
+    def trocar_aba(self, event):
+        montar = self.montagens.pop(self.notebook.select(), None)
+        if montar is not None:
+            montar()
+        if self.estatisticas_desatualizadas and self.aba_estatisticas_visivel():
+            self.atualizar_estatisticas()
+    
+    def atualizar_estatisticas(self):
+        # OS NÚMEROS VÊM DAS TABELAS DE RESUMO, ENTÃO ISTO É RÁPIDO MESMO COM MILHÕES DE NOTAS
+        self.estatisticas_desatualizadas = False
+        
+        def preencher(estatisticas: List[Tuple[str, int, float, float, float, float]]):
+            self.limpar_tabela(self.tabela_estatisticas)
+            for disciplina, quantidade, media, mediana, desvio, aprovacao in estatisticas:
+                self.tabela_estatisticas.insert("", "end", iid=disciplina, values=(
+                    disciplina, quantidade, f"{media:.2f}", f"{mediana:.2f}", f"{desvio:.2f}", f"{aprovacao:.1f}"
+                ))
+        
+        self.banco.chamar("estatisticas_disciplinas", chave="estatisticas", ao_concluir=preencher)
+        self.atualizar_classificacao()
+    
+    def atualizar_classificacao(self):
+        escolha = self.combo_classificacao.get()
+        disciplina = None if escolha == "Média geral" else escolha
         
-        # LIMPAR TABELA
-        for item in self.tabela_consulta.get_children():
-            self.tabela_consulta.delete(item)
+        def preencher(classificacao: List[Tuple[int, str, str, float]]):
+            self.limpar_tabela(self.tabela_classificacao)
+            for posicao, matricula, nome, valor in classificacao:
+                self.tabela_classificacao.insert("", "end", values=(f"{posicao}º", matricula, nome, f"{valor:.2f}"))
         
-        # PREENCHER COM DADOS DO ALUNO
-        notas = self.banco.buscar_notas_aluno(matricula)
-        for nota in notas:
-            self.tabela_consulta.insert("", "end", values=nota)
+        self.banco.chamar("classificacao_alunos", disciplina, chave="classificacao", ao_concluir=preencher)
     
     def fechar(self):
         # COMO O PROFESSOR ENSINOU FECHAR CONEXÃO COM O BANCO DE DADOS
+        self.root.after_cancel(self.id_despacho)
+        if self.janela_diagnostico is not None and self.janela_diagnostico.existe():
+            self.janela_diagnostico.fechar()
+        for janela in (self.grade_notas, self.exclusao_alunos):
+            if janela is not None and janela.existe():
+                janela.janela.destroy()
         self.banco.fechar()
         self.root.destroy()
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Cadastro e consulta de notas.")
+    parser.add_argument("--servidor", metavar="URL", help="usa o banco de um servidor (python -m servidor) em vez do arquivo local")
+    parser.add_argument("--token", help="token exigido pelo servidor")
+    parser.add_argument(
+        "--tempo-abertura", action="store_true",
+        help="mostra na saída de erros quanto a janela levou para aparecer e para mostrar os alunos"
+    )
+    args = parser.parse_args()
+    
+    medir = None
+    if args.tempo_abertura:
+        import sys
+        medir = lambda etapa, segundos: print(f"abertura ({etapa}): {segundos * 1000:.0f} ms", file=sys.stderr)
+    
     root = tk.Tk()
-    app = Aplicacao(root)
+    if args.servidor:
+        from cliente_remoto import ClienteRemoto
+        app = Aplicacao(root, lambda: ClienteRemoto(args.servidor, args.token),
+                        f"Sistema de Cadastro e Consulta de Notas - {args.servidor}", medir, remoto=True)
+    else:
+        app = Aplicacao(root, ao_medir_abertura=medir)
     root.mainloop()
\ No newline at end of file
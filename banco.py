@@ -0,0 +1,1536 @@
+# CAMADA DE DADOS DO SISTEMA DE NOTAS. NÃO IMPORTA tkinter: SCRIPTS, TAREFAS AGENDADAS
+# E A LINHA DE COMANDO (notas_cli.py) USAM O Banco SEM PRECISAR DE INTERFACE GRÁFICA
+import sqlite3
+import csv
+import json
+import re
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from html import escape
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import List, Tuple, Optional, Iterable, Iterator, Dict, Any, Callable, NamedTuple, TYPE_CHECKING
+import os
+from pathlib import Path
+
+if TYPE_CHECKING:
+    # SÓ PARA AS ANOTAÇÕES: instrumentacao É IMPORTADO POR QUEM LIGA A MEDIÇÃO
+    from instrumentacao import Instrumentacao
+
+# QUANTIDADE DE LINHAS POR executemany NA IMPORTAÇÃO EM MASSA
+TAMANHO_LOTE_IMPORTACAO = 5000
+# QUANTIDADE DE LINHAS POR fetchmany AO PERCORRER TABELAS INTEIRAS (EXPORTAÇÃO)
+TAMANHO_LOTE_LEITURA = 1000
+
+# CACHE DE LEITURAS DO BANCO: QUANTOS ALUNOS TÊM AS NOTAS GUARDADAS E O LIMITE APROXIMADO
+# DE MEMÓRIA (BYTES) DESSAS NOTAS. A LISTA DE ALUNOS SÓ É GUARDADA SE COUBER NO MESMO LIMITE
+TAMANHO_CACHE_NOTAS = 512
+MEMORIA_CACHE = 8 * 1024 * 1024
+
+# PERFIS DE CONEXÃO (Banco(perfil=...)): PRAGMAS APLICADOS AO ABRIR O ARQUIVO, NESTA ORDEM
+PERFIS_CONEXAO = {
+    # DIÁRIO WAL (QUEM LÊ NÃO ESPERA QUEM ESCREVE) E fsync A CADA COMMIT
+    "seguro": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    # fsync SÓ NOS CHECKPOINTS DO WAL: UMA QUEDA DE ENERGIA PODE PERDER OS ÚLTIMOS COMMITS,
+    # MAS NÃO CORROMPE O ARQUIVO. PARA IMPORTAÇÕES E RELATÓRIOS GRANDES
+    "rapido": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # COMPORTAMENTO ORIGINAL DO SQLITE, PARA PASTAS DE REDE ONDE O WAL NÃO FUNCIONA
+    "compativel": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+}
+PERFIL_PADRAO = "seguro"
+
+# NOTA MÍNIMA PARA APROVAÇÃO (FICA GRAVADA NOS GATILHOS DA MIGRAÇÃO 5)
+NOTA_APROVACAO = 6.0
+# QUANTIDADE DE LINHAS NA CLASSIFICAÇÃO DA ABA DE ESTATÍSTICAS
+LIMITE_CLASSIFICACAO = 50
+# MÁXIMO DE ALUNOS NA GRADE DE LANÇAMENTO DE NOTAS (listar_notas_disciplina)
+LIMITE_GRADE = 500
+# salvar_notas E excluir_alunos ACIMA DISSO PUBLICAM UM EVENTO DE RECARGA EM VEZ DE UM POR LINHA
+LIMITE_EVENTOS_LOTE = 500
+
+# COMANDOS DOS GATILHOS QUE MANTÊM OS RESUMOS DE notas. UMA NOTA ALTERADA É RETIRADA
+# COM O VALOR ANTIGO E ACRESCENTADA COM O NOVO. AS NOTAS SÃO AGRUPADAS EM FAIXAS DE 0,1
+# (faixa = valor * 10) PARA A MEDIANA SAIR SEM ORDENAR TODAS AS NOTAS DA DISCIPLINA.
+# A MÉDIA GUARDADA É ARREDONDADA PARA O ERRO DAS SOMAS SUCESSIVAS NÃO DESEMPATAR ALUNOS
+# COM A MESMA MÉDIA NA CLASSIFICAÇÃO
+_ACRESCENTAR_NOTA = f"""
+            INSERT INTO estatisticas_aluno (aluno_matricula, quantidade, soma, media)
+            VALUES (new.aluno_matricula, 1, new.valor, round(new.valor, 9))
+            ON CONFLICT (aluno_matricula) DO UPDATE SET
+                quantidade = quantidade + 1,
+                soma = soma + excluded.soma,
+                media = round((soma + excluded.soma) / (quantidade + 1), 9);
+            INSERT INTO estatisticas_disciplina (disciplina_id, quantidade, soma, soma_quadrados, aprovados)
+            VALUES (new.disciplina_id, 1, new.valor, new.valor * new.valor, new.valor >= {NOTA_APROVACAO})
+            ON CONFLICT (disciplina_id) DO UPDATE SET
+                quantidade = quantidade + 1,
+                soma = soma + excluded.soma,
+                soma_quadrados = soma_quadrados + excluded.soma_quadrados,
+                aprovados = aprovados + excluded.aprovados;
+            INSERT INTO histograma_notas (disciplina_id, faixa, quantidade)
+            VALUES (new.disciplina_id, CAST(round(new.valor * 10) AS INTEGER), 1)
+            ON CONFLICT (disciplina_id, faixa) DO UPDATE SET quantidade = quantidade + 1;"""
+_RETIRAR_NOTA = f"""
+            UPDATE estatisticas_aluno SET
+                quantidade = quantidade - 1,
+                soma = soma - old.valor,
+                media = CASE WHEN quantidade > 1 THEN round((soma - old.valor) / (quantidade - 1), 9) ELSE 0 END
+            WHERE aluno_matricula = old.aluno_matricula;
+            DELETE FROM estatisticas_aluno WHERE aluno_matricula = old.aluno_matricula AND quantidade = 0;
+            UPDATE estatisticas_disciplina SET
+                quantidade = quantidade - 1,
+                soma = soma - old.valor,
+                soma_quadrados = soma_quadrados - old.valor * old.valor,
+                aprovados = aprovados - (old.valor >= {NOTA_APROVACAO})
+            WHERE disciplina_id = old.disciplina_id;
+            DELETE FROM estatisticas_disciplina WHERE disciplina_id = old.disciplina_id AND quantidade = 0;
+            UPDATE histograma_notas SET quantidade = quantidade - 1
+            WHERE disciplina_id = old.disciplina_id AND faixa = CAST(round(old.valor * 10) AS INTEGER);
+            DELETE FROM histograma_notas
+            WHERE disciplina_id = old.disciplina_id AND faixa = CAST(round(old.valor * 10) AS INTEGER)
+              AND quantidade = 0;"""
+
+
+def _anotar(matricula: str, disciplina_id: str) -> str:
+    # COMANDOS DE GATILHO QUE LEVAM A CHAVE PARA O FIM DO DIÁRIO. DELETE + INSERT E NÃO
+    # INSERT OR REPLACE: O OR DO COMANDO DE FORA (EX.: INSERT OR IGNORE) VALERIA TAMBÉM AQUI DENTRO
+    return f"""
+            DELETE FROM diario WHERE matricula = {matricula} AND disciplina_id = {disciplina_id};
+            INSERT INTO diario (matricula, disciplina_id) VALUES ({matricula}, {disciplina_id});"""
+
+
+# MIGRAÇÕES DO ESQUEMA: A POSIÇÃO NA LISTA É A VERSÃO GRAVADA EM PRAGMA user_version DEPOIS DELA.
+# CADA MIGRAÇÃO É UMA SEQUÊNCIA DE COMANDOS EXECUTADOS NUMA ÚNICA TRANSAÇÃO.
+# NUNCA ALTERAR UMA MIGRAÇÃO JÁ PUBLICADA, SÓ ACRESCENTAR NOVAS NO FINAL.
+MIGRACOES = [
+    # 1: TABELAS ORIGINAIS (IF NOT EXISTS PORQUE OS ARQUIVOS ANTIGOS JÁ AS TÊM COM user_version = 0)
+    (
+        """CREATE TABLE IF NOT EXISTS alunos (
+            matricula TEXT PRIMARY KEY,
+            nome TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS notas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            disciplina TEXT NOT NULL,
+            valor REAL NOT NULL,
+            aluno_matricula TEXT NOT NULL,
+            FOREIGN KEY (aluno_matricula) REFERENCES alunos (matricula),
+            UNIQUE(disciplina, aluno_matricula)
+        )""",
+    ),
+    # 2: ÍNDICES DAS CONSULTAS QUENTES. O UNIQUE DE notas COMEÇA POR disciplina E NÃO SERVE
+    # PARA BUSCAR AS NOTAS DE UM ALUNO; A LISTA DE ALUNOS É ORDENADA POR (nome, matricula)
+    (
+        "CREATE INDEX IF NOT EXISTS idx_notas_aluno ON notas (aluno_matricula, disciplina, valor)",
+        "CREATE INDEX IF NOT EXISTS idx_alunos_nome ON alunos (nome, matricula)",
+    ),
+    # 3: DICIONÁRIO DE DISCIPLINAS. notas GUARDA SÓ O ID INTEIRO E PASSA A SER ORGANIZADA PELA
+    # CHAVE (aluno_matricula, disciplina_id), QUE JÁ COBRE A BUSCA DAS NOTAS DE UM ALUNO
+    (
+        """CREATE TABLE disciplinas (
+            id INTEGER PRIMARY KEY,
+            nome TEXT NOT NULL UNIQUE
+        )""",
+        "INSERT INTO disciplinas (nome) SELECT DISTINCT disciplina FROM notas ORDER BY disciplina",
+        """CREATE TABLE notas_nova (
+            aluno_matricula TEXT NOT NULL,
+            disciplina_id INTEGER NOT NULL,
+            valor REAL NOT NULL,
+            PRIMARY KEY (aluno_matricula, disciplina_id),
+            FOREIGN KEY (aluno_matricula) REFERENCES alunos (matricula),
+            FOREIGN KEY (disciplina_id) REFERENCES disciplinas (id)
+        ) WITHOUT ROWID""",
+        """INSERT INTO notas_nova (aluno_matricula, disciplina_id, valor)
+            SELECT n.aluno_matricula, d.id, n.valor
+            FROM notas AS n JOIN disciplinas AS d ON d.nome = n.disciplina""",
+        "DROP TABLE notas",
+        "ALTER TABLE notas_nova RENAME TO notas",
+    ),
+    # 4: BUSCA POR NOME/MATRÍCULA. alunos GANHA UM id INTEIRO EXPLÍCITO PORQUE O ÍNDICE FTS5
+    # APONTA PARA O ROWID, E O VACUUM PODE RENUMERAR ROWIDS QUE NÃO SÃO INTEGER PRIMARY KEY.
+    # remove_diacritics FAZ "jose" ACHAR "José"; prefix ACELERA AS BUSCAS POR INÍCIO DE PALAVRA
+    (
+        """CREATE TABLE alunos_novo (
+            id INTEGER PRIMARY KEY,
+            matricula TEXT NOT NULL UNIQUE,
+            nome TEXT NOT NULL
+        )""",
+        "INSERT INTO alunos_novo (matricula, nome) SELECT matricula, nome FROM alunos ORDER BY nome, matricula",
+        "DROP TABLE alunos",
+        "ALTER TABLE alunos_novo RENAME TO alunos",
+        "CREATE INDEX idx_alunos_nome ON alunos (nome, matricula)",
+        """CREATE VIRTUAL TABLE alunos_busca USING fts5(
+            matricula, nome,
+            content = 'alunos', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '1 2 3'
+        )""",
+        """CREATE TRIGGER alunos_busca_inserir AFTER INSERT ON alunos BEGIN
+            INSERT INTO alunos_busca (rowid, matricula, nome) VALUES (new.id, new.matricula, new.nome);
+        END""",
+        """CREATE TRIGGER alunos_busca_excluir AFTER DELETE ON alunos BEGIN
+            INSERT INTO alunos_busca (alunos_busca, rowid, matricula, nome)
+            VALUES ('delete', old.id, old.matricula, old.nome);
+        END""",
+        """CREATE TRIGGER alunos_busca_alterar AFTER UPDATE ON alunos BEGIN
+            INSERT INTO alunos_busca (alunos_busca, rowid, matricula, nome)
+            VALUES ('delete', old.id, old.matricula, old.nome);
+            INSERT INTO alunos_busca (rowid, matricula, nome) VALUES (new.id, new.matricula, new.nome);
+        END""",
+        "INSERT INTO alunos_busca (alunos_busca) VALUES ('rebuild')",
+    ),
+    # 5: RESUMOS PARA A ABA DE ESTATÍSTICAS, MANTIDOS POR GATILHOS EM notas PARA OS PAINÉIS
+    # NUNCA PRECISAREM PERCORRER TODAS AS NOTAS. OS ÍNDICES DESCENDENTES SERVEM AS CLASSIFICAÇÕES
+    (
+        """CREATE TABLE estatisticas_aluno (
+            aluno_matricula TEXT PRIMARY KEY,
+            quantidade INTEGER NOT NULL,
+            soma REAL NOT NULL,
+            media REAL NOT NULL
+        ) WITHOUT ROWID""",
+        "CREATE INDEX idx_estatisticas_aluno_media ON estatisticas_aluno (media DESC, aluno_matricula)",
+        """CREATE TABLE estatisticas_disciplina (
+            disciplina_id INTEGER PRIMARY KEY,
+            quantidade INTEGER NOT NULL,
+            soma REAL NOT NULL,
+            soma_quadrados REAL NOT NULL,
+            aprovados INTEGER NOT NULL
+        )""",
+        """CREATE TABLE histograma_notas (
+            disciplina_id INTEGER NOT NULL,
+            faixa INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL,
+            PRIMARY KEY (disciplina_id, faixa)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX idx_notas_disciplina ON notas (disciplina_id, valor DESC, aluno_matricula)",
+        """INSERT INTO estatisticas_aluno (aluno_matricula, quantidade, soma, media)
+            SELECT aluno_matricula, COUNT(*), SUM(valor), round(AVG(valor), 9) FROM notas GROUP BY aluno_matricula""",
+        f"""INSERT INTO estatisticas_disciplina (disciplina_id, quantidade, soma, soma_quadrados, aprovados)
+            SELECT disciplina_id, COUNT(*), SUM(valor), SUM(valor * valor), SUM(valor >= {NOTA_APROVACAO})
+            FROM notas GROUP BY disciplina_id""",
+        """INSERT INTO histograma_notas (disciplina_id, faixa, quantidade)
+            SELECT disciplina_id, CAST(round(valor * 10) AS INTEGER), COUNT(*) FROM notas GROUP BY 1, 2""",
+        f"CREATE TRIGGER notas_resumo_inserir AFTER INSERT ON notas BEGIN{_ACRESCENTAR_NOTA}\n        END",
+        f"CREATE TRIGGER notas_resumo_excluir AFTER DELETE ON notas BEGIN{_RETIRAR_NOTA}\n        END",
+        f"CREATE TRIGGER notas_resumo_alterar AFTER UPDATE ON notas BEGIN{_RETIRAR_NOTA}{_ACRESCENTAR_NOTA}\n        END",
+    ),
+    # 6: AS NOTAS SÃO APAGADAS JUNTO COM O ALUNO (ON DELETE CASCADE). O SQLITE NÃO ALTERA CHAVES
+    # ESTRANGEIRAS, ENTÃO notas É RECRIADA, E COM ELA O ÍNDICE E OS GATILHOS DOS RESUMOS. NOTAS DE
+    # ALUNOS QUE NÃO EXISTEM (GRAVADAS QUANDO AS CHAVES NÃO ERAM CONFERIDAS) SAEM ANTES, PELOS
+    # GATILHOS ANTIGOS, PARA OS RESUMOS CONTINUAREM CERTOS
+    (
+        "DELETE FROM notas WHERE aluno_matricula NOT IN (SELECT matricula FROM alunos)",
+        """CREATE TABLE notas_nova (
+            aluno_matricula TEXT NOT NULL,
+            disciplina_id INTEGER NOT NULL,
+            valor REAL NOT NULL,
+            PRIMARY KEY (aluno_matricula, disciplina_id),
+            FOREIGN KEY (aluno_matricula) REFERENCES alunos (matricula) ON DELETE CASCADE,
+            FOREIGN KEY (disciplina_id) REFERENCES disciplinas (id)
+        ) WITHOUT ROWID""",
+        "INSERT INTO notas_nova (aluno_matricula, disciplina_id, valor) SELECT aluno_matricula, disciplina_id, valor FROM notas",
+        "DROP TABLE notas",
+        "ALTER TABLE notas_nova RENAME TO notas",
+        "CREATE INDEX idx_notas_disciplina ON notas (disciplina_id, valor DESC, aluno_matricula)",
+        f"CREATE TRIGGER notas_resumo_inserir AFTER INSERT ON notas BEGIN{_ACRESCENTAR_NOTA}\n        END",
+        f"CREATE TRIGGER notas_resumo_excluir AFTER DELETE ON notas BEGIN{_RETIRAR_NOTA}\n        END",
+        f"CREATE TRIGGER notas_resumo_alterar AFTER UPDATE ON notas BEGIN{_RETIRAR_NOTA}{_ACRESCENTAR_NOTA}\n        END",
+    ),
+    # 7: DIÁRIO DE ALTERAÇÕES PARA AS RÉPLICAS (replicacao.py). GUARDA SÓ A CHAVE DE CADA LINHA
+    # ALTERADA (disciplina_id = 0 É O PRÓPRIO ALUNO) E UMA VEZ SÓ: A ALTERAÇÃO MAIS NOVA APAGA A
+    # ANTERIOR E GANHA UM seq NOVO, ENTÃO O DIÁRIO NÃO PASSA DO TAMANHO DAS TABELAS. O VALOR É LIDO
+    # DA PRÓPRIA TABELA NA HORA DE SINCRONIZAR (LINHA QUE NÃO EXISTE MAIS = EXCLUÍDA).
+    # identidade DISTINGUE ESTE BANCO DAS CÓPIAS; sincronizacao GUARDA, NUMA RÉPLICA, ATÉ QUE seq
+    # DO DIÁRIO DE CADA ORIGEM ELA JÁ RECEBEU
+    (
+        """CREATE TABLE diario (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            matricula TEXT NOT NULL,
+            disciplina_id INTEGER NOT NULL,
+            UNIQUE (matricula, disciplina_id)
+        )""",
+        "CREATE TABLE identidade (id TEXT NOT NULL)",
+        "INSERT INTO identidade (id) VALUES (lower(hex(randomblob(16))))",
+        """CREATE TABLE sincronizacao (
+            origem TEXT PRIMARY KEY,
+            ultimo INTEGER NOT NULL
+        ) WITHOUT ROWID""",
+        f"CREATE TRIGGER alunos_diario_inserir AFTER INSERT ON alunos BEGIN{_anotar('new.matricula', '0')}\n        END",
+        f"CREATE TRIGGER alunos_diario_excluir AFTER DELETE ON alunos BEGIN{_anotar('old.matricula', '0')}\n        END",
+        f"CREATE TRIGGER alunos_diario_alterar AFTER UPDATE ON alunos BEGIN"
+        f"{_anotar('old.matricula', '0')}{_anotar('new.matricula', '0')}\n        END",
+        f"CREATE TRIGGER notas_diario_inserir AFTER INSERT ON notas BEGIN"
+        f"{_anotar('new.aluno_matricula', 'new.disciplina_id')}\n        END",
+        f"CREATE TRIGGER notas_diario_excluir AFTER DELETE ON notas BEGIN"
+        f"{_anotar('old.aluno_matricula', 'old.disciplina_id')}\n        END",
+        f"CREATE TRIGGER notas_diario_alterar AFTER UPDATE ON notas BEGIN"
+        f"{_anotar('old.aluno_matricula', 'old.disciplina_id')}{_anotar('new.aluno_matricula', 'new.disciplina_id')}\n        END",
+    ),
+]
+
+# CONSULTAS QUENTES (USADAS PELOS MÉTODOS DO BANCO E CONFERIDAS POR Banco.verificar_planos)
+SQL_LISTAR_ALUNOS = "SELECT matricula, nome FROM alunos ORDER BY nome, matricula"
+SQL_PRIMEIRA_PAGINA = "SELECT matricula, nome FROM alunos ORDER BY nome, matricula LIMIT ?"
+SQL_PAGINA_APOS = """SELECT matricula, nome FROM alunos
+    WHERE (nome, matricula) > (?, ?)
+    ORDER BY nome, matricula LIMIT ?"""
+SQL_PAGINA_ANTES = """SELECT matricula, nome FROM alunos
+    WHERE (nome, matricula) < (?, ?)
+    ORDER BY nome DESC, matricula DESC LIMIT ?"""
+SQL_CHAVE_POSICAO = "SELECT nome, matricula FROM alunos ORDER BY nome, matricula LIMIT 1 OFFSET ?"
+# A ORDEM POR NOME DA DISCIPLINA É FEITA EM PYTHON, DEPOIS DE TRADUZIR OS IDS PELO CACHE
+SQL_NOTAS_ALUNO = "SELECT disciplina_id, valor FROM notas WHERE aluno_matricula = ?"
+# GRADE DE UMA DISCIPLINA: TODOS OS ALUNOS PELA ORDEM DO ÍNDICE DE NOME, COM A NOTA QUANDO HOUVER
+SQL_NOTAS_DISCIPLINA = """SELECT a.matricula, a.nome, n.valor
+    FROM alunos AS a LEFT JOIN notas AS n ON n.aluno_matricula = a.matricula AND n.disciplina_id = ?
+    ORDER BY a.nome, a.matricula LIMIT ?"""
+# NOTA NOVA OU CORRIGIDA NUM SÓ COMANDO; A CORREÇÃO DISPARA O GATILHO DE UPDATE DOS RESUMOS
+SQL_SALVAR_NOTA = """INSERT INTO notas (aluno_matricula, disciplina_id, valor) VALUES (?, ?, ?)
+    ON CONFLICT (aluno_matricula, disciplina_id) DO UPDATE SET valor = excluded.valor"""
+
+# BUSCA POR PREFIXO: AS PRIMEIRAS OCORRÊNCIAS NO ÍNDICE, ORDENADAS DEPOIS EM PYTHON
+SQL_BUSCAR_ALUNOS = """SELECT a.matricula, a.nome
+    FROM alunos_busca AS b JOIN alunos AS a ON a.id = b.rowid
+    WHERE alunos_busca MATCH ? LIMIT ?"""
+
+# ESTATÍSTICAS: MÉDIA E POSIÇÃO DE UM ALUNO E AS CLASSIFICAÇÕES GERAL E POR DISCIPLINA.
+# EMPATADOS FICAM NA MESMA POSIÇÃO (1, 2, 2, 4...)
+SQL_MEDIA_ALUNO = "SELECT media, quantidade FROM estatisticas_aluno WHERE aluno_matricula = ?"
+SQL_POSICAO_MEDIA = "SELECT COUNT(*) FROM estatisticas_aluno WHERE media > ?"
+SQL_CLASSIFICACAO_GERAL = """SELECT e.aluno_matricula, a.nome, e.media
+    FROM estatisticas_aluno AS e JOIN alunos AS a ON a.matricula = e.aluno_matricula
+    ORDER BY e.media DESC, e.aluno_matricula LIMIT ?"""
+SQL_CLASSIFICACAO_DISCIPLINA = """SELECT n.aluno_matricula, a.nome, n.valor
+    FROM notas AS n JOIN alunos AS a ON a.matricula = n.aluno_matricula
+    WHERE n.disciplina_id = ?
+    ORDER BY n.valor DESC, n.aluno_matricula LIMIT ?"""
+# OS RESUMOS POR DISCIPLINA TÊM UMA LINHA POR DISCIPLINA (OU POR FAIXA DE NOTA) E SÃO LIDOS
+# INTEIROS DE PROPÓSITO, POR ISSO NÃO ENTRAM EM CONSULTAS_QUENTES
+SQL_ESTATISTICAS_DISCIPLINAS = """SELECT disciplina_id, quantidade, soma, soma_quadrados, aprovados
+    FROM estatisticas_disciplina"""
+# ALUNOS COM AS NOTAS, NUMA ÚNICA LEITURA ORDENADA PELO ÍNDICE DE NOME (SEM ORDENAÇÃO TEMPORÁRIA)
+SQL_BOLETINS = """SELECT a.matricula, a.nome, n.disciplina_id, n.valor
+    FROM alunos a LEFT JOIN notas n ON n.aluno_matricula = a.matricula
+    ORDER BY a.nome, a.matricula"""
+# O MESMO, SÓ PARA UMA FAIXA DE MATRÍCULAS, NA ORDEM DO ÍNDICE DE MATRÍCULA. A ÚLTIMA FAIXA NÃO
+# TEM FIM: UM "OR fim IS NULL" NO WHERE IMPEDIRIA O SQLITE DE PARAR A LEITURA DO ÍNDICE NO FIM DA FAIXA
+SQL_BOLETINS_FAIXA = """SELECT a.matricula, a.nome, n.disciplina_id, n.valor
+    FROM alunos a LEFT JOIN notas n ON n.aluno_matricula = a.matricula
+    WHERE a.matricula >= ? AND a.matricula < ?
+    ORDER BY a.matricula"""
+SQL_BOLETINS_APOS = """SELECT a.matricula, a.nome, n.disciplina_id, n.valor
+    FROM alunos a LEFT JOIN notas n ON n.aluno_matricula = a.matricula
+    WHERE a.matricula >= ?
+    ORDER BY a.matricula"""
+SQL_MATRICULA_POSICAO = "SELECT matricula FROM alunos ORDER BY matricula LIMIT 1 OFFSET ?"
+# CADA CHAVE DO DIÁRIO COM O VALOR ATUAL: NOME DO ALUNO OU DISCIPLINA E NOTA (NULL = EXCLUÍDO)
+SQL_ALTERACOES = """SELECT d.seq, d.matricula, d.disciplina_id, a.nome, di.nome, n.valor
+    FROM diario AS d
+    LEFT JOIN alunos AS a ON d.disciplina_id = 0 AND a.matricula = d.matricula
+    LEFT JOIN disciplinas AS di ON di.id = d.disciplina_id
+    LEFT JOIN notas AS n ON n.aluno_matricula = d.matricula AND n.disciplina_id = d.disciplina_id
+    WHERE d.seq > ? ORDER BY d.seq"""
+SQL_APLICAR_ALUNO = """INSERT INTO alunos (matricula, nome) VALUES (?, ?)
+    ON CONFLICT (matricula) DO UPDATE SET nome = excluded.nome WHERE nome <> excluded.nome"""
+SQL_APLICAR_NOTA = """INSERT INTO notas (aluno_matricula, disciplina_id, valor) VALUES (?, ?, ?)
+    ON CONFLICT (aluno_matricula, disciplina_id) DO UPDATE SET valor = excluded.valor WHERE valor <> excluded.valor"""
+SQL_HISTOGRAMA_NOTAS = "SELECT disciplina_id, faixa, quantidade FROM histograma_notas ORDER BY disciplina_id, faixa"
+
+# NOME -> (SQL, PARÂMETROS DE EXEMPLO, SE PODE PERCORRER UM ÍNDICE INTEIRO)
+CONSULTAS_QUENTES = {
+    "listar_alunos": (SQL_LISTAR_ALUNOS, (), True),
+    "listar_alunos_pagina": (SQL_PRIMEIRA_PAGINA, (100,), True),
+    "listar_alunos_pagina(apos)": (SQL_PAGINA_APOS, ("", "", 100), False),
+    "listar_alunos_pagina(antes)": (SQL_PAGINA_ANTES, ("", "", 100), False),
+    "chave_aluno_posicao": (SQL_CHAVE_POSICAO, (0,), True),
+    "buscar_notas_aluno": (SQL_NOTAS_ALUNO, ("",), False),
+    "listar_notas_disciplina": (SQL_NOTAS_DISCIPLINA, (1, 100), True),
+    "buscar_alunos": (SQL_BUSCAR_ALUNOS, ('"a"*', 20), False),
+    "media_aluno": (SQL_MEDIA_ALUNO, ("",), False),
+    "media_aluno(posicao)": (SQL_POSICAO_MEDIA, (0.0,), False),
+    "classificacao_alunos": (SQL_CLASSIFICACAO_GERAL, (20,), True),
+    "classificacao_alunos(disciplina)": (SQL_CLASSIFICACAO_DISCIPLINA, (1, 20), False),
+    "alteracoes_desde": (SQL_ALTERACOES, (0,), False),
+}
+
+# TIPOS DE EVENTO PUBLICADOS PELO BANCO DEPOIS DE CADA ESCRITA
+ALUNO_INSERIDO = "aluno_inserido"
+ALUNO_EXCLUIDO = "aluno_excluido"
+NOTA_INSERIDA = "nota_inserida"
+NOTA_EXCLUIDA = "nota_excluida"
+NOTA_ALTERADA = "nota_alterada"
+# MUDANÇAS EM MASSA (IMPORTAÇÃO): AS TELAS RECARREGAM EM VEZ DE APLICAR DIFERENÇAS
+ALUNOS_RECARREGADOS = "alunos_recarregados"
+NOTAS_RECARREGADAS = "notas_recarregadas"
+
+
+def consulta_busca(termo: str) -> str:
+    # TRANSFORMA O TEXTO DIGITADO NUMA CONSULTA FTS5: CADA PALAVRA VIRA UM PREFIXO ENTRE ASPAS,
+    # E TODAS PRECISAM APARECER ("ana sil" ACHA "Ana Maria da Silva")
+    palavras = re.findall(r"\w+", termo)
+    return " ".join('"' + palavra.replace('"', '""') + '"*' for palavra in palavras)
+
+
+def _mediana_histograma(faixas: List[Tuple[int, int]], total: int) -> float:
+    # faixas = [(faixa, quantidade)] EM ORDEM CRESCENTE. A MEDIANA É A MÉDIA DOS DOIS ELEMENTOS
+    # CENTRAIS (O MESMO QUANDO total É ÍMPAR), EXATA PARA NOTAS COM UMA CASA DECIMAL
+    centrais = [(total - 1) // 2, total // 2]
+    valores = []
+    acumulado = 0
+    for faixa, quantidade in faixas:
+        acumulado += quantidade
+        while centrais and centrais[0] < acumulado:
+            valores.append(faixa / 10)
+            centrais.pop(0)
+        if not centrais:
+            break
+    return sum(valores) / len(valores) if valores else 0.0
+
+
+class Evento(NamedTuple):
+    tipo: str
+    matricula: Optional[str] = None
+    nome: Optional[str] = None
+    disciplina: Optional[str] = None
+    valor: Optional[float] = None
+
+
+class ResultadoImportacao:
+    def __init__(self):
+        self.inseridos = 0
+        # LISTA DE (NÚMERO DA LINHA, MOTIVO) DAS LINHAS RECUSADAS
+        self.rejeitados: List[Tuple[int, str]] = []
+        # MENSAGEM DO ERRO QUE DESFEZ A IMPORTAÇÃO INTEIRA (ARQUIVO ILEGÍVEL, BANCO TRAVADO...)
+        self.erro: Optional[str] = None
+    
+    def rejeitar(self, linha: int, motivo: str):
+        self.rejeitados.append((linha, motivo))
+
+
+def ler_registros(arquivo: str, formato: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    # LÊ UM ARQUIVO CSV (COM CABEÇALHO) OU JSONL LINHA A LINHA, SEM CARREGAR TUDO NA MEMÓRIA
+    if formato is None:
+        formato = os.path.splitext(arquivo)[1].lower().lstrip(".")
+    
+    # FORMATO VALIDADO AQUI PARA O ERRO APARECER ANTES DE COMEÇAR A IMPORTAÇÃO
+    if formato == "csv":
+        return _ler_csv(arquivo)
+    if formato in ("jsonl", "json", "ndjson"):
+        return _ler_jsonl(arquivo)
+    raise ValueError(f"Formato de arquivo não suportado: {formato}")
+
+
+def _ler_csv(arquivo: str) -> Iterator[Dict[str, Any]]:
+    with open(arquivo, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def _ler_jsonl(arquivo: str) -> Iterator[Dict[str, Any]]:
+    with open(arquivo, encoding="utf-8-sig") as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def _formato_saida(destino: str, formato: Optional[str], aceitos: Tuple[str, ...]) -> str:
+    # SEM formato, VALE A EXTENSÃO DO ARQUIVO (CSV PARA A SAÍDA PADRÃO)
+    if formato is None:
+        formato = "csv" if destino == "-" else os.path.splitext(destino)[1].lower().lstrip(".")
+    if formato not in aceitos:
+        raise ValueError(f"Formato de arquivo não suportado: {formato}")
+    return formato
+
+
+@contextmanager
+def _abrir_saida(destino: str):
+    # destino "-" É A SAÍDA PADRÃO, QUE NÃO É FECHADA NO FINAL
+    if destino == "-":
+        yield sys.stdout
+        return
+    with open(destino, "w", newline="", encoding="utf-8") as saida:
+        yield saida
+
+
+def escrever_registros(destino: str, registros: Iterable[Dict[str, Any]], campos: List[str],
+                       formato: Optional[str] = None) -> int:
+    # GRAVA OS REGISTROS EM CSV (COM CABEÇALHO) OU JSONL, OS MESMOS FORMATOS QUE ler_registros LÊ.
+    # destino "-" É A SAÍDA PADRÃO. DEVOLVE QUANTOS REGISTROS FORAM GRAVADOS
+    formato = _formato_saida(destino, formato, ("csv", "jsonl", "json", "ndjson"))
+    total = 0
+    with _abrir_saida(destino) as saida:
+        if formato == "csv":
+            escritor = csv.DictWriter(saida, fieldnames=campos)
+            escritor.writeheader()
+            for registro in registros:
+                escritor.writerow(registro)
+                total += 1
+        else:
+            for registro in registros:
+                saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                total += 1
+    return total
+
+
+_CABECALHO_HTML = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Boletins</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+section { page-break-after: always; margin-bottom: 3em; }
+table { border-collapse: collapse; min-width: 24em; }
+th, td { border: 1px solid #999; padding: 0.3em 0.8em; text-align: left; }
+td.nota, th.nota { text-align: right; }
+.reprovado { color: #b00; }
+</style>
+</head>
+<body>
+"""
+_RODAPE_HTML = "</body>\n</html>\n"
+
+
+def _media(notas: List[Tuple[str, float]]) -> Optional[float]:
+    return round(sum(valor for _, valor in notas) / len(notas), 2) if notas else None
+
+
+def _boletim_html(matricula: str, nome: str, notas: List[Tuple[str, float]]) -> str:
+    linhas = "".join(
+        f'<tr><td>{escape(disciplina)}</td>'
+        f'<td class="nota{" reprovado" if valor < NOTA_APROVACAO else ""}">{valor:.1f}</td></tr>\n'
+        for disciplina, valor in notas
+    )
+    media = _media(notas)
+    rodape = f'<tfoot><tr><th>Média</th><th class="nota">{media:.2f}</th></tr></tfoot>\n' if media is not None else ""
+    return (
+        f"<section>\n<h2>{escape(nome)}</h2>\n<p>Matrícula: {escape(matricula)}</p>\n"
+        f'<table>\n<thead><tr><th>Disciplina</th><th class="nota">Nota</th></tr></thead>\n'
+        f"<tbody>\n{linhas}</tbody>\n{rodape}</table>\n</section>\n"
+    )
+
+
+def escrever_boletins(destino: str, boletins: Iterable[Tuple[str, str, List[Tuple[str, float]]]],
+                      formato: Optional[str] = None, disciplinas: Iterable[str] = ()) -> int:
+    # GRAVA OS BOLETINS DE Banco.percorrer_boletins À MEDIDA QUE CHEGAM, SEM JUNTAR NADA NA MEMÓRIA:
+    # CSV (UMA LINHA POR ALUNO, UMA COLUNA POR DISCIPLINA, QUE POR ISSO PRECISAM SER INFORMADAS),
+    # JSONL (UM OBJETO POR ALUNO) OU HTML (UMA PÁGINA IMPRESSA POR ALUNO). DEVOLVE QUANTOS ALUNOS
+    formato = _formato_saida(destino, formato, ("csv", "jsonl", "json", "ndjson", "html", "htm"))
+    total = 0
+    with _abrir_saida(destino) as saida:
+        if formato == "csv":
+            colunas = list(disciplinas)
+            escritor = csv.writer(saida)
+            escritor.writerow(["matricula", "nome"] + colunas + ["media"])
+            for matricula, nome, notas in boletins:
+                valores = dict(notas)
+                media = _media(notas)
+                escritor.writerow(
+                    [matricula, nome] + [valores.get(disciplina, "") for disciplina in colunas]
+                    + ["" if media is None else media]
+                )
+                total += 1
+        elif formato in ("html", "htm"):
+            saida.write(_CABECALHO_HTML)
+            for matricula, nome, notas in boletins:
+                saida.write(_boletim_html(matricula, nome, notas))
+                total += 1
+            saida.write(_RODAPE_HTML)
+        else:
+            for matricula, nome, notas in boletins:
+                saida.write(json.dumps(
+                    {"matricula": matricula, "nome": nome, "notas": dict(notas), "media": _media(notas)},
+                    ensure_ascii=False
+                ) + "\n")
+                total += 1
+    return total
+
+
+def _linhas_em_lotes(cursor: sqlite3.Cursor) -> Iterator[tuple]:
+    # LINHAS DE UMA CONSULTA JÁ EXECUTADA, BUSCADAS DE TAMANHO_LOTE_LEITURA EM TAMANHO_LOTE_LEITURA
+    while True:
+        linhas = cursor.fetchmany(TAMANHO_LOTE_LEITURA)
+        if not linhas:
+            return
+        yield from linhas
+
+
+def _em_lotes(itens: Iterable, tamanho: int) -> Iterator[list]:
+    iterador = iter(itens)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def _tamanho_estimado(linhas: List[tuple]) -> int:
+    # TAMANHO APROXIMADO EM BYTES DE UMA LISTA DE TUPLAS, PELA MÉDIA DAS PRIMEIRAS LINHAS
+    if not linhas:
+        return sys.getsizeof(linhas)
+    amostra = linhas[:100]
+    por_linha = sum(sys.getsizeof(linha) + sum(sys.getsizeof(v) for v in linha) for linha in amostra)
+    return sys.getsizeof(linhas) + por_linha * len(linhas) // len(amostra)
+
+
+class CacheConsultas:
+    # CACHE DAS LEITURAS FREQUENTES DO Banco: LRU DAS NOTAS POR MATRÍCULA, A LISTA ORDENADA
+    # DE ALUNOS E A CONTAGEM DELES. TODA INVALIDAÇÃO AVANÇA A GERAÇÃO; UMA LEITURA SÓ É
+    # GUARDADA SE NENHUMA ESCRITA ACONTECEU ENTRE O INÍCIO DA CONSULTA E O guardar
+    def __init__(self, tamanho: int = TAMANHO_CACHE_NOTAS, memoria: int = MEMORIA_CACHE):
+        self.tamanho = tamanho
+        self.memoria = memoria
+        self.geracao = 0
+        # MATRÍCULA -> (NOTAS, TAMANHO ESTIMADO), DO MENOS PARA O MAIS RECENTE
+        self.notas: "OrderedDict[str, Tuple[List[Tuple[str, float]], int]]" = OrderedDict()
+        self.bytes_notas = 0
+        self.alunos: Optional[List[Tuple[str, str]]] = None
+        self.total_alunos: Optional[int] = None
+        self.acertos = {"notas": 0, "alunos": 0, "contagem": 0}
+        self.falhas = {"notas": 0, "alunos": 0, "contagem": 0}
+    
+    def _contar(self, tipo: str, valor):
+        if valor is None:
+            self.falhas[tipo] += 1
+        else:
+            self.acertos[tipo] += 1
+        return valor
+    
+    def buscar_notas(self, matricula: str) -> Optional[List[Tuple[str, float]]]:
+        entrada = self.notas.get(matricula)
+        if entrada is not None:
+            self.notas.move_to_end(matricula)
+        return self._contar("notas", None if entrada is None else list(entrada[0]))
+    
+    def guardar_notas(self, matricula: str, notas: List[Tuple[str, float]], geracao: int):
+        tamanho = _tamanho_estimado(notas)
+        if geracao != self.geracao or tamanho > self.memoria or self.tamanho <= 0:
+            return
+        self._descartar_notas(matricula)
+        self.notas[matricula] = (list(notas), tamanho)
+        self.bytes_notas += tamanho
+        while len(self.notas) > self.tamanho or self.bytes_notas > self.memoria:
+            _, (_, tamanho_antigo) = self.notas.popitem(last=False)
+            self.bytes_notas -= tamanho_antigo
+    
+    def buscar_alunos(self) -> Optional[List[Tuple[str, str]]]:
+        return self._contar("alunos", None if self.alunos is None else list(self.alunos))
+    
+    def guardar_alunos(self, alunos: List[Tuple[str, str]], geracao: int):
+        if geracao == self.geracao and _tamanho_estimado(alunos) <= self.memoria:
+            self.alunos = list(alunos)
+            self.total_alunos = len(alunos)
+    
+    def buscar_total_alunos(self) -> Optional[int]:
+        return self._contar("contagem", self.total_alunos)
+    
+    def guardar_total_alunos(self, total: int, geracao: int):
+        if geracao == self.geracao:
+            self.total_alunos = total
+    
+    def _descartar_notas(self, matricula: str):
+        entrada = self.notas.pop(matricula, None)
+        if entrada is not None:
+            self.bytes_notas -= entrada[1]
+    
+    def invalidar_alunos(self):
+        self.geracao += 1
+        self.alunos = None
+        self.total_alunos = None
+    
+    def invalidar_notas(self, matriculas: Iterable[str]):
+        # SÓ AS MATRÍCULAS AFETADAS SAEM; O CACHE É PEQUENO, ENTÃO EM LOTES GRANDES
+        # É MAIS BARATO PERCORRER AS ENTRADAS DO QUE AS MATRÍCULAS
+        self.geracao += 1
+        if not isinstance(matriculas, (set, frozenset, dict)):
+            matriculas = set(matriculas)
+        for matricula in [m for m in self.notas if m in matriculas]:
+            self._descartar_notas(matricula)
+    
+    def limpar(self):
+        self.geracao += 1
+        self.notas.clear()
+        self.bytes_notas = 0
+        self.alunos = None
+        self.total_alunos = None
+    
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            **{f"acertos_{tipo}": valor for tipo, valor in self.acertos.items()},
+            **{f"falhas_{tipo}": valor for tipo, valor in self.falhas.items()},
+            "entradas_notas": len(self.notas),
+            "bytes_notas": self.bytes_notas,
+        }
+
+
+class Banco:
+    def __init__(self, arquivo_db="notas_alunos.db", tamanho_cache: int = TAMANHO_CACHE_NOTAS,
+                 memoria_cache: int = MEMORIA_CACHE, perfil: str = PERFIL_PADRAO,
+                 instrumentacao: Optional["Instrumentacao"] = None, somente_leitura: bool = False):
+        if perfil not in PERFIS_CONEXAO:
+            raise ValueError(f"Perfil de conexão desconhecido: {perfil}")
+        
+        # VERIFICAR BANCO
+        self.arquivo_db = arquivo_db
+        self.perfil = perfil
+        self.somente_leitura = somente_leitura
+        if somente_leitura:
+            # mode=ro: O SQLITE RECUSA QUALQUER ESCRITA E NÃO CRIA O ARQUIVO SE ELE NÃO EXISTIR.
+            # PARA PROCESSOS E CONEXÕES EXTRAS QUE SÓ LEEM (RELATÓRIOS EM PARALELO, SERVIDOR)
+            self.conexao = sqlite3.connect(Path(arquivo_db).absolute().as_uri() + "?mode=ro", uri=True)
+        else:
+            self.conexao = sqlite3.connect(self.arquivo_db)
+        self.cursor = self.conexao.cursor()
+        self.ouvintes: List[Callable[[Evento], None]] = []
+        
+        # TRANSAÇÃO EM ANDAMENTO (transacao() ANINHADAS) E EVENTOS ESPERANDO O COMMIT
+        self.profundidade = 0
+        self.eventos_pendentes: List[Evento] = []
+        
+        # CACHE DO DICIONÁRIO DE DISCIPLINAS (NOME <-> ID), PREENCHIDO SOB DEMANDA
+        self.ids_disciplinas: Dict[str, int] = {}
+        self.nomes_disciplinas: Dict[int, str] = {}
+        
+        # CACHE DE LEITURAS (tamanho_cache=0 DESLIGA). data_version MUDA QUANDO OUTRA
+        # CONEXÃO GRAVA NO ARQUIVO, E AÍ O CACHE INTEIRO É DESCARTADO
+        self.cache = CacheConsultas(tamanho_cache, memoria_cache) if tamanho_cache > 0 else None
+        self.versao_dados: Optional[int] = None
+        
+        # MEDIÇÃO OPCIONAL (instrumentar); None = DESLIGADA, SEM NENHUM CUSTO NAS CONSULTAS
+        self.instrumentacao: Optional["Instrumentacao"] = None
+        
+        self.aplicar_perfil(perfil)
+        self.criar_tabelas()
+        # CHAVES ESTRANGEIRAS SÓ DEPOIS DAS MIGRAÇÕES: COM ELAS LIGADAS, O DROP TABLE QUE RECRIA
+        # UMA TABELA APAGARIA EM CASCATA AS LINHAS QUE APONTAM PARA ELA
+        self.cursor.execute("PRAGMA foreign_keys = ON")
+        if instrumentacao is not None:
+            self.instrumentar(instrumentacao)
+    
+    def inscrever(self, ouvinte: Callable[[Evento], None]):
+        # OUVINTES RECEBEM UM Evento A CADA ESCRITA CONFIRMADA
+        self.ouvintes.append(ouvinte)
+    
+    def _publicar(self, tipo: str, **dados):
+        evento = Evento(tipo, **dados)
+        if self.profundidade:
+            # DENTRO DE UMA TRANSAÇÃO O EVENTO SÓ SAI DEPOIS DO COMMIT (E SOME NO ROLLBACK)
+            self.eventos_pendentes.append(evento)
+        else:
+            self._avisar(evento)
+    
+    def _avisar(self, evento: Evento):
+        for ouvinte in self.ouvintes:
+            try:
+                ouvinte(evento)
+            except Exception as e:
+                print(f"Erro ao tratar evento {evento.tipo}: {e}")
+    
+    def instrumentar(self, instrumentacao: Optional["Instrumentacao"]):
+        # LIGA (OU TROCA) A MEDIÇÃO DE MÉTODOS E CONSULTAS; None DESLIGA E DEVOLVE O CURSOR
+        # E OS MÉTODOS ORIGINAIS. OS DADOS COLETADOS FICAM NO OBJETO Instrumentacao
+        if self.instrumentacao is not None:
+            self.instrumentacao.remover(self)
+        self.instrumentacao = instrumentacao
+        if instrumentacao is not None:
+            instrumentacao.instalar(self)
+    
+    def _novo_cursor(self) -> sqlite3.Cursor:
+        cursor = self.conexao.cursor()
+        if self.instrumentacao is not None:
+            return self.instrumentacao.envolver(cursor)
+        return cursor
+    
+    def aplicar_perfil(self, perfil: str):
+        for pragma, valor in PERFIS_CONEXAO[perfil].items():
+            if pragma == "journal_mode" and self.somente_leitura:
+                # O MODO DO DIÁRIO É GRAVADO NO ARQUIVO; QUEM SÓ LÊ USA O QUE ESTIVER LÁ
+                continue
+            self.cursor.execute(f"PRAGMA {pragma} = {valor}")
+            self.cursor.fetchall()
+        self.perfil = perfil
+    
+    @contextmanager
+    def transacao(self):
+        # AGRUPA QUALQUER NÚMERO DE ESCRITAS NUM ÚNICO COMMIT ATÔMICO. TODOS OS MÉTODOS DE
+        # ESCRITA USAM ISTO; CHAMADOS DENTRO DE OUTRA transacao() ELES VIRAM UM SAVEPOINT,
+        # ENTÃO UMA FALHA DESFAZ SÓ A PARTE DELES E A TRANSAÇÃO DE FORA CONTINUA
+        nivel = self.profundidade
+        eventos = len(self.eventos_pendentes)
+        if nivel == 0:
+            # IMMEDIATE TRAVA PARA ESCRITA JÁ NO INÍCIO: NO WAL, UM BEGIN COMUM QUE SÓ DEPOIS
+            # TENTA ESCREVER PODE FALHAR NA HORA SE OUTRA CONEXÃO GRAVOU NESSE MEIO TEMPO
+            self.cursor.execute("BEGIN IMMEDIATE")
+        else:
+            self.cursor.execute(f"SAVEPOINT nivel_{nivel}")
+        self.profundidade += 1
+        
+        try:
+            yield self
+            if nivel == 0:
+                self.conexao.commit()
+            else:
+                self.cursor.execute(f"RELEASE nivel_{nivel}")
+        except BaseException:
+            self.profundidade -= 1
+            if nivel == 0:
+                self.conexao.rollback()
+            else:
+                self.cursor.execute(f"ROLLBACK TO nivel_{nivel}")
+                self.cursor.execute(f"RELEASE nivel_{nivel}")
+            del self.eventos_pendentes[eventos:]
+            self._limpar_caches()
+            raise
+        
+        self.profundidade -= 1
+        if nivel == 0:
+            pendentes, self.eventos_pendentes = self.eventos_pendentes, []
+            for evento in pendentes:
+                self._avisar(evento)
+    
+    def criar_tabelas(self):
+        # APLICA AS MIGRAÇÕES QUE FALTAM PARA A VERSÃO DO ARQUIVO (PRAGMA user_version)
+        if self._versao_esquema() == len(MIGRACOES):
+            return
+        if self.somente_leitura:
+            raise RuntimeError(
+                f"O banco {self.arquivo_db} precisa ser atualizado por uma conexão com escrita antes de ser lido"
+            )
+        
+        while True:
+            # A VERSÃO É RELIDA COM O BANCO TRAVADO PARA ESCRITA: SE OUTRA CONEXÃO ABRIU O MESMO
+            # ARQUIVO AO MESMO TEMPO, SÓ UMA DELAS APLICA CADA MIGRAÇÃO
+            self.cursor.execute("BEGIN IMMEDIATE")
+            try:
+                versao = self._versao_esquema()
+                if versao > len(MIGRACOES):
+                    raise RuntimeError(
+                        f"O banco {self.arquivo_db} está na versão {versao}, "
+                        f"mais nova que a deste programa ({len(MIGRACOES)})"
+                    )
+                if versao == len(MIGRACOES):
+                    self.conexao.commit()
+                    return
+                
+                for comando in MIGRACOES[versao]:
+                    self.cursor.execute(comando)
+                self.cursor.execute(f"PRAGMA user_version = {versao + 1}")
+                self.conexao.commit()
+            except Exception:
+                self.conexao.rollback()
+                raise
+    
+    def _versao_esquema(self) -> int:
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+    
+    def verificar_planos(self) -> List[str]:
+        # LISTA AS CONSULTAS QUENTES QUE CAÍRAM EM VARREDURA COMPLETA OU ORDENAÇÃO TEMPORÁRIA.
+        # LISTA VAZIA = TODAS USANDO ÍNDICE
+        problemas = []
+        for nome, (sql, parametros, pode_percorrer) in CONSULTAS_QUENTES.items():
+            self.cursor.execute("EXPLAIN QUERY PLAN " + sql, parametros)
+            for linha in self.cursor.fetchall():
+                detalhe = linha[-1]
+                if "VIRTUAL TABLE INDEX" in detalhe:
+                    # TABELA VIRTUAL (FTS5) RESPONDENDO PELO PRÓPRIO ÍNDICE
+                    varredura = False
+                elif detalhe.startswith("SCAN"):
+                    varredura = not pode_percorrer or "INDEX" not in detalhe
+                else:
+                    varredura = False
+                if varredura or "TEMP B-TREE" in detalhe:
+                    problemas.append(f"{nome}: {detalhe}")
+        return problemas
+    
+    def _id_disciplina(self, nome: str, criar: bool = False) -> Optional[int]:
+        # TRADUZ O NOME DA DISCIPLINA PARA O ID; COM criar=True CADASTRA NA TRANSAÇÃO ATUAL
+        id_disciplina = self.ids_disciplinas.get(nome)
+        if id_disciplina is not None:
+            return id_disciplina
+        
+        self.cursor.execute("SELECT id FROM disciplinas WHERE nome = ?", (nome,))
+        linha = self.cursor.fetchone()
+        if linha:
+            id_disciplina = linha[0]
+        elif criar:
+            self.cursor.execute("INSERT INTO disciplinas (nome) VALUES (?)", (nome,))
+            id_disciplina = self.cursor.lastrowid
+        else:
+            return None
+        
+        self.ids_disciplinas[nome] = id_disciplina
+        self.nomes_disciplinas[id_disciplina] = nome
+        return id_disciplina
+    
+    def _nome_disciplina(self, id_disciplina: int) -> str:
+        nome = self.nomes_disciplinas.get(id_disciplina)
+        if nome is None:
+            self.cursor.execute("SELECT nome FROM disciplinas WHERE id = ?", (id_disciplina,))
+            nome = self.cursor.fetchone()[0]
+            self.ids_disciplinas[nome] = id_disciplina
+            self.nomes_disciplinas[id_disciplina] = nome
+        return nome
+    
+    def _limpar_caches(self):
+        # DEPOIS DE UM ROLLBACK OS CACHES PODEM TER DADOS QUE NUNCA FORAM GRAVADOS
+        self.ids_disciplinas.clear()
+        self.nomes_disciplinas.clear()
+        if self.cache is not None:
+            self.cache.limpar()
+    
+    def _cache_atual(self) -> Optional[CacheConsultas]:
+        # DEVOLVE O CACHE JÁ SEM O QUE OUTRA CONEXÃO POSSA TER MUDADO
+        if self.cache is None:
+            return None
+        self.cursor.execute("PRAGMA data_version")
+        versao = self.cursor.fetchone()[0]
+        if versao != self.versao_dados:
+            self.versao_dados = versao
+            self.cache.limpar()
+        return self.cache
+    
+    def _invalidar_cache(self, alunos: bool = False, matriculas: Iterable[str] = ()):
+        # CHAMADO POR TODA ESCRITA, ANTES DO COMMIT: alunos PARA MUDANÇAS NA LISTA DE ALUNOS,
+        # matriculas PARA OS ALUNOS QUE TIVERAM NOTAS ALTERADAS
+        if self.cache is None:
+            return
+        if alunos:
+            self.cache.invalidar_alunos()
+        self.cache.invalidar_notas(matriculas)
+    
+    def estatisticas_cache(self) -> Dict[str, int]:
+        # ACERTOS/FALHAS POR TIPO DE LEITURA, PARA DIMENSIONAR O CACHE
+        return self.cache.estatisticas() if self.cache is not None else {}
+    
+    def listar_disciplinas(self) -> List[str]:
+        try:
+            self.cursor.execute("SELECT id, nome FROM disciplinas ORDER BY nome")
+            disciplinas = self.cursor.fetchall()
+            for id_disciplina, nome in disciplinas:
+                self.ids_disciplinas[nome] = id_disciplina
+                self.nomes_disciplinas[id_disciplina] = nome
+            return [nome for _, nome in disciplinas]
+        except Exception as e:
+            print(f"Erro ao listar disciplinas: {e}")
+            return []
+    
+    def cadastrar_aluno(self, matricula: str, nome: str) -> bool:
+        try:
+            with self.transacao():
+                self.cursor.execute("INSERT INTO alunos (matricula, nome) VALUES (?, ?)", (matricula, nome))
+                self._invalidar_cache(alunos=True, matriculas=(matricula,))
+                self._publicar(ALUNO_INSERIDO, matricula=matricula, nome=nome)
+            return True
+        except sqlite3.IntegrityError:
+            # TESTA CHAVE DUPLICADA
+            return False
+        except Exception as e:
+            print(f"Erro ao cadastrar aluno: {e}")
+            return False
+    
+    def cadastrar_nota(self, disciplina: str, valor: float, aluno_matricula: str) -> Optional[bool]:
+        # None QUANDO O ALUNO NÃO EXISTE MAIS (EXCLUÍDO POR OUTRA JANELA, OUTRO CLIENTE DO SERVIDOR...)
+        try:
+            with self.transacao():
+                self.cursor.execute(
+                    "INSERT INTO notas (disciplina_id, valor, aluno_matricula) VALUES (?, ?, ?)",
+                    (self._id_disciplina(disciplina, criar=True), valor, aluno_matricula)
+                )
+                self._invalidar_cache(matriculas=(aluno_matricula,))
+                self._publicar(NOTA_INSERIDA, matricula=aluno_matricula, disciplina=disciplina, valor=valor)
+            return True
+        except sqlite3.IntegrityError as e:
+            # FOREIGN KEY: O ALUNO NÃO EXISTE; SENÃO É CHAVE DUPLICADA (ALUNO JÁ TEM ESSA DISCIPLINA)
+            return None if "FOREIGN KEY" in str(e) else False
+        except Exception as e:
+            print(f"Erro ao cadastrar nota: {e}")
+            return False
+    
+    def importar_alunos(self, registros: Iterable[Dict[str, Any]],
+                        tamanho_lote: int = TAMANHO_LOTE_IMPORTACAO) -> ResultadoImportacao:
+        # IMPORTA EM LOTES COM executemany E UM ÚNICO COMMIT NO FINAL
+        resultado = ResultadoImportacao()
+        try:
+            with self.transacao():
+                for lote in _em_lotes(enumerate(registros, 1), tamanho_lote):
+                    candidatos = []
+                    vistos = set()
+                    for linha, registro in lote:
+                        matricula = str(registro.get("matricula") or "").strip()
+                        nome = str(registro.get("nome") or "").strip()
+                        if not matricula or not nome:
+                            resultado.rejeitar(linha, "matrícula e nome são obrigatórios")
+                        elif matricula in vistos:
+                            resultado.rejeitar(linha, f"matrícula {matricula} repetida no arquivo")
+                        else:
+                            vistos.add(matricula)
+                            candidatos.append((linha, matricula, nome))
+                    
+                    # LOTES ANTERIORES JÁ ESTÃO NO BANCO (MESMA TRANSAÇÃO), ENTÃO ESTA CONSULTA
+                    # TAMBÉM PEGA REPETIÇÕES ENTRE LOTES
+                    existentes = self._matriculas_existentes([c[1] for c in candidatos])
+                    novos = []
+                    for linha, matricula, nome in candidatos:
+                        if matricula in existentes:
+                            resultado.rejeitar(linha, f"já existe um aluno com a matrícula {matricula}")
+                        else:
+                            novos.append((matricula, nome))
+                    
+                    self.cursor.executemany("INSERT INTO alunos (matricula, nome) VALUES (?, ?)", novos)
+                    self._invalidar_cache(alunos=True, matriculas={matricula for matricula, _ in novos})
+                    resultado.inseridos += len(novos)
+                
+                if resultado.inseridos:
+                    self._publicar(ALUNOS_RECARREGADOS)
+            
+            resultado.rejeitados.sort()
+        except Exception as e:
+            resultado.inseridos = 0
+            resultado.erro = str(e)
+            print(f"Erro ao importar alunos: {e}")
+        return resultado
+    
+    def importar_notas(self, registros: Iterable[Dict[str, Any]],
+                       tamanho_lote: int = TAMANHO_LOTE_IMPORTACAO) -> ResultadoImportacao:
+        resultado = ResultadoImportacao()
+        try:
+            with self.transacao():
+                for lote in _em_lotes(enumerate(registros, 1), tamanho_lote):
+                    candidatos = []
+                    vistos = set()
+                    for linha, registro in lote:
+                        disciplina = str(registro.get("disciplina") or "").strip()
+                        matricula = str(registro.get("aluno_matricula") or registro.get("matricula") or "").strip()
+                        if not disciplina or not matricula:
+                            resultado.rejeitar(linha, "disciplina e matrícula são obrigatórias")
+                            continue
+                        try:
+                            valor = float(str(registro.get("valor")).replace(",", "."))
+                        except ValueError:
+                            resultado.rejeitar(linha, "valor de nota inválido")
+                            continue
+                        if not 0 <= valor <= 10:
+                            resultado.rejeitar(linha, "a nota deve estar entre 0 e 10")
+                        elif (disciplina, matricula) in vistos:
+                            resultado.rejeitar(linha, f"nota de '{disciplina}' repetida no arquivo para {matricula}")
+                        else:
+                            vistos.add((disciplina, matricula))
+                            candidatos.append((linha, disciplina, valor, matricula))
+                    
+                    alunos = self._matriculas_existentes([c[3] for c in candidatos])
+                    ids = {d: self._id_disciplina(d, criar=True) for d in {c[1] for c in candidatos}}
+                    existentes = self._notas_existentes([(ids[c[1]], c[3]) for c in candidatos])
+                    novas = []
+                    for linha, disciplina, valor, matricula in candidatos:
+                        if matricula not in alunos:
+                            resultado.rejeitar(linha, f"aluno {matricula} não cadastrado")
+                        elif (ids[disciplina], matricula) in existentes:
+                            resultado.rejeitar(linha, f"aluno {matricula} já tem nota em '{disciplina}'")
+                        else:
+                            novas.append((ids[disciplina], valor, matricula))
+                    
+                    self.cursor.executemany(
+                        "INSERT INTO notas (disciplina_id, valor, aluno_matricula) VALUES (?, ?, ?)",
+                        novas
+                    )
+                    self._invalidar_cache(matriculas={matricula for _, _, matricula in novas})
+                    resultado.inseridos += len(novas)
+                
+                if resultado.inseridos:
+                    self._publicar(NOTAS_RECARREGADAS)
+            
+            resultado.rejeitados.sort()
+        except Exception as e:
+            resultado.inseridos = 0
+            resultado.erro = str(e)
+            print(f"Erro ao importar notas: {e}")
+        return resultado
+    
+    def salvar_notas(self, disciplina: str, valores: Iterable[Tuple[str, Optional[float]]]) -> bool:
+        # GRAVA AS NOTAS DE UMA DISCIPLINA PARA VÁRIOS ALUNOS NUM ÚNICO COMMIT: valores = [(MATRÍCULA, NOTA)].
+        # NOTA NOVA É INSERIDA, NOTA EXISTENTE É CORRIGIDA (UPSERT) E None EXCLUI. ALUNO NÃO CADASTRADO
+        # OU NOTA FORA DE 0 A 10 RECUSA O LOTE INTEIRO
+        try:
+            # SE A MESMA MATRÍCULA APARECER MAIS DE UMA VEZ, VALE A ÚLTIMA
+            valores = dict(valores)
+            for matricula, valor in valores.items():
+                if valor is not None and not 0 <= valor <= 10:
+                    raise ValueError(f"nota de {matricula} fora de 0 a 10: {valor}")
+            
+            with self.transacao():
+                faltando = set(valores) - self._matriculas_existentes(list(valores))
+                if faltando:
+                    raise ValueError(f"alunos não cadastrados: {', '.join(sorted(faltando))}")
+                
+                criar = any(valor is not None for valor in valores.values())
+                id_disciplina = self._id_disciplina(disciplina, criar=criar)
+                if id_disciplina is None:
+                    return True
+                anteriores = self._notas_disciplina(id_disciplina, list(valores))
+                
+                # NOTAS QUE NÃO MUDARAM FICAM DE FORA, SEM MEXER NOS RESUMOS NEM GERAR EVENTOS
+                gravar = [(matricula, id_disciplina, valor) for matricula, valor in valores.items()
+                          if valor is not None and anteriores.get(matricula) != valor]
+                excluir = [(matricula, id_disciplina) for matricula, valor in valores.items()
+                           if valor is None and matricula in anteriores]
+                self.cursor.executemany(SQL_SALVAR_NOTA, gravar)
+                self.cursor.executemany("DELETE FROM notas WHERE aluno_matricula = ? AND disciplina_id = ?", excluir)
+                self._invalidar_cache(matriculas=[linha[0] for linha in gravar + excluir])
+                
+                if len(gravar) + len(excluir) > LIMITE_EVENTOS_LOTE:
+                    self._publicar(NOTAS_RECARREGADAS)
+                    return True
+                for matricula, _, valor in gravar:
+                    tipo = NOTA_ALTERADA if matricula in anteriores else NOTA_INSERIDA
+                    self._publicar(tipo, matricula=matricula, disciplina=disciplina, valor=valor)
+                for matricula, _ in excluir:
+                    self._publicar(NOTA_EXCLUIDA, matricula=matricula, disciplina=disciplina)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar notas: {e}")
+            return False
+    
+    def _matriculas_existentes(self, matriculas: List[str]) -> set:
+        # UM ÚNICO PARÂMETRO JSON EVITA O LIMITE DE VARIÁVEIS DO SQLITE
+        self.cursor.execute(
+            "SELECT matricula FROM alunos WHERE matricula IN (SELECT value FROM json_each(?))",
+            (json.dumps(matriculas),)
+        )
+        return {linha[0] for linha in self.cursor.fetchall()}
+    
+    def _notas_existentes(self, chaves: List[Tuple[int, str]]) -> set:
+        self.cursor.execute(
+            """SELECT n.disciplina_id, n.aluno_matricula
+            FROM json_each(?) AS j
+            JOIN notas AS n
+              ON n.aluno_matricula = json_extract(j.value, '$[1]')
+             AND n.disciplina_id = json_extract(j.value, '$[0]')""",
+            (json.dumps(chaves),)
+        )
+        return {tuple(linha) for linha in self.cursor.fetchall()}
+    
+    def _notas_disciplina(self, id_disciplina: int, matriculas: List[str]) -> Dict[str, float]:
+        self.cursor.execute(
+            """SELECT aluno_matricula, valor FROM notas
+            WHERE disciplina_id = ? AND aluno_matricula IN (SELECT value FROM json_each(?))""",
+            (id_disciplina, json.dumps(matriculas))
+        )
+        return dict(self.cursor.fetchall())
+    
+    def excluir_aluno(self, matricula: str) -> bool:
+        try:
+            with self.transacao():
+                # AS NOTAS VÃO JUNTO (ON DELETE CASCADE). O NOME VOLTA NO EVENTO PARA AS TELAS
+                # ACHAREM A POSIÇÃO DO ALUNO
+                self._invalidar_cache(alunos=True, matriculas=(matricula,))
+                self.cursor.execute("DELETE FROM alunos WHERE matricula = ? RETURNING nome", (matricula,))
+                excluido = self.cursor.fetchone()
+                
+                if excluido:
+                    self._publicar(ALUNO_EXCLUIDO, matricula=matricula, nome=excluido[0])
+            return True
+        except Exception as e:
+            print(f"Erro ao excluir aluno: {e}")
+            return False
+    
+    def excluir_alunos(self, matriculas: Iterable[str]) -> Optional[List[str]]:
+        # EXCLUI VÁRIOS ALUNOS (E AS NOTAS DELES) NUM ÚNICO COMANDO E COMMIT. DEVOLVE AS MATRÍCULAS
+        # QUE EXISTIAM E FORAM EXCLUÍDAS, OU None SE DEU ERRO E NADA FOI EXCLUÍDO
+        return self._excluir_alunos(
+            "DELETE FROM alunos WHERE matricula IN (SELECT value FROM json_each(?)) RETURNING matricula, nome",
+            (json.dumps(list(matriculas)),)
+        )
+    
+    def excluir_alunos_busca(self, termo: str) -> Optional[List[str]]:
+        # EXCLUI TODOS OS ALUNOS QUE buscar_alunos(termo) ENCONTRA, SEM LIMITE DE QUANTIDADE
+        consulta = consulta_busca(termo)
+        if not consulta:
+            return []
+        return self._excluir_alunos(
+            """DELETE FROM alunos WHERE id IN (SELECT rowid FROM alunos_busca WHERE alunos_busca MATCH ?)
+            RETURNING matricula, nome""",
+            (consulta,)
+        )
+    
+    def _excluir_alunos(self, sql: str, parametros: tuple) -> Optional[List[str]]:
+        try:
+            with self.transacao():
+                self.cursor.execute(sql, parametros)
+                excluidos = self.cursor.fetchall()
+                self._invalidar_cache(alunos=True, matriculas=[matricula for matricula, _ in excluidos])
+                
+                if len(excluidos) > LIMITE_EVENTOS_LOTE:
+                    self._publicar(ALUNOS_RECARREGADOS)
+                    self._publicar(NOTAS_RECARREGADAS)
+                else:
+                    for matricula, nome in excluidos:
+                        self._publicar(ALUNO_EXCLUIDO, matricula=matricula, nome=nome)
+            return [matricula for matricula, _ in excluidos]
+        except Exception as e:
+            print(f"Erro ao excluir alunos: {e}")
+            return None
+    
+    def excluir_nota(self, disciplina: str, aluno_matricula: str) -> bool:
+        try:
+            with self.transacao():
+                self.cursor.execute(
+                    "DELETE FROM notas WHERE disciplina_id = ? AND aluno_matricula = ?", 
+                    (self._id_disciplina(disciplina), aluno_matricula)
+                )
+                self._invalidar_cache(matriculas=(aluno_matricula,))
+                if self.cursor.rowcount:
+                    self._publicar(NOTA_EXCLUIDA, matricula=aluno_matricula, disciplina=disciplina)
+            return True
+        except Exception as e:
+            print(f"Erro ao excluir nota: {e}")
+            return False
+    
+    def buscar_aluno(self, matricula: str) -> Optional[Tuple[str, str]]:
+        try:
+            self.cursor.execute("SELECT matricula, nome FROM alunos WHERE matricula = ?", (matricula,))
+            return self.cursor.fetchone()
+        except Exception as e:
+            print(f"Erro ao buscar aluno: {e}")
+            return None
+    
+    def listar_alunos(self) -> List[Tuple[str, str]]:
+        try:
+            cache = self._cache_atual()
+            if cache is not None:
+                alunos = cache.buscar_alunos()
+                if alunos is not None:
+                    return alunos
+                geracao = cache.geracao
+            
+            self.cursor.execute(SQL_LISTAR_ALUNOS)
+            alunos = self.cursor.fetchall()
+            if cache is not None:
+                cache.guardar_alunos(alunos, geracao)
+            return alunos
+        except Exception as e:
+            print(f"Erro ao listar alunos: {e}")
+            return []
+    
+    def contar_alunos(self) -> int:
+        try:
+            cache = self._cache_atual()
+            if cache is not None:
+                total = cache.buscar_total_alunos()
+                if total is not None:
+                    return total
+                geracao = cache.geracao
+            
+            self.cursor.execute("SELECT COUNT(*) FROM alunos")
+            total = self.cursor.fetchone()[0]
+            if cache is not None:
+                cache.guardar_total_alunos(total, geracao)
+            return total
+        except Exception as e:
+            print(f"Erro ao contar alunos: {e}")
+            return 0
+    
+    def listar_alunos_pagina(self, apos: Optional[Tuple[str, str]] = None,
+                             antes: Optional[Tuple[str, str]] = None,
+                             limite: int = 100) -> List[Tuple[str, str]]:
+        # PAGINAÇÃO POR CHAVE (nome, matricula): O CUSTO NÃO DEPENDE DA POSIÇÃO NA LISTA
+        try:
+            if antes is not None:
+                # PÁGINA ANTERIOR: BUSCA EM ORDEM INVERSA E DESVIRA NO FINAL
+                self.cursor.execute(SQL_PAGINA_ANTES, (antes[0], antes[1], limite))
+                return self.cursor.fetchall()[::-1]
+            if apos is not None:
+                self.cursor.execute(SQL_PAGINA_APOS, (apos[0], apos[1], limite))
+            else:
+                self.cursor.execute(SQL_PRIMEIRA_PAGINA, (limite,))
+            return self.cursor.fetchall()
+        except Exception as e:
+            print(f"Erro ao listar página de alunos: {e}")
+            return []
+    
+    def chave_aluno_posicao(self, posicao: int) -> Optional[Tuple[str, str]]:
+        # CHAVE (nome, matricula) DO ALUNO NA POSIÇÃO INFORMADA, USADA PARA SALTOS DA BARRA DE ROLAGEM
+        try:
+            self.cursor.execute(SQL_CHAVE_POSICAO, (posicao,))
+            return self.cursor.fetchone()
+        except Exception as e:
+            print(f"Erro ao buscar posição de aluno: {e}")
+            return None
+    
+    def buscar_alunos(self, termo: str, limite: int = 20) -> List[Tuple[str, str]]:
+        # BUSCA POR INÍCIO DE PALAVRA NO NOME OU NA MATRÍCULA, SEM DIFERENCIAR ACENTOS E MAIÚSCULAS
+        consulta = consulta_busca(termo)
+        if not consulta:
+            return []
+        try:
+            self.cursor.execute(SQL_BUSCAR_ALUNOS, (consulta, limite))
+            return sorted(self.cursor.fetchall(), key=lambda aluno: (aluno[1], aluno[0]))
+        except Exception as e:
+            print(f"Erro ao buscar alunos: {e}")
+            return []
+    
+    def buscar_notas_aluno(self, matricula: str) -> List[Tuple[str, float]]:
+        try:
+            cache = self._cache_atual()
+            if cache is not None:
+                notas = cache.buscar_notas(matricula)
+                if notas is not None:
+                    return notas
+                geracao = cache.geracao
+            
+            self.cursor.execute(SQL_NOTAS_ALUNO, (matricula,))
+            notas = sorted(
+                (self._nome_disciplina(id_disciplina), valor) for id_disciplina, valor in self.cursor.fetchall()
+            )
+            if cache is not None:
+                cache.guardar_notas(matricula, notas, geracao)
+            return notas
+        except Exception as e:
+            print(f"Erro ao buscar notas do aluno: {e}")
+            return []
+    
+    def listar_notas_disciplina(self, disciplina: str, termo: str = "",
+                                limite: int = LIMITE_GRADE) -> List[Tuple[str, str, Optional[float]]]:
+        # (MATRÍCULA, NOME, NOTA OU None) DOS ALUNOS EM ORDEM DE NOME, PARA A GRADE DE UMA DISCIPLINA.
+        # COM termo, SÓ OS ALUNOS QUE A BUSCA ENCONTRA (buscar_alunos)
+        try:
+            id_disciplina = self._id_disciplina(disciplina)
+            if not termo.strip():
+                self.cursor.execute(SQL_NOTAS_DISCIPLINA, (id_disciplina, limite))
+                return self.cursor.fetchall()
+            
+            alunos = self.buscar_alunos(termo, limite)
+            notas = self._notas_disciplina(id_disciplina, [matricula for matricula, _ in alunos]) if id_disciplina else {}
+            return [(matricula, nome, notas.get(matricula)) for matricula, nome in alunos]
+        except Exception as e:
+            print(f"Erro ao listar notas da disciplina: {e}")
+            return []
+    
+    def media_aluno(self, matricula: str) -> Optional[Tuple[float, int, int]]:
+        # (MÉDIA, QUANTIDADE DE NOTAS, POSIÇÃO NA CLASSIFICAÇÃO GERAL); None SE NÃO TEM NOTAS
+        try:
+            self.cursor.execute(SQL_MEDIA_ALUNO, (matricula,))
+            linha = self.cursor.fetchone()
+            if not linha:
+                return None
+            media, quantidade = linha
+            self.cursor.execute(SQL_POSICAO_MEDIA, (media,))
+            return media, quantidade, self.cursor.fetchone()[0] + 1
+        except Exception as e:
+            print(f"Erro ao buscar média do aluno: {e}")
+            return None
+    
+    def estatisticas_disciplinas(self) -> List[Tuple[str, int, float, float, float, float]]:
+        # (DISCIPLINA, NOTAS, MÉDIA, MEDIANA, DESVIO PADRÃO, % DE APROVADOS), SÓ DOS RESUMOS
+        try:
+            self.cursor.execute(SQL_HISTOGRAMA_NOTAS)
+            histogramas: Dict[int, List[Tuple[int, int]]] = {}
+            for id_disciplina, faixa, quantidade in self.cursor.fetchall():
+                histogramas.setdefault(id_disciplina, []).append((faixa, quantidade))
+            
+            self.cursor.execute(SQL_ESTATISTICAS_DISCIPLINAS)
+            estatisticas = []
+            for id_disciplina, quantidade, soma, soma_quadrados, aprovados in self.cursor.fetchall():
+                media = soma / quantidade
+                variancia = max(soma_quadrados / quantidade - media * media, 0.0)
+                estatisticas.append((
+                    self._nome_disciplina(id_disciplina),
+                    quantidade,
+                    media,
+                    _mediana_histograma(histogramas.get(id_disciplina, []), quantidade),
+                    variancia ** 0.5,
+                    100.0 * aprovados / quantidade,
+                ))
+            return sorted(estatisticas)
+        except Exception as e:
+            print(f"Erro ao calcular estatísticas das disciplinas: {e}")
+            return []
+    
+    def classificacao_alunos(self, disciplina: Optional[str] = None,
+                             limite: int = LIMITE_CLASSIFICACAO) -> List[Tuple[int, str, str, float]]:
+        # (POSIÇÃO, MATRÍCULA, NOME, NOTA): PELA MÉDIA GERAL OU PELA NOTA NUMA DISCIPLINA
+        try:
+            if disciplina is None:
+                self.cursor.execute(SQL_CLASSIFICACAO_GERAL, (limite,))
+            else:
+                id_disciplina = self._id_disciplina(disciplina)
+                if id_disciplina is None:
+                    return []
+                self.cursor.execute(SQL_CLASSIFICACAO_DISCIPLINA, (id_disciplina, limite))
+            
+            classificacao = []
+            for indice, (matricula, nome, valor) in enumerate(self.cursor.fetchall(), 1):
+                posicao = classificacao[-1][0] if classificacao and classificacao[-1][3] == valor else indice
+                classificacao.append((posicao, matricula, nome, valor))
+            return classificacao
+        except Exception as e:
+            print(f"Erro ao buscar classificação: {e}")
+            return []
+    
+    def percorrer_alunos(self) -> Iterator[Tuple[str, str]]:
+        # TODOS OS ALUNOS EM ORDEM DE NOME, SEM CARREGAR A LISTA INTEIRA. O CURSOR É PRÓPRIO PARA
+        # OUTRAS CONSULTAS FEITAS DURANTE A LEITURA NÃO INTERROMPEREM ESTA
+        cursor = self._novo_cursor()
+        try:
+            cursor.execute(SQL_LISTAR_ALUNOS)
+            yield from _linhas_em_lotes(cursor)
+        finally:
+            cursor.close()
+    
+    def percorrer_notas(self) -> Iterator[Tuple[str, str, float]]:
+        # TODAS AS NOTAS COMO (MATRÍCULA, DISCIPLINA, VALOR), NA ORDEM DA CHAVE DE notas
+        cursor = self._novo_cursor()
+        try:
+            cursor.execute(
+                "SELECT aluno_matricula, disciplina_id, valor FROM notas ORDER BY aluno_matricula, disciplina_id"
+            )
+            for matricula, id_disciplina, valor in _linhas_em_lotes(cursor):
+                yield matricula, self._nome_disciplina(id_disciplina), valor
+        finally:
+            cursor.close()
+    
+    def faixas_matriculas(self, partes: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        # DIVIDE OS ALUNOS EM ATÉ partes FAIXAS [inicio, fim) DE MATRÍCULA COM QUANTIDADES PARECIDAS,
+        # PARA percorrer_boletins(inicio, fim). None = SEM LIMITE DAQUELE LADO
+        try:
+            total = self.contar_alunos()
+            # COM MENOS ALUNOS QUE partes, UMA FAIXA POR ALUNO (NENHUMA FAIXA VAZIA)
+            faixas = max(1, min(partes, total))
+            limites = []
+            for parte in range(1, faixas):
+                self.cursor.execute(SQL_MATRICULA_POSICAO, (total * parte // faixas,))
+                matricula = self.cursor.fetchone()[0]
+                if not limites or limites[-1] != matricula:
+                    limites.append(matricula)
+            return list(zip([None] + limites, limites + [None]))
+        except Exception as e:
+            print(f"Erro ao dividir matrículas: {e}")
+            return [(None, None)]
+    
+    def percorrer_boletins(self, inicio: Optional[str] = None,
+                           fim: Optional[str] = None) -> Iterator[Tuple[str, str, List[Tuple[str, float]]]]:
+        # (MATRÍCULA, NOME, [(DISCIPLINA, VALOR), ...]) DE CADA ALUNO, EM ORDEM DE NOME, AGRUPANDO
+        # AS LINHAS DE UMA ÚNICA CONSULTA COM JOIN. SÓ UM LOTE DE LINHAS FICA NA MEMÓRIA DE CADA VEZ,
+        # ENTÃO EXPORTAR TODOS OS BOLETINS CUSTA O MESMO QUALQUER QUE SEJA O TAMANHO DO BANCO.
+        # COM inicio/fim, SÓ AS MATRÍCULAS DE [inicio, fim), EM ORDEM DE MATRÍCULA
+        cursor = self._novo_cursor()
+        try:
+            if inicio is None and fim is None:
+                cursor.execute(SQL_BOLETINS)
+            elif fim is None:
+                cursor.execute(SQL_BOLETINS_APOS, (inicio,))
+            else:
+                cursor.execute(SQL_BOLETINS_FAIXA, (inicio or "", fim))
+            for (matricula, nome), linhas in groupby(_linhas_em_lotes(cursor), key=itemgetter(0, 1)):
+                # ALUNO SEM NOTAS VEM NUMA LINHA SÓ, COM disciplina_id NULL (LEFT JOIN)
+                notas = sorted(
+                    (self._nome_disciplina(id_disciplina), valor)
+                    for _, _, id_disciplina, valor in linhas if id_disciplina is not None
+                )
+                yield matricula, nome, notas
+        finally:
+            cursor.close()
+    
+    def identificador(self) -> str:
+        # IDENTIDADE DESTE ARQUIVO, GERADA NA MIGRAÇÃO 7 (E TROCADA EM CADA CÓPIA)
+        self.cursor.execute("SELECT id FROM identidade")
+        return self.cursor.fetchone()[0]
+    
+    def ultima_alteracao(self) -> int:
+        # seq DA ALTERAÇÃO MAIS NOVA DO DIÁRIO (0 = NENHUMA)
+        self.cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM diario")
+        return self.cursor.fetchone()[0]
+    
+    def alteracoes_desde(self, ultimo: int) -> Tuple[int, List[Tuple[str, Optional[str]]],
+                                                     List[Tuple[str, str, Optional[float]]]]:
+        # O QUE MUDOU DEPOIS DO seq ultimo: (seq MAIS NOVO, [(MATRÍCULA, NOME)], [(MATRÍCULA, DISCIPLINA, NOTA)]).
+        # NOME OU NOTA None = EXCLUÍDO. UMA CONSULTA SÓ, ENTÃO DIÁRIO E VALORES SÃO DO MESMO MOMENTO
+        self.cursor.execute(SQL_ALTERACOES, (ultimo,))
+        alunos = []
+        notas = []
+        for seq, matricula, id_disciplina, nome, disciplina, valor in self.cursor.fetchall():
+            ultimo = seq
+            if id_disciplina == 0:
+                alunos.append((matricula, nome))
+            else:
+                notas.append((matricula, disciplina, valor))
+        return ultimo, alunos, notas
+    
+    def posicao_sincronizacao(self, origem: str) -> Optional[int]:
+        # ATÉ ONDE ESTA RÉPLICA JÁ RECEBEU O DIÁRIO DA ORIGEM (None = NÃO É RÉPLICA DELA)
+        self.cursor.execute("SELECT ultimo FROM sincronizacao WHERE origem = ?", (origem,))
+        linha = self.cursor.fetchone()
+        return linha[0] if linha else None
+    
+    def aplicar_alteracoes(self, origem: str, ultimo: int, alunos: List[Tuple[str, Optional[str]]],
+                           notas: List[Tuple[str, str, Optional[float]]]) -> bool:
+        # GRAVA NESTA RÉPLICA O RESULTADO DE alteracoes_desde DA ORIGEM, JUNTO COM A NOVA POSIÇÃO,
+        # NUM ÚNICO COMMIT. REAPLICAR É INOFENSIVO: LINHAS IGUAIS NÃO SÃO REGRAVADAS
+        try:
+            with self.transacao():
+                # ALUNOS ANTES DAS NOTAS: NOTA NOVA PRECISA DO ALUNO, E ALUNO EXCLUÍDO LEVA AS NOTAS JUNTO
+                self.cursor.executemany(SQL_APLICAR_ALUNO, [linha for linha in alunos if linha[1] is not None])
+                self.cursor.execute(
+                    "DELETE FROM alunos WHERE matricula IN (SELECT value FROM json_each(?))",
+                    (json.dumps([matricula for matricula, nome in alunos if nome is None]),)
+                )
+                self.cursor.executemany(SQL_APLICAR_NOTA, [
+                    (matricula, self._id_disciplina(disciplina, criar=True), valor)
+                    for matricula, disciplina, valor in notas if valor is not None
+                ])
+                self.cursor.executemany("DELETE FROM notas WHERE aluno_matricula = ? AND disciplina_id = ?", [
+                    (matricula, self._id_disciplina(disciplina))
+                    for matricula, disciplina, valor in notas if valor is None
+                ])
+                self.cursor.execute(
+                    """INSERT INTO sincronizacao (origem, ultimo) VALUES (?, ?)
+                    ON CONFLICT (origem) DO UPDATE SET ultimo = excluded.ultimo""",
+                    (origem, ultimo)
+                )
+                
+                if alunos or notas:
+                    self._invalidar_cache(alunos=bool(alunos), matriculas=[linha[0] for linha in alunos + notas])
+                    self._publicar(ALUNOS_RECARREGADOS)
+                    self._publicar(NOTAS_RECARREGADAS)
+            return True
+        except Exception as e:
+            print(f"Erro ao aplicar alterações: {e}")
+            return False
+    
+    def registrar_copia(self, origem: str, ultimo: int) -> bool:
+        # CHAMADO NUM ARQUIVO RECÉM-COPIADO DE origem (ATÉ O seq ultimo): A CÓPIA É OUTRO BANCO,
+        # COM IDENTIDADE E DIÁRIO PRÓPRIOS, E VIRA RÉPLICA DA ORIGEM
+        try:
+            with self.transacao():
+                self.cursor.execute("UPDATE identidade SET id = lower(hex(randomblob(16)))")
+                self.cursor.execute("DELETE FROM diario")
+                self.cursor.execute("DELETE FROM sincronizacao")
+                self.cursor.execute("INSERT INTO sincronizacao (origem, ultimo) VALUES (?, ?)", (origem, ultimo))
+            return True
+        except Exception as e:
+            print(f"Erro ao registrar cópia: {e}")
+            return False
+    
+    def fechar(self):
+        if self.instrumentacao is not None:
+            self.instrumentar(None)
+        if self.conexao:
+            self.conexao.close()
@@ -0,0 +1,475 @@
+# MEDIÇÃO DE DESEMPENHO DO Banco E DAS ATUALIZAÇÕES DE TELA, COM DADOS SINTÉTICOS REPRODUTÍVEIS:
+#
+#     python -m benchmark --alunos 10000 --disciplinas 10 --saida base.json
+#     python -m benchmark --alunos 10000 --disciplinas 10 --comparar base.json
+#
+# A MESMA SEMENTE GERA SEMPRE OS MESMOS ALUNOS E NOTAS. AS TELAS SÃO MEDIDAS COM WIDGETS
+# SIMULADOS (SEM JANELA), ENTÃO RODA EM SERVIDOR SEM DISPLAY. COM --comparar, O CÓDIGO DE
+# SAÍDA É 1 SE ALGUM CASO FICOU MAIS LENTO QUE A BASE ALÉM DA TOLERÂNCIA
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import List, Tuple, Optional, Iterator, Dict, Any, Callable, NamedTuple
+
+from banco import Banco, escrever_boletins, PERFIL_PADRAO, TAMANHO_CACHE_NOTAS
+
+# VERSÃO DO FORMATO DO ARQUIVO JSON DE RESULTADOS
+VERSAO_RESULTADOS = 1
+# DIFERENÇA ABSOLUTA (ms) ABAIXO DA QUAL UMA PIORA É CONSIDERADA RUÍDO DE MEDIÇÃO
+PIORA_MINIMA_MS = 0.05
+# ALUNOS/NOTAS POR REPETIÇÃO NOS CASOS DE IMPORTAÇÃO
+TAMANHO_IMPORTACAO = 1000
+# ALUNOS DA TURMA NO CASO DE LANÇAMENTO DE NOTAS EM GRADE (salvar_notas)
+TAMANHO_TURMA = 60
+
+# MÉTODOS PÚBLICOS DO Banco QUE NÃO FAZEM SENTIDO MEDIR (CONFIGURAÇÃO, FECHAMENTO OU UMA LINHA SÓ)
+NAO_MEDIDOS = {
+    "inscrever", "aplicar_perfil", "estatisticas_cache", "instrumentar", "fechar",
+    "identificador", "ultima_alteracao", "posicao_sincronizacao", "registrar_copia",
+}
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+         "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago",
+         "Valéria", "Yuri"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+              "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Albuquerque", "Araújo"]
+DISCIPLINAS = ["Matemática", "Português", "História", "Geografia", "Física", "Química", "Biologia",
+               "Inglês", "Artes", "Educação Física", "Filosofia", "Sociologia"]
+
+
+class Caso(NamedTuple):
+    nome: str
+    # MÉTODO DO Banco COBERTO POR ESTE CASO (None PARA AS ATUALIZAÇÕES DE TELA)
+    metodo: Optional[str]
+    # RECEBE O NÚMERO DA REPETIÇÃO; SÓ ESTA CHAMADA É CRONOMETRADA
+    executar: Callable[[int], Any]
+    # FRAÇÃO DAS REPETIÇÕES (CASOS QUE PERCORREM A TABELA INTEIRA RODAM MENOS VEZES)
+    fracao: float = 1.0
+
+
+def matricula_sintetica(indice: int) -> str:
+    return f"{indice:07d}"
+
+
+def nome_disciplina(indice: int) -> str:
+    if indice < len(DISCIPLINAS):
+        return DISCIPLINAS[indice]
+    return f"{DISCIPLINAS[indice % len(DISCIPLINAS)]} {indice // len(DISCIPLINAS) + 1}"
+
+
+def registros_alunos(quantidade: int, semente: int = 42) -> Iterator[Dict[str, Any]]:
+    # ALUNOS NO FORMATO ACEITO POR Banco.importar_alunos; MESMA SEMENTE = MESMOS NOMES
+    aleatorio = random.Random(semente)
+    for indice in range(quantidade):
+        nome = f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}"
+        yield {"matricula": matricula_sintetica(indice), "nome": nome}
+
+
+def registros_notas(alunos: int, disciplinas: int, semente: int = 42) -> Iterator[Dict[str, Any]]:
+    # UMA NOTA POR ALUNO EM CADA DISCIPLINA, COM UMA CASA DECIMAL E CONCENTRADAS PERTO DE 6,5
+    aleatorio = random.Random(semente + 1)
+    for indice in range(alunos):
+        matricula = matricula_sintetica(indice)
+        for disciplina in range(disciplinas):
+            valor = min(10.0, max(0.0, round(aleatorio.gauss(6.5, 2.0), 1)))
+            yield {"matricula": matricula, "disciplina": nome_disciplina(disciplina), "valor": valor}
+
+
+def gerar_dados(banco: Banco, alunos: int, disciplinas: int, semente: int = 42):
+    resultado = banco.importar_alunos(registros_alunos(alunos, semente))
+    if resultado.erro:
+        raise RuntimeError(f"Erro ao gerar alunos: {resultado.erro}")
+    resultado = banco.importar_notas(registros_notas(alunos, disciplinas, semente))
+    if resultado.erro:
+        raise RuntimeError(f"Erro ao gerar notas: {resultado.erro}")
+
+
+class TreeviewSimulado:
+    # O SUFICIENTE DE ttk.Treeview PARA A TabelaVirtual E AS TABELAS DE NOTAS, SEM JANELA
+    def __init__(self, altura: int = 25):
+        self.altura = altura
+        self.itens: List[str] = []
+        self.valores: Dict[str, tuple] = {}
+        self.selecionados: Tuple[str, ...] = ()
+        self.foco = ""
+    
+    def __str__(self):
+        return f".simulado{id(self)}"
+    
+    def cget(self, opcao: str):
+        return self.altura if opcao == "height" else ""
+    
+    def configure(self, **opcoes):
+        pass
+    
+    config = configure
+    
+    def bind(self, sequencia, funcao=None, add=None):
+        pass
+    
+    def insert(self, pai, indice, iid=None, values=()):
+        iid = iid if iid is not None else f"I{len(self.valores)}"
+        if indice == "end":
+            self.itens.append(iid)
+        else:
+            self.itens.insert(indice, iid)
+        self.valores[iid] = tuple(values)
+        return iid
+    
+    def delete(self, *iids):
+        for iid in iids:
+            self.itens.remove(iid)
+            del self.valores[iid]
+        self.selecionados = tuple(i for i in self.selecionados if i in self.valores)
+    
+    def get_children(self, *args):
+        return tuple(self.itens)
+    
+    def exists(self, iid) -> bool:
+        return iid in self.valores
+    
+    def item(self, iid, **opcoes):
+        if "values" in opcoes:
+            self.valores[iid] = tuple(opcoes["values"])
+            return None
+        return {"values": list(self.valores[iid])}
+    
+    def selection(self):
+        return self.selecionados
+    
+    def selection_set(self, iids):
+        self.selecionados = tuple(iids) if isinstance(iids, (list, tuple)) else (iids,)
+    
+    def focus(self, iid=None):
+        if iid is None:
+            return self.foco
+        self.foco = iid
+    
+    def bbox(self, iid, *args):
+        return (0, 0, 100, 20)
+
+
+class WidgetSimulado:
+    # ScrollBar, Label E OUTROS WIDGETS CUJO CONTEÚDO O BENCHMARK NÃO PRECISA CONFERIR
+    def __init__(self):
+        self.opcoes: Dict[str, Any] = {}
+    
+    def configure(self, **opcoes):
+        self.opcoes.update(opcoes)
+    
+    config = configure
+    
+    def set(self, *args):
+        pass
+
+
+class SeletorSimulado:
+    def __init__(self):
+        self.matricula: Optional[str] = None
+
+
+def _esperar_tela(banco_assincrono):
+    # COMO O mainloop, MAS SEM O INTERVALO DE INTERVALO_DESPACHO ENTRE AS ENTREGAS
+    while banco_assincrono.ocupado():
+        banco_assincrono.despachar()
+        time.sleep(0)
+
+
+def _percorrer(iterador: Iterator) -> int:
+    return sum(1 for _ in iterador)
+
+
+def casos_banco(banco: Banco, arquivo: str, alunos: int, disciplinas: int, semente: int,
+                perfil: str, tamanho_cache: int) -> List[Caso]:
+    # LEITURAS PRIMEIRO; AS ESCRITAS NO FINAL MEXEM NOS DADOS SÓ DEPOIS DE TODAS AS LEITURAS
+    aleatorio = random.Random(semente + 2)
+    sorteados = [matricula_sintetica(aleatorio.randrange(alunos)) for _ in range(1000)]
+    sorteado = lambda i: sorteados[i % len(sorteados)]
+    meio = banco.chave_aluno_posicao(alunos // 2) or ("", "")
+    faixas = banco.faixas_matriculas(8)
+    recentes = banco.ultima_alteracao() - TAMANHO_IMPORTACAO
+    alteracoes = banco.alteracoes_desde(recentes)
+    
+    def abrir(i):
+        Banco(arquivo, tamanho_cache=tamanho_cache, perfil=perfil).fechar()
+    
+    def transacao(i):
+        with banco.transacao():
+            for j in range(100):
+                banco.cadastrar_nota(f"Transação {i}", 5.0, matricula_sintetica(j % alunos))
+    
+    return [
+        Caso("abrir banco (criar_tabelas)", "criar_tabelas", abrir),
+        Caso("verificar_planos", "verificar_planos", lambda i: banco.verificar_planos()),
+        Caso("buscar_aluno", "buscar_aluno", lambda i: banco.buscar_aluno(sorteado(i))),
+        Caso("contar_alunos", "contar_alunos", lambda i: banco.contar_alunos()),
+        Caso("listar_alunos", "listar_alunos", lambda i: banco.listar_alunos(), 0.1),
+        Caso("listar_alunos_pagina (início)", "listar_alunos_pagina", lambda i: banco.listar_alunos_pagina(limite=50)),
+        Caso("listar_alunos_pagina (após o meio)", "listar_alunos_pagina",
+             lambda i: banco.listar_alunos_pagina(apos=meio, limite=50)),
+        Caso("listar_alunos_pagina (antes do meio)", "listar_alunos_pagina",
+             lambda i: banco.listar_alunos_pagina(antes=meio, limite=50)),
+        Caso("chave_aluno_posicao (meio)", "chave_aluno_posicao", lambda i: banco.chave_aluno_posicao(alunos // 2)),
+        Caso("buscar_alunos (nome e sobrenome)", "buscar_alunos", lambda i: banco.buscar_alunos("ana sil")),
+        Caso("buscar_alunos (uma letra)", "buscar_alunos", lambda i: banco.buscar_alunos("a")),
+        Caso("buscar_notas_aluno", "buscar_notas_aluno", lambda i: banco.buscar_notas_aluno(sorteado(i))),
+        Caso("listar_notas_disciplina (grade)", "listar_notas_disciplina",
+             lambda i: banco.listar_notas_disciplina(nome_disciplina(i % disciplinas))),
+        Caso("listar_notas_disciplina (busca)", "listar_notas_disciplina",
+             lambda i: banco.listar_notas_disciplina(nome_disciplina(i % disciplinas), "ana")),
+        Caso("listar_disciplinas", "listar_disciplinas", lambda i: banco.listar_disciplinas()),
+        Caso("media_aluno", "media_aluno", lambda i: banco.media_aluno(sorteado(i))),
+        Caso("estatisticas_disciplinas", "estatisticas_disciplinas", lambda i: banco.estatisticas_disciplinas()),
+        Caso("classificacao_alunos (geral)", "classificacao_alunos", lambda i: banco.classificacao_alunos()),
+        Caso("classificacao_alunos (disciplina)", "classificacao_alunos",
+             lambda i: banco.classificacao_alunos(nome_disciplina(i % disciplinas))),
+        Caso("percorrer_alunos", "percorrer_alunos", lambda i: _percorrer(banco.percorrer_alunos()), 0.1),
+        Caso("percorrer_notas", "percorrer_notas", lambda i: _percorrer(banco.percorrer_notas()), 0.1),
+        Caso("percorrer_boletins", "percorrer_boletins", lambda i: _percorrer(banco.percorrer_boletins()), 0.1),
+        Caso("faixas_matriculas (8)", "faixas_matriculas", lambda i: banco.faixas_matriculas(8)),
+        Caso("percorrer_boletins (1/8 das matrículas)", "percorrer_boletins",
+             lambda i: _percorrer(banco.percorrer_boletins(*faixas[i % len(faixas)])), 0.1),
+        Caso(f"alteracoes_desde (últimas {TAMANHO_IMPORTACAO})", "alteracoes_desde",
+             lambda i: banco.alteracoes_desde(recentes)),
+        Caso("escrever_boletins (csv)", None, lambda i: escrever_boletins(
+            os.devnull, banco.percorrer_boletins(), "csv", banco.listar_disciplinas()
+        ), 0.1),
+        Caso("cadastrar_aluno", "cadastrar_aluno", lambda i: banco.cadastrar_aluno(f"N{i:07d}", f"Aluno Novo {i}")),
+        Caso("cadastrar_nota", "cadastrar_nota",
+             lambda i: banco.cadastrar_nota("Benchmark", 7.5, matricula_sintetica(i % alunos))),
+        Caso("excluir_nota", "excluir_nota",
+             lambda i: banco.excluir_nota("Benchmark", matricula_sintetica(i % alunos))),
+        Caso("transacao (100 cadastrar_nota)", "transacao", transacao),
+        Caso(f"salvar_notas (turma de {TAMANHO_TURMA})", "salvar_notas", lambda i: banco.salvar_notas(
+            "Grade", [(matricula_sintetica(j % alunos), float(i % 11)) for j in range(TAMANHO_TURMA)]
+        )),
+        Caso(f"importar_alunos ({TAMANHO_IMPORTACAO})", "importar_alunos", lambda i: banco.importar_alunos(
+            {"matricula": f"I{i:04d}{j:05d}", "nome": f"Importado {j}"} for j in range(TAMANHO_IMPORTACAO)
+        )),
+        Caso(f"importar_notas ({TAMANHO_IMPORTACAO})", "importar_notas", lambda i: banco.importar_notas(
+            {"matricula": f"I{i:04d}{j:05d}", "disciplina": "Importada", "valor": 6.0}
+            for j in range(TAMANHO_IMPORTACAO)
+        )),
+        Caso(f"excluir_alunos ({TAMANHO_IMPORTACAO}, com as notas)", "excluir_alunos", lambda i: banco.excluir_alunos(
+            [f"I{i:04d}{j:05d}" for j in range(TAMANHO_IMPORTACAO)]
+        )),
+        Caso("excluir_alunos_busca", "excluir_alunos_busca", lambda i: banco.excluir_alunos_busca(f"N{i:07d}")),
+        # A RÉPLICA É O PRÓPRIO BANCO: AS LINHAS JÁ ESTÃO IGUAIS E SÓ A POSIÇÃO É GRAVADA
+        Caso(f"aplicar_alteracoes ({TAMANHO_IMPORTACAO}, sem diferenças)", "aplicar_alteracoes",
+             lambda i: banco.aplicar_alteracoes("benchmark", *alteracoes)),
+        Caso("excluir_aluno", "excluir_aluno", lambda i: banco.excluir_aluno(matricula_sintetica(alunos - 1 - i))),
+    ]
+
+
+def casos_tela(arquivo: str, alunos: int, semente: int, perfil: str, tamanho_cache: int):
+    # MONTA SÓ A PARTE DA Aplicacao USADA PELAS ATUALIZAÇÕES DE TELA, COM WIDGETS SIMULADOS.
+    # O TEMPO INCLUI A IDA À THREAD DO BANCO E O PREENCHIMENTO DAS TABELAS
+    from alunos_notas import Aplicacao, BancoAssincrono, TabelaVirtual
+    
+    app = Aplicacao.__new__(Aplicacao)
+    app.banco = BancoAssincrono(lambda: Banco(arquivo, tamanho_cache=tamanho_cache, perfil=perfil))
+    app.tabela_alunos = TreeviewSimulado()
+    app.tabela_virtual = TabelaVirtual(app.tabela_alunos, WidgetSimulado(), app.banco)
+    app.seletor_notas = SeletorSimulado()
+    app.seletor_consulta = SeletorSimulado()
+    app.tabela_notas = TreeviewSimulado()
+    app.tabela_consulta = TreeviewSimulado()
+    app.label_media_consulta = WidgetSimulado()
+    
+    aleatorio = random.Random(semente + 3)
+    sorteados = [matricula_sintetica(aleatorio.randrange(alunos)) for _ in range(1000)]
+    
+    def atualizar_tabela_alunos(i):
+        app.atualizar_tabela_alunos()
+        _esperar_tela(app.banco)
+    
+    def rolar_tabela_alunos(i):
+        # SALTOS PELA LISTA INTEIRA, COMO ARRASTAR A BARRA DE ROLAGEM
+        app.tabela_virtual.mostrar((i * 7919) % max(1, alunos))
+        _esperar_tela(app.banco)
+    
+    def exibir_notas_aluno(i):
+        app.seletor_notas.matricula = sorteados[i % len(sorteados)]
+        app.exibir_notas_aluno(None)
+        _esperar_tela(app.banco)
+    
+    def consultar_notas_aluno(i):
+        app.seletor_consulta.matricula = sorteados[i % len(sorteados)]
+        app.consultar_notas_aluno(None)
+        _esperar_tela(app.banco)
+    
+    casos = [
+        Caso("tela: atualizar_tabela_alunos", None, atualizar_tabela_alunos),
+        Caso("tela: rolar tabela de alunos", None, rolar_tabela_alunos),
+        Caso("tela: exibir_notas_aluno", None, exibir_notas_aluno),
+        Caso("tela: consultar_notas_aluno", None, consultar_notas_aluno),
+    ]
+    return casos, app.banco.fechar
+
+
+def medir(caso: Caso, repeticoes: int) -> Dict[str, float]:
+    quantidade = max(3, int(repeticoes * caso.fracao))
+    tempos = []
+    # COMO O timeit: O COLETOR DE LIXO NÃO ENTRA NO MEIO DAS MEDIÇÕES
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(quantidade):
+            inicio = time.perf_counter_ns()
+            caso.executar(i)
+            tempos.append((time.perf_counter_ns() - inicio) / 1e6)
+    finally:
+        gc.enable()
+    
+    tempos.sort()
+    return {
+        "repeticoes": quantidade,
+        "media_ms": sum(tempos) / quantidade,
+        "mediana_ms": tempos[quantidade // 2],
+        "minimo_ms": tempos[0],
+        "p95_ms": tempos[min(quantidade - 1, int(quantidade * 0.95))],
+        "maximo_ms": tempos[-1],
+    }
+
+
+def metodos_sem_caso(casos: List[Caso]) -> List[str]:
+    # MÉTODOS NOVOS DO Banco APARECEM AQUI ATÉ GANHAREM UM CASO (OU ENTRAREM EM NAO_MEDIDOS)
+    publicos = {nome for nome in dir(Banco) if not nome.startswith("_") and callable(getattr(Banco, nome))}
+    return sorted(publicos - NAO_MEDIDOS - {caso.metodo for caso in casos})
+
+
+def comparar(resultados: Dict[str, Any], base: Dict[str, Any], tolerancia: float) -> List[Tuple[str, float, float, bool]]:
+    # (CASO, MEDIANA DA BASE, MEDIANA ATUAL, SE PIOROU ALÉM DA TOLERÂNCIA) PARA OS CASOS PRESENTES NOS DOIS
+    comparacao = []
+    for nome, atual in resultados["casos"].items():
+        anterior = base["casos"].get(nome)
+        if anterior is None:
+            continue
+        antes, agora = anterior["mediana_ms"], atual["mediana_ms"]
+        piorou = agora > antes * (1 + tolerancia) and agora - antes > PIORA_MINIMA_MS
+        comparacao.append((nome, antes, agora, piorou))
+    return comparacao
+
+
+def executar(alunos: int, disciplinas: int, semente: int = 42, repeticoes: int = 30,
+             perfil: str = PERFIL_PADRAO, tamanho_cache: int = TAMANHO_CACHE_NOTAS,
+             medir_tela: bool = True, pasta: Optional[str] = None, instrumentar: bool = False,
+             progresso: Callable[[str], None] = lambda texto: None) -> Dict[str, Any]:
+    pasta_temporaria = pasta is None
+    pasta = tempfile.mkdtemp(prefix="benchmark_notas_") if pasta_temporaria else pasta
+    arquivo = os.path.join(pasta, f"benchmark_{alunos}x{disciplinas}_{semente}.db")
+    if os.path.exists(arquivo):
+        os.remove(arquivo)
+    
+    resultados: Dict[str, Any] = {
+        "versao": VERSAO_RESULTADOS,
+        "parametros": {
+            "alunos": alunos, "disciplinas": disciplinas, "semente": semente, "repeticoes": repeticoes,
+            "perfil": perfil, "tamanho_cache": tamanho_cache, "instrumentado": instrumentar,
+        },
+        "ambiente": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "sistema": platform.platform(),
+        },
+        "casos": {},
+    }
+    
+    banco = Banco(arquivo, tamanho_cache=tamanho_cache, perfil=perfil)
+    fechar_tela = None
+    try:
+        progresso(f"Gerando {alunos} alunos x {disciplinas} disciplinas...")
+        inicio = time.perf_counter()
+        gerar_dados(banco, alunos, disciplinas, semente)
+        resultados["geracao_s"] = time.perf_counter() - inicio
+        
+        if instrumentar:
+            # MEDE O CUSTO DA INSTRUMENTAÇÃO LIGADA (SÓ NOS CASOS DO Banco; AS TELAS TÊM CONEXÃO PRÓPRIA)
+            from instrumentacao import Instrumentacao
+            banco.instrumentar(Instrumentacao(limite_lento_ms=float("inf")))
+        
+        casos = casos_banco(banco, arquivo, alunos, disciplinas, semente, perfil, tamanho_cache)
+        resultados["metodos_sem_caso"] = metodos_sem_caso(casos)
+        if medir_tela:
+            # AS TELAS VÊM ANTES DAS ESCRITAS PARA VEREM OS DADOS GERADOS, SEM MUDANÇAS
+            primeira_escrita = next(i for i, caso in enumerate(casos) if caso.metodo == "cadastrar_aluno")
+            casos_de_tela, fechar_tela = casos_tela(arquivo, alunos, semente, perfil, tamanho_cache)
+            casos = casos[:primeira_escrita] + casos_de_tela + casos[primeira_escrita:]
+        
+        for caso in casos:
+            progresso(caso.nome)
+            resultados["casos"][caso.nome] = medir(caso, repeticoes)
+    finally:
+        if fechar_tela is not None:
+            fechar_tela()
+        banco.fechar()
+        if pasta_temporaria:
+            shutil.rmtree(pasta, ignore_errors=True)
+    return resultados
+
+
+def imprimir_resultados(resultados: Dict[str, Any], comparacao: Optional[List[Tuple[str, float, float, bool]]] = None):
+    base = {nome: (antes, piorou) for nome, antes, _, piorou in comparacao or []}
+    print(f"{'caso':<42} {'mediana':>10} {'p95':>10} {'base':>10} {'razão':>7}")
+    for nome, medida in resultados["casos"].items():
+        linha = f"{nome:<42} {medida['mediana_ms']:>8.3f}ms {medida['p95_ms']:>8.3f}ms"
+        if nome in base:
+            antes, piorou = base[nome]
+            razao = medida["mediana_ms"] / antes if antes else float("inf")
+            linha += f" {antes:>8.3f}ms {razao:>6.2f}x" + ("  <-- PIOROU" if piorou else "")
+        print(linha)
+    if resultados.get("metodos_sem_caso"):
+        print(f"\nMétodos do Banco sem caso de benchmark: {', '.join(resultados['metodos_sem_caso'])}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmark", description="Mede o desempenho do Banco e das telas.")
+    parser.add_argument("--alunos", type=int, default=10000)
+    parser.add_argument("--disciplinas", type=int, default=10)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=30, help="repetições por caso (padrão: 30)")
+    parser.add_argument("--perfil", default=PERFIL_PADRAO, help="perfil de conexão do Banco")
+    parser.add_argument("--sem-cache", action="store_true", help="mede com o cache de leituras desligado")
+    parser.add_argument("--sem-tela", action="store_true", help="não mede as atualizações de tela")
+    parser.add_argument("--instrumentar", action="store_true", help="mede com a instrumentação do Banco ligada")
+    parser.add_argument("--pasta", help="pasta do banco gerado (padrão: temporária, apagada no final)")
+    parser.add_argument("--saida", help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--comparar", metavar="BASE", help="compara com um JSON gravado antes por --saida")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora aceita sobre a base (padrão: 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+    
+    resultados = executar(
+        args.alunos, args.disciplinas, args.semente, args.repeticoes, args.perfil,
+        0 if args.sem_cache else TAMANHO_CACHE_NOTAS, not args.sem_tela, args.pasta, args.instrumentar,
+        progresso=lambda texto: print(f"... {texto}", file=sys.stderr)
+    )
+    
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    
+    comparacao = None
+    if base is not None:
+        if base.get("parametros") != resultados["parametros"]:
+            print("Aviso: a base foi medida com outros parâmetros; a comparação pode não valer.", file=sys.stderr)
+        comparacao = comparar(resultados, base, args.tolerancia)
+    
+    imprimir_resultados(resultados, comparacao)
+    return 1 if comparacao and any(piorou for *_, piorou in comparacao) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
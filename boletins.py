@@ -0,0 +1,107 @@
+# GERAÇÃO DOS BOLETINS DA ESCOLA INTEIRA EM VÁRIOS PROCESSOS, UM POR NÚCLEO DA CPU:
+#
+#     gerar_boletins_paralelo("notas_alunos.db", "boletins/", formato="html",
+#                             progresso=lambda feitos, total: print(feitos, "de", total))
+#
+# OS ALUNOS SÃO DIVIDIDOS EM FAIXAS DE MATRÍCULA (Banco.faixas_matriculas). CADA FAIXA VIRA UM
+# ARQUIVO PRÓPRIO, ESCRITO POR UM PROCESSO COM A SUA CONEXÃO SOMENTE LEITURA (mode=ro), ENTÃO
+# NINGUÉM DISPUTA TRAVA NEM ARQUIVO DE SAÍDA E O TEMPO CAI QUASE NA PROPORÇÃO DOS NÚCLEOS
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Tuple, Optional, Iterator, Callable
+
+from banco import Banco, escrever_boletins
+
+# FAIXAS POR PROCESSO: MAIS FAIXAS QUE PROCESSOS EQUILIBRAM A CARGA QUANDO ALGUMA FAIXA DEMORA MAIS
+FAIXAS_POR_PROCESSO = 4
+# A CADA QUANTOS BOLETINS UM PROCESSO AVISA O PROGRESSO
+INTERVALO_PROGRESSO = 500
+
+# FILA DE PROGRESSO DO PROCESSO PRINCIPAL, RECEBIDA POR CADA PROCESSO AO INICIAR
+_fila_progresso: Optional["multiprocessing.Queue"] = None
+
+
+def _iniciar_processo(fila: "multiprocessing.Queue"):
+    global _fila_progresso
+    _fila_progresso = fila
+
+
+def _avisando(boletins: Iterator[tuple]) -> Iterator[tuple]:
+    pendentes = 0
+    for boletim in boletins:
+        yield boletim
+        pendentes += 1
+        if pendentes == INTERVALO_PROGRESSO:
+            _fila_progresso.put(pendentes)
+            pendentes = 0
+    if pendentes:
+        _fila_progresso.put(pendentes)
+
+
+def _gerar_faixa(arquivo_db: str, inicio: Optional[str], fim: Optional[str], destino: str,
+                 formato: str, disciplinas: List[str]) -> int:
+    # RODA NUM PROCESSO DO POOL: ABRE A PRÓPRIA CONEXÃO, SÓ DE LEITURA E SEM CACHE
+    banco = Banco(arquivo_db, tamanho_cache=0, somente_leitura=True)
+    try:
+        return escrever_boletins(destino, _avisando(banco.percorrer_boletins(inicio, fim)), formato, disciplinas)
+    finally:
+        banco.fechar()
+
+
+def gerar_boletins_paralelo(arquivo_db: str, pasta: str, formato: str = "html",
+                            processos: Optional[int] = None,
+                            progresso: Optional[Callable[[int, int], None]] = None) -> Tuple[int, List[str]]:
+    # GRAVA boletins_001.<formato>, boletins_002.<formato>... EM pasta, EM ORDEM DE MATRÍCULA, E DEVOLVE
+    # (QUANTOS BOLETINS, ARQUIVOS GERADOS). progresso(FEITOS, TOTAL) É CHAMADO NESTA THREAD À MEDIDA
+    # QUE OS PROCESSOS AVANÇAM
+    processos = processos or os.cpu_count() or 1
+    banco = Banco(arquivo_db, tamanho_cache=0, somente_leitura=True)
+    try:
+        total = banco.contar_alunos()
+        faixas = banco.faixas_matriculas(processos * FAIXAS_POR_PROCESSO)
+        disciplinas = banco.listar_disciplinas()
+    finally:
+        banco.fechar()
+    
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = [os.path.join(pasta, f"boletins_{numero:03d}.{formato}") for numero in range(1, len(faixas) + 1)]
+    
+    # spawn E NÃO fork: O PROCESSO PRINCIPAL PODE SER A JANELA, COM THREADS E O Tk ABERTOS
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    feitos = 0
+    gerados = 0
+    
+    def receber_progresso():
+        nonlocal feitos
+        while True:
+            try:
+                feitos += fila.get_nowait()
+            except queue.Empty:
+                break
+        if progresso is not None:
+            progresso(feitos, total)
+    
+    with ProcessPoolExecutor(min(processos, len(faixas)), mp_context=contexto,
+                             initializer=_iniciar_processo, initargs=(fila,)) as executor:
+        pendentes = {
+            executor.submit(_gerar_faixa, arquivo_db, inicio, fim, destino, formato, disciplinas)
+            for (inicio, fim), destino in zip(faixas, arquivos)
+        }
+        try:
+            while pendentes:
+                concluidos, pendentes = wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    # ERRO EM QUALQUER FAIXA INTERROMPE TUDO (result() LEVANTA A EXCEÇÃO DO PROCESSO)
+                    gerados += futuro.result()
+                receber_progresso()
+        except BaseException:
+            for futuro in pendentes:
+                futuro.cancel()
+            raise
+    
+    receber_progresso()
+    return gerados, arquivos
+
@@ -0,0 +1,167 @@
+# CLIENTE DO servidor.py QUE SE PASSA POR UM Banco: OS MÉTODOS DE LEITURA E ESCRITA VIRAM PEDIDOS
+# HTTP E OS EVENTOS DAS ESCRITAS (DESTE E DOS OUTROS CLIENTES) CHEGAM AOS OUVINTES POR CONSULTA
+# LONGA EM /eventos. ASSIM A JANELA USA O SERVIDOR SÓ TROCANDO A FÁBRICA DO BancoAssincrono:
+#
+#     BancoAssincrono(lambda: ClienteRemoto("http://servidor:8765", token="segredo"))
+#
+# COMO O Banco, CADA ClienteRemoto É USADO POR UMA THREAD SÓ (A CONEXÃO HTTP NÃO É COMPARTILHADA)
+import http.client
+import json
+import select
+import threading
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from banco import Evento, ResultadoImportacao, ALUNOS_RECARREGADOS, NOTAS_RECARREGADAS
+
+# SEGUNDOS QUE O SERVIDOR SEGURA CADA CONSULTA DE EVENTOS QUANDO NÃO HÁ NADA NOVO
+ESPERA_EVENTOS = 25.0
+# SEGUNDOS ATÉ TENTAR DE NOVO QUANDO A CONSULTA DE EVENTOS FALHA (SERVIDOR FORA DO AR)
+PAUSA_RECONEXAO = 2.0
+
+# MÉTODOS QUE DEVOLVEM UMA TUPLA (O JSON SÓ TEM LISTAS)
+_RETORNAM_TUPLA = frozenset({"buscar_aluno", "chave_aluno_posicao", "media_aluno"})
+
+
+class ErroServidor(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(f"{mensagem} (HTTP {status})")
+        self.status = status
+
+
+class ClienteRemoto:
+    def __init__(self, url: str = "http://127.0.0.1:8765", token: Optional[str] = None, tempo_limite: float = 60.0):
+        partes = urlsplit(url)
+        if partes.scheme != "http" or not partes.hostname:
+            raise ValueError(f"Endereço do servidor inválido: {url}")
+        self.url = url
+        self.host = partes.hostname
+        self.porta = partes.port or 80
+        self.tempo_limite = tempo_limite
+        self.cabecalhos = {"Content-Type": "application/json"}
+        if token:
+            self.cabecalhos["Authorization"] = f"Bearer {token}"
+        
+        self.conexao = http.client.HTTPConnection(self.host, self.porta, timeout=tempo_limite)
+        metodos = self._pedir("GET", "/api")
+        # SÓ AS LEITURAS PODEM SER REPETIDAS SEM RISCO QUANDO A RESPOSTA SE PERDE
+        self.leituras = frozenset(metodos["leitura"])
+        self.metodos = self.leituras | frozenset(metodos["escrita"])
+        
+        # O SERVIDOR NÃO EXPÕE A MEDIÇÃO: A JANELA DE DIAGNÓSTICO MOSTRA "DESLIGADA"
+        self.instrumentacao = None
+        self.ouvintes: List[Callable[[Evento], None]] = []
+        self.thread_eventos: Optional[threading.Thread] = None
+        self.fechado = threading.Event()
+    
+    def __getattr__(self, nome: str) -> Any:
+        # SÓ CHEGA AQUI O QUE NÃO É ATRIBUTO DO PRÓPRIO CLIENTE
+        if nome != "metodos" and nome in self.metodos:
+            return partial(self._chamar, nome)
+        raise AttributeError(f"'{nome}' não está disponível pelo servidor {self.url}")
+    
+    def _pedir(self, metodo: str, caminho: str, dados: Any = None,
+               conexao: Optional[http.client.HTTPConnection] = None, repetir: bool = True) -> Any:
+        # repetir=False PARA ESCRITAS: SE A CONEXÃO CAI DEPOIS DO ENVIO, O SERVIDOR PODE TER
+        # GRAVADO E O PEDIDO NÃO É MANDADO DE NOVO
+        conexao = conexao or self.conexao
+        corpo = None if dados is None else json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        if not repetir:
+            _descartar_se_fechada(conexao)
+        for tentativa in range(2):
+            enviado = False
+            try:
+                conexao.request(metodo, caminho, corpo, self.cabecalhos)
+                enviado = True
+                resposta = conexao.getresponse()
+                conteudo = resposta.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # O SERVIDOR FECHOU A CONEXÃO PARADA (keep-alive): REABRE E TENTA MAIS UMA VEZ
+                conexao.close()
+                if tentativa or (enviado and not repetir):
+                    raise
+        
+        dados_resposta = json.loads(conteudo) if conteudo else {}
+        if resposta.status != 200:
+            raise ErroServidor(resposta.status, dados_resposta.get("erro", resposta.reason))
+        return dados_resposta
+    
+    def _chamar(self, metodo: str, *args, **kwargs) -> Any:
+        if metodo.startswith("importar_"):
+            # OS REGISTROS COSTUMAM VIR DE UM GERADOR (ler_registros): VÃO TODOS NUM PEDIDO SÓ
+            args = (list(args[0]),) + args[1:]
+        resultado = self._pedir(
+            "POST", f"/api/{metodo}", {"args": args, "kwargs": kwargs}, repetir=metodo in self.leituras
+        )["resultado"]
+        
+        if metodo.startswith("importar_"):
+            importacao = ResultadoImportacao()
+            importacao.inseridos = resultado["inseridos"]
+            importacao.rejeitados = [tuple(rejeitado) for rejeitado in resultado["rejeitados"]]
+            importacao.erro = resultado["erro"]
+            return importacao
+        if metodo in _RETORNAM_TUPLA:
+            return tuple(resultado) if resultado is not None else None
+        if isinstance(resultado, list):
+            return [tuple(item) if isinstance(item, list) else item for item in resultado]
+        return resultado
+    
+    def inscrever(self, ouvinte: Callable[[Evento], None]):
+        # OUVINTES SÃO CHAMADOS NA THREAD DE EVENTOS DO CLIENTE, NA ORDEM EM QUE O SERVIDOR GRAVOU
+        self.ouvintes.append(ouvinte)
+        if self.thread_eventos is None:
+            ultimo = self._pedir("GET", "/eventos?desde=-1")["ultimo"]
+            self.thread_eventos = threading.Thread(
+                target=self._acompanhar_eventos, args=(ultimo,), name="eventos_remotos", daemon=True
+            )
+            self.thread_eventos.start()
+    
+    def _avisar(self, eventos: Iterable[Evento]):
+        for evento in eventos:
+            for ouvinte in self.ouvintes:
+                try:
+                    ouvinte(evento)
+                except Exception as e:
+                    print(f"Erro ao tratar evento {evento.tipo}: {e}")
+    
+    def _acompanhar_eventos(self, ultimo: int):
+        # CONEXÃO PRÓPRIA: A CONSULTA LONGA NÃO PODE SEGURAR OS PEDIDOS DA THREAD DO BANCO
+        conexao = http.client.HTTPConnection(self.host, self.porta, timeout=ESPERA_EVENTOS + self.tempo_limite)
+        try:
+            while not self.fechado.is_set():
+                try:
+                    resposta = self._pedir("GET", f"/eventos?desde={ultimo}&espera={ESPERA_EVENTOS}", conexao=conexao)
+                except (OSError, ValueError, ErroServidor) as e:
+                    if self.fechado.is_set():
+                        return
+                    print(f"Erro ao buscar eventos do servidor: {e}")
+                    conexao.close()
+                    self.fechado.wait(PAUSA_RECONEXAO)
+                    continue
+                
+                if self.fechado.is_set():
+                    return
+                ultimo = resposta["ultimo"]
+                if resposta.get("recarregar"):
+                    # EVENTOS PERDIDOS: A TELA RELÊ ALUNOS E NOTAS
+                    self._avisar([Evento(ALUNOS_RECARREGADOS), Evento(NOTAS_RECARREGADAS)])
+                else:
+                    self._avisar(Evento(**dados) for dados in resposta["eventos"])
+        finally:
+            conexao.close()
+    
+    def estatisticas_servidor(self) -> Dict[str, Any]:
+        return self._pedir("GET", "/estado")
+    
+    def fechar(self):
+        self.fechado.set()
+        self.conexao.close()
+
+
+def _descartar_se_fechada(conexao: http.client.HTTPConnection):
+    # UMA CONEXÃO keep-alive PARADA SÓ TEM O QUE LER SE O SERVIDOR A FECHOU (TEMPO_OCIOSO):
+    # FECHA DESTE LADO TAMBÉM, PARA O PRÓXIMO PEDIDO SAIR NUMA CONEXÃO NOVA
+    if conexao.sock is not None and select.select([conexao.sock], [], [], 0)[0]:
+        conexao.close()
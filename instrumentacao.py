@@ -0,0 +1,413 @@
+# MEDIÇÃO OPCIONAL DO Banco EM PRODUÇÃO: TEMPO POR MÉTODO E POR COMANDO SQL (HISTOGRAMAS),
+# LINHAS, PASSOS DA VM DO SQLITE, ESPERA POR TRAVA E REGISTRO DE CONSULTAS LENTAS.
+#
+#     banco.instrumentar(Instrumentacao(limite_lento_ms=50, arquivo_lento="lentas.log"))
+#     print(banco.instrumentacao.relatorio())
+#     banco.instrumentar(None)
+#
+# TUDO É INSTALADO NA CONEXÃO E NO OBJETO Banco SÓ ENQUANTO LIGADO; DESLIGADO, O Banco
+# VOLTA A USAR O CURSOR E OS MÉTODOS ORIGINAIS E NÃO SOBRA NENHUM CUSTO NO CAMINHO
+import inspect
+import sqlite3
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+from typing import List, Tuple, Optional, Dict, Any, Callable, Deque
+
+# LIMITES SUPERIORES (ms) DAS FAIXAS DOS HISTOGRAMAS; A ÚLTIMA FAIXA NÃO TEM LIMITE
+FAIXAS_HISTOGRAMA_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+# A PARTIR DE QUANTOS ms UM MÉTODO OU COMANDO ENTRA NO REGISTRO DE LENTOS
+LIMITE_LENTO_MS = 100.0
+# QUANTOS REGISTROS DE LENTOS FICAM NA MEMÓRIA PARA O RELATÓRIO
+MAXIMO_LENTOS = 200
+# INSTRUÇÕES DA VM DO SQLITE ENTRE DUAS CHAMADAS DO progress handler
+PASSOS_PROGRESSO = 1000
+
+# MÉTODOS DO Banco QUE NÃO SÃO MEDIDOS: transacao SÓ DEVOLVE O GERENCIADOR DE CONTEXTO
+# (A ESPERA PELA TRAVA APARECE NO BEGIN IMMEDIATE) E OS OUTROS NÃO CONSULTAM O BANCO
+NAO_MEDIDOS = {"instrumentar", "inscrever", "transacao", "estatisticas_cache", "fechar"}
+
+
+class Histograma:
+    def __init__(self):
+        self.faixas = [0] * (len(FAIXAS_HISTOGRAMA_MS) + 1)
+        self.quantidade = 0
+        self.total_ms = 0.0
+        self.maximo_ms = 0.0
+    
+    def registrar(self, ms: float):
+        self.faixas[bisect_left(FAIXAS_HISTOGRAMA_MS, ms)] += 1
+        self.quantidade += 1
+        self.total_ms += ms
+        if ms > self.maximo_ms:
+            self.maximo_ms = ms
+    
+    def percentil(self, fracao: float) -> float:
+        # LIMITE SUPERIOR DA FAIXA ONDE CAI O PERCENTIL (O MÁXIMO, SE FOR A ÚLTIMA FAIXA)
+        if not self.quantidade:
+            return 0.0
+        alvo = fracao * self.quantidade
+        acumulado = 0
+        for indice, quantidade in enumerate(self.faixas):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                if indice < len(FAIXAS_HISTOGRAMA_MS):
+                    return min(FAIXAS_HISTOGRAMA_MS[indice], self.maximo_ms)
+                break
+        return self.maximo_ms
+    
+    def dados(self) -> Dict[str, Any]:
+        return {
+            "quantidade": self.quantidade,
+            "total_ms": round(self.total_ms, 3),
+            "media_ms": round(self.total_ms / self.quantidade, 3) if self.quantidade else 0.0,
+            "p50_ms": round(self.percentil(0.5), 3),
+            "p95_ms": round(self.percentil(0.95), 3),
+            "p99_ms": round(self.percentil(0.99), 3),
+            "maximo_ms": round(self.maximo_ms, 3),
+            "faixas": {
+                (f"<={limite}" if indice < len(FAIXAS_HISTOGRAMA_MS) else f">{FAIXAS_HISTOGRAMA_MS[-1]}"): quantidade
+                for indice, (limite, quantidade) in enumerate(zip(FAIXAS_HISTOGRAMA_MS + (None,), self.faixas))
+                if quantidade
+            },
+        }
+
+
+class Medida:
+    # TEMPOS E CONTADORES DE UM MÉTODO DO Banco OU DE UM COMANDO SQL
+    def __init__(self):
+        self.tempos = Histograma()
+        self.linhas = 0
+        self.passos = 0
+        self.comandos = 0
+        self.falhas = 0
+    
+    def dados(self) -> Dict[str, Any]:
+        dados = self.tempos.dados()
+        dados.update(linhas=self.linhas, passos=self.passos, comandos=self.comandos, falhas=self.falhas)
+        return dados
+
+
+class CursorInstrumentado:
+    # FICA NO LUGAR DO sqlite3.Cursor ENQUANTO A INSTRUMENTAÇÃO ESTÁ LIGADA. O TEMPO DE UM
+    # COMANDO INCLUI OS fetch* SEGUINTES, JÁ QUE O SQLITE SÓ PRODUZ AS LINHAS AO LER
+    def __init__(self, cursor: sqlite3.Cursor, instrumentacao: "Instrumentacao", numero: int = 0):
+        self.cursor = cursor
+        self.instrumentacao = instrumentacao
+        # ORDEM DE CRIAÇÃO: DIZ QUAIS CURSORES NASCERAM DURANTE UMA CHAMADA MEDIDA
+        self.numero = numero
+        self.sql: Optional[str] = None
+        self.tempo = 0
+        self.linhas = 0
+        self.passos = 0
+    
+    def __getattr__(self, nome: str):
+        # rowcount, lastrowid, description, close... VÊM DO CURSOR ORIGINAL
+        return getattr(self.cursor, nome)
+    
+    def __iter__(self):
+        while True:
+            linha = self.fetchone()
+            if linha is None:
+                return
+            yield linha
+    
+    def _executar(self, metodo: Callable, sql: str, parametros) -> "CursorInstrumentado":
+        self.concluir()
+        self.sql = sql
+        self.tempo = 0
+        self.passos = 0
+        try:
+            self._ler(metodo, sql, parametros)
+        except sqlite3.Error as e:
+            self.instrumentacao.registrar_falha(sql, e)
+            self.concluir()
+            raise
+        if self.cursor.description is None:
+            # ESCRITA: AS LINHAS SÃO AS AFETADAS
+            self.linhas = max(self.cursor.rowcount, 0)
+        return self
+    
+    def execute(self, sql: str, parametros=()) -> "CursorInstrumentado":
+        return self._executar(self.cursor.execute, sql, parametros)
+    
+    def executemany(self, sql: str, parametros) -> "CursorInstrumentado":
+        return self._executar(self.cursor.executemany, sql, parametros)
+    
+    def _ler(self, metodo: Callable, *args):
+        # OS PASSOS DA VM SÃO CONTADOS SÓ DURANTE AS CHAMADAS DESTE CURSOR, PARA OUTRO CURSOR
+        # LENDO INTERCALADO (percorrer_*) NÃO SOMAR NA CONTA DESTE
+        passos = self.instrumentacao.passos
+        inicio = time.perf_counter_ns()
+        try:
+            return metodo(*args)
+        finally:
+            self.tempo += time.perf_counter_ns() - inicio
+            self.passos += self.instrumentacao.passos - passos
+    
+    def fetchone(self):
+        linha = self._ler(self.cursor.fetchone)
+        if linha is not None:
+            self.linhas += 1
+        return linha
+    
+    def fetchmany(self, tamanho: int = 1):
+        linhas = self._ler(self.cursor.fetchmany, tamanho)
+        self.linhas += len(linhas)
+        return linhas
+    
+    def fetchall(self):
+        linhas = self._ler(self.cursor.fetchall)
+        self.linhas += len(linhas)
+        return linhas
+    
+    def close(self):
+        self.concluir()
+        if self in self.instrumentacao.cursores:
+            self.instrumentacao.cursores.remove(self)
+        self.cursor.close()
+    
+    def concluir(self):
+        # FECHA A MEDIÇÃO DO COMANDO ANTERIOR (NO PRÓXIMO execute OU NO FIM DO MÉTODO)
+        if self.sql is not None:
+            passos = self.passos * self.instrumentacao.passos_progresso
+            self.instrumentacao.registrar_sql(self.sql, self.tempo / 1e6, self.linhas, passos)
+            self.sql = None
+            self.linhas = 0
+
+
+class Instrumentacao:
+    def __init__(self, limite_lento_ms: float = LIMITE_LENTO_MS, arquivo_lento: Optional[str] = None,
+                 passos_progresso: int = PASSOS_PROGRESSO):
+        self.limite_lento_ms = limite_lento_ms
+        self.arquivo_lento = arquivo_lento
+        self.passos_progresso = passos_progresso
+        
+        # CONTADORES ALIMENTADOS PELOS CALLBACKS DA CONEXÃO
+        self.comandos = 0
+        self.passos = 0
+        
+        self.metodos: Dict[str, Medida] = {}
+        self.consultas: Dict[str, Medida] = {}
+        self.espera_trava = Histograma()
+        self.travamentos = 0
+        self.lentos: Deque[Tuple[str, str, str, float, int]] = deque(maxlen=MAXIMO_LENTOS)
+        self.inicio = time.time()
+        
+        # SQL ORIGINAL -> TEXTO EM UMA LINHA (OS COMANDOS DO Banco SÃO CONSTANTES, ENTÃO É POUCA COISA)
+        self.textos: Dict[str, str] = {}
+        self.cursores: List[CursorInstrumentado] = []
+        self.criados = 0
+        self.principal: Optional[CursorInstrumentado] = None
+        self.medidos: List[str] = []
+    
+    def instalar(self, banco):
+        banco.cursor = self.principal = self.envolver(banco.cursor)
+        # O TRACE RECEBE O SQL COM OS VALORES JÁ SUBSTITUÍDOS (DADOS DE ALUNOS): SÓ É CONTADO.
+        # ELE TAMBÉM VÊ O COMMIT E OS COMANDOS DOS GATILHOS, QUE NÃO PASSAM PELO CURSOR
+        banco.conexao.set_trace_callback(self._comando)
+        banco.conexao.set_progress_handler(self._progresso, self.passos_progresso)
+        
+        for nome, metodo in inspect.getmembers(type(banco), inspect.isfunction):
+            if nome.startswith("_") or nome in NAO_MEDIDOS:
+                continue
+            original = getattr(banco, nome)
+            self.medidos.append(nome)
+            if inspect.isgeneratorfunction(metodo):
+                setattr(banco, nome, self._medir_gerador(nome, original))
+            else:
+                setattr(banco, nome, self._medir(nome, original))
+    
+    def remover(self, banco):
+        for nome in self.medidos:
+            delattr(banco, nome)
+        for cursor in self.cursores:
+            cursor.concluir()
+        banco.cursor = banco.cursor.cursor
+        banco.conexao.set_trace_callback(None)
+        banco.conexao.set_progress_handler(None, 0)
+        self.cursores = []
+        self.principal = None
+        self.medidos = []
+    
+    def envolver(self, cursor: sqlite3.Cursor) -> CursorInstrumentado:
+        self.criados += 1
+        instrumentado = CursorInstrumentado(cursor, self, self.criados)
+        self.cursores.append(instrumentado)
+        return instrumentado
+    
+    def _comando(self, sql: str):
+        self.comandos += 1
+    
+    def _progresso(self) -> int:
+        # DEVOLVER DIFERENTE DE ZERO INTERROMPERIA A CONSULTA
+        self.passos += 1
+        return 0
+    
+    def _medir(self, nome: str, metodo: Callable) -> Callable:
+        @wraps(metodo)
+        def medido(*args, **kwargs):
+            comandos = self.comandos
+            criados = self.criados
+            inicio = time.perf_counter_ns()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                # O CURSOR PRINCIPAL E OS ABERTOS NESTA CHAMADA. OS DE UM percorrer_* QUE AINDA
+                # ESTÁ SENDO LIDO CONTINUAM MEDINDO ATÉ O GERADOR TERMINAR
+                self.principal.concluir()
+                self._concluir_cursores(self._criados_desde(criados))
+                self.registrar_metodo(nome, (time.perf_counter_ns() - inicio) / 1e6, self.comandos - comandos)
+        
+        return medido
+    
+    def _medir_gerador(self, nome: str, metodo: Callable) -> Callable:
+        # GERADORES (percorrer_*) SÃO MEDIDOS DO PRIMEIRO AO ÚLTIMO ITEM, SEM O TEMPO DE QUEM LÊ
+        @wraps(metodo)
+        def medido(*args, **kwargs):
+            gerador = metodo(*args, **kwargs)
+            tempo = 0
+            comandos = 0
+            linhas = 0
+            # CURSORES ABERTOS PELO PRÓPRIO GERADOR (NÃO OS DE QUEM O LÊ ENTRE UM ITEM E OUTRO)
+            proprios: List[CursorInstrumentado] = []
+            try:
+                while True:
+                    antes = self.comandos
+                    criados = self.criados
+                    inicio = time.perf_counter_ns()
+                    try:
+                        item = next(gerador)
+                    except StopIteration:
+                        return
+                    finally:
+                        tempo += time.perf_counter_ns() - inicio
+                        comandos += self.comandos - antes
+                        if self.criados != criados:
+                            proprios += self._criados_desde(criados)
+                    linhas += 1
+                    yield item
+            finally:
+                gerador.close()
+                self._concluir_cursores(proprios)
+                self.registrar_metodo(nome, tempo / 1e6, comandos, linhas)
+        
+        return medido
+    
+    def _criados_desde(self, criados: int) -> List[CursorInstrumentado]:
+        return [cursor for cursor in self.cursores if cursor.numero > criados]
+    
+    def _concluir_cursores(self, cursores: List[CursorInstrumentado]):
+        for cursor in cursores:
+            cursor.concluir()
+    
+    def _texto(self, sql: str) -> str:
+        texto = self.textos.get(sql)
+        if texto is None:
+            texto = self.textos[sql] = " ".join(sql.split())
+        return texto
+    
+    def registrar_metodo(self, nome: str, ms: float, comandos: int, linhas: int = 0):
+        medida = self.metodos.get(nome)
+        if medida is None:
+            medida = self.metodos[nome] = Medida()
+        medida.tempos.registrar(ms)
+        medida.comandos += comandos
+        medida.linhas += linhas
+        if ms >= self.limite_lento_ms:
+            self._registrar_lento("metodo", nome, ms, linhas)
+    
+    def registrar_sql(self, sql: str, ms: float, linhas: int, passos: int):
+        texto = self._texto(sql)
+        medida = self.consultas.get(texto)
+        if medida is None:
+            medida = self.consultas[texto] = Medida()
+        medida.tempos.registrar(ms)
+        medida.linhas += linhas
+        medida.passos += passos
+        if texto.startswith("BEGIN"):
+            # O BEGIN IMMEDIATE SÓ DEMORA QUANDO ESPERA OUTRA CONEXÃO LIBERAR A ESCRITA
+            self.espera_trava.registrar(ms)
+        if ms >= self.limite_lento_ms:
+            self._registrar_lento("sql", texto, ms, linhas)
+    
+    def registrar_falha(self, sql: str, erro: sqlite3.Error):
+        medida = self.consultas.get(self._texto(sql))
+        if medida is None:
+            medida = self.consultas[self._texto(sql)] = Medida()
+        medida.falhas += 1
+        if isinstance(erro, sqlite3.OperationalError) and "locked" in str(erro):
+            self.travamentos += 1
+    
+    def _registrar_lento(self, tipo: str, nome: str, ms: float, linhas: int):
+        hora = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.lentos.append((hora, tipo, nome, ms, linhas))
+        if self.arquivo_lento:
+            try:
+                with open(self.arquivo_lento, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(f"{hora}\t{ms:.1f}ms\t{tipo}\t{linhas} linhas\t{nome}\n")
+            except OSError as e:
+                print(f"Erro ao gravar consulta lenta: {e}")
+    
+    def limpar(self):
+        self.metodos.clear()
+        self.consultas.clear()
+        self.espera_trava = Histograma()
+        self.travamentos = 0
+        self.lentos.clear()
+        self.inicio = time.time()
+    
+    def dados(self) -> Dict[str, Any]:
+        # TUDO EM TIPOS SIMPLES, PRONTO PARA json.dump
+        return {
+            "segundos": round(time.time() - self.inicio, 1),
+            "limite_lento_ms": self.limite_lento_ms,
+            "comandos": self.comandos,
+            "travamentos": self.travamentos,
+            "espera_trava": self.espera_trava.dados(),
+            "metodos": {nome: medida.dados() for nome, medida in sorted(self.metodos.items())},
+            "consultas": {texto: medida.dados() for texto, medida in sorted(self.consultas.items())},
+            "lentos": [
+                {"hora": hora, "tipo": tipo, "nome": nome, "ms": round(ms, 3), "linhas": linhas}
+                for hora, tipo, nome, ms, linhas in self.lentos
+            ],
+        }
+    
+    def relatorio(self, limite: int = 15) -> str:
+        # TEXTO PARA O TERMINAL OU A JANELA DE DIAGNÓSTICO: O QUE MAIS GASTOU TEMPO PRIMEIRO
+        linhas = [
+            f"Medindo há {time.time() - self.inicio:.0f}s; {self.comandos} comandos SQL executados "
+            f"(contando COMMIT e gatilhos); {self.travamentos} falhas por banco travado",
+            f"Espera por trava (BEGIN IMMEDIATE): {self.espera_trava.quantidade}x, "
+            f"total {self.espera_trava.total_ms:.1f}ms, máximo {self.espera_trava.maximo_ms:.1f}ms",
+            "",
+            f"{'método':<28} {'chamadas':>8} {'total':>10} {'p50':>8} {'p95':>8} {'máx':>9} {'cmd/ch':>7}",
+        ]
+        for nome, medida in _mais_demorados(self.metodos, limite):
+            tempos = medida.tempos
+            linhas.append(
+                f"{nome:<28} {tempos.quantidade:>8} {tempos.total_ms:>8.1f}ms {tempos.percentil(0.5):>6.2f}ms "
+                f"{tempos.percentil(0.95):>6.2f}ms {tempos.maximo_ms:>7.1f}ms {medida.comandos / tempos.quantidade:>7.1f}"
+            )
+        
+        linhas += ["", f"{'execuções':>9} {'total':>10} {'p95':>8} {'linhas':>8} {'passos VM':>10}  comando"]
+        for texto, medida in _mais_demorados(self.consultas, limite):
+            tempos = medida.tempos
+            falhas = f" ({medida.falhas} falhas)" if medida.falhas else ""
+            linhas.append(
+                f"{tempos.quantidade:>9} {tempos.total_ms:>8.1f}ms {tempos.percentil(0.95):>6.2f}ms "
+                f"{medida.linhas:>8} {medida.passos:>10}  {texto[:90]}{falhas}"
+            )
+        
+        linhas += ["", f"Mais lentos que {self.limite_lento_ms:g}ms (últimos {MAXIMO_LENTOS}):"]
+        for hora, tipo, nome, ms, quantidade in list(self.lentos)[-limite:]:
+            linhas.append(f"  {hora} {ms:>9.1f}ms {tipo:<6} {quantidade:>7} linhas  {nome[:90]}")
+        return "\n".join(linhas)
+
+
+def _mais_demorados(medidas: Dict[str, Medida], limite: int) -> List[Tuple[str, Medida]]:
+    return sorted(
+        ((nome, medida) for nome, medida in medidas.items() if medida.tempos.quantidade),
+        key=lambda item: item[1].tempos.total_ms, reverse=True
+    )[:limite]
@@ -0,0 +1,307 @@
+# LINHA DE COMANDO DO SISTEMA DE NOTAS, PARA SCRIPTS E TAREFAS AGENDADAS (SEM tkinter):
+#
+#     python -m notas_cli importar alunos alunos.csv
+#     python -m notas_cli exportar notas notas.jsonl
+#     python -m notas_cli exportar boletins boletins.html
+#     python -m notas_cli exportar boletins pasta_boletins/ --processos 4
+#     python -m notas_cli listar alunos --busca "ana"
+#     python -m notas_cli estatisticas --classificacao Matemática
+#     python -m notas_cli excluir aluno 2025.001 2025.002
+#     python -m notas_cli excluir aluno --busca "2024."
+#     python -m notas_cli copiar backup/notas.db
+#     python -m notas_cli sincronizar replica.db
+#
+# AS LISTAGENS SAEM SEPARADAS POR TAB, SEM CABEÇALHO. CÓDIGO DE SAÍDA 0 = TUDO CERTO,
+# 1 = ERRO OU ALGUM ITEM RECUSADO/NÃO ENCONTRADO, 2 = ARGUMENTOS INVÁLIDOS.
+# PARA O COMANDO SUBIR RÁPIDO, O MÓDULO banco (E O sqlite3) SÓ É IMPORTADO DEPOIS DE LER OS ARGUMENTOS
+import argparse
+import os
+import sys
+from itertools import islice
+from typing import List, Optional
+
+# CAMPOS DOS ARQUIVOS DE EXPORTAÇÃO (OS MESMOS NOMES QUE A IMPORTAÇÃO ACEITA)
+CAMPOS_ALUNOS = ["matricula", "nome"]
+CAMPOS_NOTAS = ["matricula", "disciplina", "valor"]
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="notas_cli", description="Cadastro de alunos e notas pela linha de comando.")
+    parser.add_argument("--banco", default="notas_alunos.db", help="arquivo do banco (padrão: notas_alunos.db)")
+    parser.add_argument("--perfil", default=None, help="perfil de conexão: seguro (padrão), rapido ou compativel")
+    parser.add_argument(
+        "--diagnostico", action="store_true",
+        help="no final, mostra na saída de erros o tempo de cada método e comando SQL"
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True, metavar="comando")
+    
+    importar = comandos.add_parser("importar", aliases=["import"], help="importa alunos ou notas de CSV/JSONL")
+    importar.add_argument("tipo", choices=["alunos", "notas"])
+    importar.add_argument("arquivo")
+    importar.add_argument("--formato", choices=["csv", "jsonl"], help="padrão: pela extensão do arquivo")
+    importar.set_defaults(funcao=comando_importar)
+    
+    exportar = comandos.add_parser(
+        "exportar", aliases=["export"],
+        help="exporta alunos ou notas para CSV/JSONL, ou os boletins (notas e média de cada aluno) também para HTML"
+    )
+    exportar.add_argument("tipo", choices=["alunos", "notas", "boletins"])
+    exportar.add_argument("arquivo", nargs="?", default="-", help="padrão: saída padrão (CSV)")
+    exportar.add_argument("--formato", choices=["csv", "jsonl", "html"], help="padrão: pela extensão do arquivo")
+    exportar.add_argument(
+        "--processos", type=int, metavar="N",
+        help="boletins em N processos (0 = um por núcleo), um arquivo por faixa de matrículas na pasta informada"
+    )
+    exportar.set_defaults(funcao=comando_exportar)
+    
+    listar = comandos.add_parser(
+        "listar", aliases=["list"],
+        help="lista alunos (matrícula, nome), notas de um aluno (disciplina, valor) ou disciplinas"
+    )
+    listar.add_argument("tipo", choices=["alunos", "notas", "disciplinas"])
+    listar.add_argument("matricula", nargs="?", help="aluno das notas (obrigatório em 'listar notas')")
+    listar.add_argument("--busca", help="só alunos cujo nome ou matrícula comecem com estas palavras")
+    listar.add_argument("--limite", type=int, default=None, help="quantidade máxima de alunos")
+    listar.set_defaults(funcao=comando_listar)
+    
+    estatisticas = comandos.add_parser(
+        "estatisticas", aliases=["stats"],
+        help="por disciplina: notas, média, mediana, desvio padrão e %% de aprovados"
+    )
+    grupo = estatisticas.add_mutually_exclusive_group()
+    grupo.add_argument("--aluno", metavar="MATRICULA", help="média, quantidade de notas e posição do aluno")
+    grupo.add_argument(
+        "--classificacao", nargs="?", const="", metavar="DISCIPLINA",
+        help="posição, matrícula, nome e nota, pela média geral ou pela nota na disciplina"
+    )
+    estatisticas.add_argument("--limite", type=int, default=50, help="linhas da classificação (padrão: 50)")
+    estatisticas.set_defaults(funcao=comando_estatisticas)
+    
+    excluir = comandos.add_parser("excluir", aliases=["delete"], help="exclui alunos (com as notas) ou uma nota")
+    excluir_tipos = excluir.add_subparsers(dest="tipo", required=True, metavar="tipo")
+    excluir_aluno = excluir_tipos.add_parser("aluno", help="exclui um ou mais alunos num único comando")
+    excluir_aluno.add_argument("matriculas", nargs="*", metavar="matricula")
+    excluir_aluno.add_argument("--busca", help="exclui todos os alunos cujo nome ou matrícula comecem com estas palavras")
+    excluir_nota = excluir_tipos.add_parser("nota", help="exclui a nota de um aluno numa disciplina")
+    excluir_nota.add_argument("matricula")
+    excluir_nota.add_argument("disciplina")
+    excluir.set_defaults(funcao=comando_excluir)
+    
+    copiar = comandos.add_parser(
+        "copiar", aliases=["backup"],
+        help="cópia de segurança do banco, mesmo com o programa aberto (a cópia já serve de réplica)"
+    )
+    copiar.add_argument("destino")
+    copiar.set_defaults(funcao=comando_copiar)
+    
+    sincronizar = comandos.add_parser(
+        "sincronizar", aliases=["sync"],
+        help="leva a uma réplica só as alterações desde a última sincronização (cria a réplica se não existir)"
+    )
+    sincronizar.add_argument("replica")
+    sincronizar.set_defaults(funcao=comando_sincronizar)
+    
+    return parser
+
+
+def escrever_linha(*colunas):
+    print("\t".join(str(coluna) for coluna in colunas))
+
+
+def comando_importar(banco, args) -> int:
+    from banco import ler_registros
+    
+    registros = ler_registros(args.arquivo, args.formato)
+    if args.tipo == "alunos":
+        resultado = banco.importar_alunos(registros)
+    else:
+        resultado = banco.importar_notas(registros)
+    
+    if resultado.erro:
+        print(f"Erro: nada foi importado: {resultado.erro}", file=sys.stderr)
+        return 1
+    
+    for linha, motivo in resultado.rejeitados:
+        print(f"linha {linha}: {motivo}", file=sys.stderr)
+    print(f"{resultado.inseridos} {args.tipo} importados, {len(resultado.rejeitados)} linhas recusadas")
+    return 1 if resultado.rejeitados else 0
+
+
+def comando_exportar(banco, args) -> int:
+    from banco import escrever_registros, escrever_boletins
+    
+    if args.tipo == "boletins" and args.processos is not None:
+        return exportar_boletins_paralelo(args)
+    if args.tipo == "boletins":
+        total = escrever_boletins(args.arquivo, banco.percorrer_boletins(), args.formato, banco.listar_disciplinas())
+        if args.arquivo != "-":
+            print(f"{total} boletins exportados para {args.arquivo}")
+        return 0
+    
+    if args.formato == "html":
+        raise ValueError("HTML só está disponível para boletins")
+    if args.tipo == "alunos":
+        registros = ({"matricula": m, "nome": n} for m, n in banco.percorrer_alunos())
+        campos = CAMPOS_ALUNOS
+    else:
+        registros = ({"matricula": m, "disciplina": d, "valor": v} for m, d, v in banco.percorrer_notas())
+        campos = CAMPOS_NOTAS
+    
+    total = escrever_registros(args.arquivo, registros, campos, args.formato)
+    if args.arquivo != "-":
+        print(f"{total} {args.tipo} exportados para {args.arquivo}")
+    return 0
+
+
+def exportar_boletins_paralelo(args) -> int:
+    from boletins import gerar_boletins_paralelo
+    
+    if args.arquivo == "-":
+        raise ValueError("com --processos, informe a pasta onde gravar os boletins")
+    
+    def mostrar_progresso(feitos: int, total: int):
+        # SÓ NO TERMINAL: REDIRECIONADA PARA ARQUIVO, A SAÍDA DE ERROS NÃO RECEBE UMA LINHA POR AVISO
+        if sys.stderr.isatty():
+            print(f"\r{feitos}/{total} boletins", end="", file=sys.stderr, flush=True)
+    
+    total, arquivos = gerar_boletins_paralelo(
+        args.banco, args.arquivo, args.formato or "html", args.processos or None, mostrar_progresso
+    )
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    print(f"{total} boletins exportados para {len(arquivos)} arquivos em {args.arquivo}")
+    return 0
+
+
+def comando_listar(banco, args) -> int:
+    if args.tipo == "disciplinas":
+        for disciplina in banco.listar_disciplinas():
+            escrever_linha(disciplina)
+    elif args.tipo == "notas":
+        if not args.matricula:
+            print("Informe a matrícula do aluno.", file=sys.stderr)
+            return 2
+        if banco.buscar_aluno(args.matricula) is None:
+            print(f"Aluno {args.matricula} não encontrado.", file=sys.stderr)
+            return 1
+        for disciplina, valor in banco.buscar_notas_aluno(args.matricula):
+            escrever_linha(disciplina, valor)
+    elif args.busca:
+        for matricula, nome in banco.buscar_alunos(args.busca, limite=args.limite or 20):
+            escrever_linha(matricula, nome)
+    else:
+        for matricula, nome in islice(banco.percorrer_alunos(), args.limite):
+            escrever_linha(matricula, nome)
+    return 0
+
+
+def comando_estatisticas(banco, args) -> int:
+    if args.aluno:
+        media = banco.media_aluno(args.aluno)
+        if media is None:
+            print(f"Aluno {args.aluno} sem notas cadastradas.", file=sys.stderr)
+            return 1
+        valor, quantidade, posicao = media
+        escrever_linha(f"{valor:.2f}", quantidade, posicao)
+    elif args.classificacao is not None:
+        for posicao, matricula, nome, valor in banco.classificacao_alunos(args.classificacao or None, args.limite):
+            escrever_linha(posicao, matricula, nome, f"{valor:.2f}")
+    else:
+        for disciplina, quantidade, media, mediana, desvio, aprovacao in banco.estatisticas_disciplinas():
+            escrever_linha(disciplina, quantidade, f"{media:.2f}", f"{mediana:.2f}", f"{desvio:.2f}", f"{aprovacao:.1f}")
+    return 0
+
+
+def comando_excluir(banco, args) -> int:
+    from banco import NOTA_EXCLUIDA
+    
+    if args.tipo == "aluno":
+        if bool(args.matriculas) == bool(args.busca):
+            print("Informe as matrículas ou --busca (um dos dois).", file=sys.stderr)
+            return 2
+        # UM ÚNICO DELETE; AS NOTAS SAEM JUNTO (ON DELETE CASCADE)
+        if args.busca:
+            excluidas = banco.excluir_alunos_busca(args.busca)
+        else:
+            excluidas = banco.excluir_alunos(args.matriculas)
+        if excluidas is None:
+            raise RuntimeError("não foi possível excluir os alunos")
+        encontradas = set(excluidas)
+        faltando = [matricula for matricula in args.matriculas if matricula not in encontradas]
+        total = len(excluidas)
+    else:
+        # O QUE FOI REALMENTE EXCLUÍDO VEM PELOS EVENTOS, PUBLICADOS SÓ DEPOIS DO COMMIT
+        excluidos = []
+        banco.inscrever(lambda evento: excluidos.append(evento) if evento.tipo == NOTA_EXCLUIDA else None)
+        if not banco.excluir_nota(args.disciplina, args.matricula):
+            raise RuntimeError(f"não foi possível excluir a nota de {args.matricula}")
+        faltando = [] if excluidos else [f"{args.matricula} / {args.disciplina}"]
+        total = len(excluidos)
+    
+    for item in faltando:
+        print(f"{item}: não encontrado", file=sys.stderr)
+    print(f"{total} excluído(s)")
+    return 1 if faltando else 0
+
+
+def mostrar_progresso_copia(feitas: int, total: int):
+    if sys.stderr.isatty():
+        print(f"\r{feitas}/{total} páginas", end="", file=sys.stderr, flush=True)
+
+
+def comando_copiar(banco, args) -> int:
+    from replicacao import copiar_banco
+    
+    paginas = copiar_banco(args.banco, args.destino, progresso=mostrar_progresso_copia)
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    print(f"{paginas} páginas copiadas para {args.destino}")
+    return 0
+
+
+def comando_sincronizar(banco, args) -> int:
+    from replicacao import sincronizar_banco
+    
+    # NA PRIMEIRA VEZ A RÉPLICA É UMA CÓPIA COMPLETA
+    nova = not os.path.exists(args.replica)
+    alteracoes = sincronizar_banco(args.banco, args.replica)
+    if nova:
+        print(f"réplica criada em {args.replica}")
+    else:
+        print(f"{alteracoes} alterações aplicadas em {args.replica}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    
+    import sqlite3
+    from banco import Banco
+    
+    banco = None
+    try:
+        # SEM CACHE DE LEITURAS: CADA EXECUÇÃO FAZ POUCAS CONSULTAS E TERMINA
+        opcoes = {"tamanho_cache": 0}
+        if args.perfil:
+            opcoes["perfil"] = args.perfil
+        if args.diagnostico:
+            from instrumentacao import Instrumentacao
+            opcoes["instrumentacao"] = Instrumentacao()
+        banco = Banco(args.banco, **opcoes)
+        return args.funcao(banco, args)
+    except BrokenPipeError:
+        # A SAÍDA FOI FECHADA ANTES DO FIM (EX.: "| head"): NÃO É ERRO
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError, RuntimeError, sqlite3.Error) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if banco is not None:
+            if banco.instrumentacao is not None:
+                print(banco.instrumentacao.relatorio(), file=sys.stderr)
+            banco.fechar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# CÓPIAS DE SEGURANÇA E RÉPLICAS DO BANCO, FEITAS COM O PROGRAMA ABERTO:
+#
+#     copiar_banco("notas_alunos.db", "backup/notas.db", progresso=lambda feitas, total: print(feitas, "de", total))
+#     sincronizar_banco("notas_alunos.db", "replica.db")
+#
+# copiar_banco USA A API DE BACKUP DO SQLITE EM PASSOS DE POUCAS PÁGINAS, NUMA CONEXÃO PRÓPRIA
+# SÓ DE LEITURA. NO WAL A CÓPIA INTEIRA SAI DE UMA MESMA TRANSAÇÃO DE LEITURA: É UMA FOTO
+# CONSISTENTE DO BANCO E QUEM ESTÁ GRAVANDO (A JANELA, O SERVIDOR) NÃO ESPERA POR ELA.
+# sincronizar_banco LEVA À RÉPLICA SÓ O QUE MUDOU DESDE A ÚLTIMA VEZ, PELO DIÁRIO DE ALTERAÇÕES
+# (TABELA diario, PREENCHIDA POR GATILHOS EM alunos E notas). A RÉPLICA É SÓ PARA LEITURA E
+# CÓPIA: O QUE FOR GRAVADO DIRETO NELA PODE SER SOBRESCRITO PELA ORIGEM
+import os
+import sqlite3
+from typing import Callable, Optional
+
+from banco import Banco
+
+# PÁGINAS COPIADAS POR PASSO (4 MB COM PÁGINAS DE 4 KB): ENTRE UM PASSO E OUTRO O ARQUIVO FICA LIVRE
+PAGINAS_POR_PASSO = 1024
+
+
+def copiar_banco(origem: str, destino: str, paginas: int = PAGINAS_POR_PASSO,
+                 progresso: Optional[Callable[[int, int], None]] = None) -> int:
+    # COPIA origem PARA destino (SUBSTITUINDO O QUE HOUVER LÁ) E DEVOLVE QUANTAS PÁGINAS FORAM
+    # COPIADAS. progresso(FEITAS, TOTAL) É CHAMADO A CADA PASSO. A CÓPIA JÁ SAI COMO RÉPLICA DA
+    # ORIGEM, PRONTA PARA sincronizar_banco
+    if os.path.exists(destino) and os.path.samefile(origem, destino):
+        raise ValueError("a cópia precisa ser um arquivo diferente do banco")
+    
+    banco = Banco(origem, tamanho_cache=0, somente_leitura=True)
+    try:
+        banco.cursor.execute("PRAGMA journal_mode")
+        if banco.cursor.fetchone()[0] == "wal":
+            # A LEITURA SEGURA A FOTO ATÉ O FIM. SEM WAL ELA TRAVARIA AS ESCRITAS DURANTE A CÓPIA
+            # TODA; AÍ CADA PASSO LÊ SOZINHO E O SQLITE RECOMEÇA A CÓPIA SE O ARQUIVO MUDAR NO MEIO
+            banco.cursor.execute("BEGIN")
+            banco.identificador()
+        
+        total = 0
+        
+        def avisar(status: int, restantes: int, paginas_total: int):
+            nonlocal total
+            total = paginas_total
+            if progresso is not None:
+                progresso(paginas_total - restantes, paginas_total)
+        
+        copia = sqlite3.connect(destino)
+        try:
+            banco.conexao.backup(copia, pages=paginas, progress=avisar)
+        finally:
+            copia.close()
+    finally:
+        banco.fechar()
+    
+    # O DIÁRIO COPIADO DIZ ATÉ ONDE A CÓPIA CHEGOU, MESMO QUE O SQLITE TENHA RECOMEÇADO NO MEIO
+    replica = Banco(destino, tamanho_cache=0)
+    try:
+        if not replica.registrar_copia(replica.identificador(), replica.ultima_alteracao()):
+            raise RuntimeError(f"não foi possível preparar a cópia {destino}")
+    finally:
+        replica.fechar()
+    return total
+
+
+def sincronizar_banco(origem: str, destino: str) -> int:
+    # APLICA EM destino AS ALTERAÇÕES DE origem DESDE A ÚLTIMA SINCRONIZAÇÃO, NUM ÚNICO COMMIT,
+    # E DEVOLVE QUANTAS LINHAS (ALUNOS E NOTAS) MUDARAM. SE destino NÃO EXISTE, ELE É CRIADO COMO
+    # CÓPIA COMPLETA (copiar_banco) E O RETORNO É 0
+    if not os.path.exists(destino):
+        copiar_banco(origem, destino)
+        return 0
+    
+    fonte = Banco(origem, tamanho_cache=0, somente_leitura=True)
+    try:
+        replica = Banco(destino, tamanho_cache=0)
+        try:
+            identificador = fonte.identificador()
+            ultimo = replica.posicao_sincronizacao(identificador)
+            if ultimo is None:
+                raise ValueError(f"{destino} não é uma réplica de {origem}; crie uma cópia nova")
+            
+            novo, alunos, notas = fonte.alteracoes_desde(ultimo)
+            if novo == ultimo:
+                return 0
+            if not replica.aplicar_alteracoes(identificador, novo, alunos, notas):
+                raise RuntimeError(f"não foi possível aplicar as alterações em {destino}")
+            return len(alunos) + len(notas)
+        finally:
+            replica.fechar()
+    finally:
+        fonte.fechar()
@@ -0,0 +1,420 @@
+# SERVIDOR HTTP/JSON DO SISTEMA DE NOTAS, PARA VÁRIAS MÁQUINAS USAREM O MESMO BANCO (SEM tkinter):
+#
+#     python -m servidor --banco notas_alunos.db --host 0.0.0.0 --porta 8765 --token segredo
+#     python alunos_notas.py --servidor http://servidor:8765 --token segredo
+#
+# ROTAS (RESPOSTAS SEMPRE EM JSON, ERROS COMO {"erro": "..."}):
+#
+#     GET  /api                     MÉTODOS DISPONÍVEIS, SEPARADOS EM LEITURA E ESCRITA
+#     POST /api/<método>            {"args": [...], "kwargs": {...}} -> {"resultado": ...}
+#     GET  /eventos?desde=N&espera=S  EVENTOS DEPOIS DO NÚMERO N, ESPERANDO ATÉ S SEGUNDOS POR ELES
+#     GET  /estado                  CONEXÕES ABERTAS, ESCRITAS E COMMITS FEITOS
+#
+# <método> É O NOME DE UM MÉTODO DO Banco (buscar_alunos, cadastrar_nota, estatisticas_disciplinas...).
+# UM ÚNICO LAÇO asyncio ATENDE TODOS OS CLIENTES; AS LEITURAS RODAM NUM GRUPO DE CONEXÕES SOMENTE
+# LEITURA, EM PARALELO, E AS ESCRITAS NUMA ÚNICA CONEXÃO QUE JUNTA TODAS AS QUE CHEGARAM ENQUANTO
+# O COMMIT ANTERIOR GRAVAVA NUM SÓ COMMIT (UM fsync PARA O LOTE INTEIRO)
+import argparse
+import asyncio
+import hmac
+import json
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from banco import Banco, Evento, ResultadoImportacao, PERFIL_PADRAO
+
+PORTA_PADRAO = 8765
+# CONEXÕES SOMENTE LEITURA (CADA UMA COM A SUA THREAD)
+LEITORES_PADRAO = 4
+# MÁXIMO DE ESCRITAS NUM MESMO COMMIT
+MAXIMO_LOTE_ESCRITA = 500
+# MAIOR CORPO DE PEDIDO ACEITO (IMPORTAÇÕES GRANDES CHEGAM INTEIRAS NUM PEDIDO)
+MAXIMO_CORPO = 64 * 1024 * 1024
+# EVENTOS GUARDADOS PARA OS CLIENTES BUSCAREM; QUEM FICAR MAIS ATRASADO QUE ISSO RECARREGA TUDO
+MAXIMO_EVENTOS = 10000
+# MAIOR ESPERA DE /eventos, EM SEGUNDOS
+ESPERA_MAXIMA_EVENTOS = 60.0
+# SEGUNDOS SEM NENHUM PEDIDO ATÉ O SERVIDOR FECHAR A CONEXÃO (O CLIENTE REABRE SOZINHO)
+TEMPO_OCIOSO = 120.0
+
+METODOS_LEITURA = frozenset({
+    "buscar_aluno", "listar_alunos", "contar_alunos", "listar_alunos_pagina", "chave_aluno_posicao",
+    "buscar_alunos", "buscar_notas_aluno", "listar_notas_disciplina", "listar_disciplinas", "media_aluno",
+    "estatisticas_disciplinas", "classificacao_alunos", "faixas_matriculas", "verificar_planos",
+})
+METODOS_ESCRITA = frozenset({
+    "cadastrar_aluno", "cadastrar_nota", "salvar_notas", "excluir_aluno", "excluir_nota",
+    "excluir_alunos", "excluir_alunos_busca", "importar_alunos", "importar_notas",
+})
+
+_MOTIVOS = {
+    200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 501: "Not Implemented",
+}
+
+
+class ErroHttp(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class PedidoHttp(NamedTuple):
+    metodo: str
+    caminho: str
+    consulta: Dict[str, List[str]]
+    cabecalhos: Dict[str, str]
+    corpo: bytes
+    manter_conexao: bool
+
+
+class _Escrita(NamedTuple):
+    metodo: str
+    args: list
+    kwargs: dict
+    futuro: "asyncio.Future"
+
+
+async def ler_pedido(leitor: asyncio.StreamReader) -> Optional[PedidoHttp]:
+    # LÊ UM PEDIDO HTTP/1.1 COMPLETO; None QUANDO O CLIENTE FECHOU A CONEXÃO ENTRE PEDIDOS
+    try:
+        linha = await leitor.readline()
+        if not linha:
+            return None
+        partes = linha.decode("latin-1").split()
+        if len(partes) != 3 or not partes[2].startswith("HTTP/"):
+            raise ErroHttp(400, "linha de pedido inválida")
+        metodo, alvo, versao = partes
+        
+        cabecalhos: Dict[str, str] = {}
+        while True:
+            linha = await leitor.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            nome, separador, valor = linha.decode("latin-1").partition(":")
+            if not separador:
+                raise ErroHttp(400, "cabeçalho inválido")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+    except ValueError:
+        # LINHA MAIOR QUE O LIMITE DO StreamReader
+        raise ErroHttp(400, "linha grande demais")
+    
+    if "transfer-encoding" in cabecalhos:
+        raise ErroHttp(501, "use Content-Length em vez de Transfer-Encoding")
+    try:
+        tamanho = int(cabecalhos.get("content-length") or 0)
+    except ValueError:
+        raise ErroHttp(400, "Content-Length inválido")
+    if tamanho > MAXIMO_CORPO:
+        raise ErroHttp(413, f"corpo maior que {MAXIMO_CORPO} bytes")
+    corpo = await leitor.readexactly(tamanho) if tamanho > 0 else b""
+    
+    conexao = cabecalhos.get("connection", "").lower()
+    manter = conexao == "keep-alive" if versao == "HTTP/1.0" else conexao != "close"
+    url = urlsplit(alvo)
+    return PedidoHttp(metodo.upper(), url.path, parse_qs(url.query), cabecalhos, corpo, manter)
+
+
+def montar_resposta(status: int, dados: Any, manter_conexao: bool = True) -> bytes:
+    corpo = json.dumps(dados, ensure_ascii=False, default=_serializar).encode("utf-8")
+    cabecalho = (
+        f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(corpo)}\r\n"
+        f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n"
+    )
+    return cabecalho.encode("latin-1") + corpo
+
+
+def _serializar(valor: Any) -> Any:
+    # TIPOS DO banco QUE O json NÃO CONHECE (TUPLAS JÁ VIRAM LISTAS SOZINHAS)
+    if isinstance(valor, ResultadoImportacao):
+        return {"inseridos": valor.inseridos, "rejeitados": valor.rejeitados, "erro": valor.erro}
+    raise TypeError(f"{type(valor).__name__} não é serializável")
+
+
+class _Conexao:
+    # UM Banco E A ÚNICA THREAD QUE PODE USÁ-LO (O sqlite3 NÃO DEIXA UMA CONEXÃO TROCAR DE THREAD)
+    def __init__(self, fabrica: Callable[[], Banco], nome: str):
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix=nome)
+        self.banco: Banco = self.executor.submit(fabrica).result()
+    
+    async def executar(self, funcao: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, funcao, self.banco, *args)
+    
+    def fechar(self):
+        self.executor.submit(self.banco.fechar).result()
+        self.executor.shutdown()
+
+
+def _executar_lote(banco: Banco, lote: List[_Escrita]) -> List[Any]:
+    # RODA NA THREAD DO ESCRITOR: O LOTE INTEIRO NUM COMMIT, CADA ESCRITA NO SEU SAVEPOINT
+    # (transacao() ANINHADA), ENTÃO UMA ESCRITA RECUSADA NÃO DESFAZ AS OUTRAS
+    resultados: List[Any] = []
+    try:
+        with banco.transacao():
+            for escrita in lote:
+                try:
+                    resultados.append(getattr(banco, escrita.metodo)(*escrita.args, **escrita.kwargs))
+                except Exception as e:
+                    resultados.append(e)
+    except Exception as e:
+        # O COMMIT FALHOU: NADA DO LOTE FOI GRAVADO
+        return [e] * len(lote)
+    return resultados
+
+
+class ServidorNotas:
+    def __init__(self, arquivo_db: str = "notas_alunos.db", leitores: int = LEITORES_PADRAO,
+                 perfil: str = PERFIL_PADRAO, token: Optional[str] = None):
+        self.arquivo_db = arquivo_db
+        self.quantidade_leitores = max(1, leitores)
+        self.perfil = perfil
+        self.token = token
+        
+        self.escritor: Optional[_Conexao] = None
+        self.leitores: List[_Conexao] = []
+        self.livres: "asyncio.Queue[_Conexao]" = asyncio.Queue()
+        self.escritas: "asyncio.Queue[Optional[_Escrita]]" = asyncio.Queue()
+        self.tarefa_escritor: Optional[asyncio.Task] = None
+        self.servidor: Optional[asyncio.AbstractServer] = None
+        
+        # EVENTOS PUBLICADOS PELO ESCRITOR, NUMERADOS EM SEQUÊNCIA; novos_eventos É TROCADO A CADA EVENTO
+        self.eventos: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=MAXIMO_EVENTOS)
+        self.ultimo_evento = 0
+        self.novos_eventos = asyncio.Event()
+        
+        # CONTADORES PARA /estado
+        self.conexoes = 0
+        self.escritas_feitas = 0
+        self.commits = 0
+    
+    async def iniciar(self, host: str = "127.0.0.1", porta: int = PORTA_PADRAO):
+        loop = asyncio.get_running_loop()
+        # O ESCRITOR ABRE PRIMEIRO: ELE CRIA O ARQUIVO E APLICA AS MIGRAÇÕES QUE OS LEITORES (mode=ro) NÃO PODEM
+        self.escritor = await loop.run_in_executor(
+            None, _Conexao, lambda: Banco(self.arquivo_db, perfil=self.perfil), "escritor"
+        )
+        self.escritor.banco.inscrever(lambda evento: loop.call_soon_threadsafe(self._guardar_evento, evento))
+        for numero in range(self.quantidade_leitores):
+            leitor = await loop.run_in_executor(
+                None, _Conexao,
+                lambda: Banco(self.arquivo_db, perfil=self.perfil, somente_leitura=True), f"leitor_{numero}"
+            )
+            self.leitores.append(leitor)
+            self.livres.put_nowait(leitor)
+        
+        self.tarefa_escritor = asyncio.create_task(self._escrever())
+        # backlog ALTO: CENTENAS DE CLIENTES PODEM CONECTAR NO MESMO INSTANTE
+        self.servidor = await asyncio.start_server(self._atender, host, porta, backlog=1024)
+    
+    def enderecos(self) -> List[Tuple[str, int]]:
+        return [socket.getsockname()[:2] for socket in self.servidor.sockets] if self.servidor else []
+    
+    async def servir(self):
+        async with self.servidor:
+            await self.servidor.serve_forever()
+    
+    async def fechar(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        if self.tarefa_escritor is not None:
+            # AS ESCRITAS JÁ ENFILEIRADAS SÃO GRAVADAS ANTES DE FECHAR
+            self.escritas.put_nowait(None)
+            await self.tarefa_escritor
+        loop = asyncio.get_running_loop()
+        for conexao in self.leitores + ([self.escritor] if self.escritor else []):
+            await loop.run_in_executor(None, conexao.fechar)
+        self.leitores = []
+        self.escritor = None
+    
+    def _guardar_evento(self, evento: Evento):
+        self.ultimo_evento += 1
+        self.eventos.append((self.ultimo_evento, evento._asdict()))
+        self.novos_eventos.set()
+        self.novos_eventos = asyncio.Event()
+    
+    async def _escrever(self):
+        # ÚNICO ESCRITOR: ENQUANTO UM LOTE GRAVA, AS NOVAS ESCRITAS SE ACUMULAM NA FILA E VIRAM O PRÓXIMO
+        while True:
+            primeira = await self.escritas.get()
+            if primeira is None:
+                return
+            lote = [primeira]
+            fim = False
+            while len(lote) < MAXIMO_LOTE_ESCRITA:
+                try:
+                    escrita = self.escritas.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if escrita is None:
+                    fim = True
+                    break
+                lote.append(escrita)
+            
+            try:
+                resultados = await self.escritor.executar(_executar_lote, lote)
+            except Exception as e:
+                resultados = [e] * len(lote)
+            self.escritas_feitas += len(lote)
+            self.commits += 1
+            
+            for escrita, resultado in zip(lote, resultados):
+                if escrita.futuro.done():
+                    continue
+                if isinstance(resultado, Exception):
+                    escrita.futuro.set_exception(resultado)
+                else:
+                    escrita.futuro.set_result(resultado)
+            if fim:
+                return
+    
+    async def chamar(self, metodo: str, args: list, kwargs: dict) -> Any:
+        if metodo in METODOS_ESCRITA:
+            futuro = asyncio.get_running_loop().create_future()
+            self.escritas.put_nowait(_Escrita(metodo, args, kwargs, futuro))
+            return await futuro
+        
+        leitor = await self.livres.get()
+        try:
+            return await leitor.executar(lambda banco: getattr(banco, metodo)(*args, **kwargs))
+        finally:
+            self.livres.put_nowait(leitor)
+    
+    async def buscar_eventos(self, desde: int, espera: float) -> Dict[str, Any]:
+        # desde < 0: SÓ INFORMA O NÚMERO ATUAL, PARA O CLIENTE COMEÇAR A ACOMPANHAR DALI
+        if desde < 0:
+            return {"ultimo": self.ultimo_evento, "eventos": []}
+        if desde == self.ultimo_evento and espera > 0:
+            try:
+                await asyncio.wait_for(self.novos_eventos.wait(), min(espera, ESPERA_MAXIMA_EVENTOS))
+            except asyncio.TimeoutError:
+                pass
+        
+        primeiro = self.eventos[0][0] if self.eventos else self.ultimo_evento + 1
+        if desde > self.ultimo_evento or desde < primeiro - 1:
+            # EVENTOS PERDIDOS (CLIENTE ATRASADO DEMAIS OU SERVIDOR REINICIADO): O CLIENTE RECARREGA TUDO
+            return {"ultimo": self.ultimo_evento, "eventos": [], "recarregar": True}
+        return {
+            "ultimo": self.ultimo_evento,
+            "eventos": [evento for numero, evento in self.eventos if numero > desde],
+        }
+    
+    async def responder(self, pedido: PedidoHttp) -> Tuple[int, Any]:
+        if self.token is not None:
+            autorizacao = pedido.cabecalhos.get("authorization", "")
+            if not hmac.compare_digest(autorizacao.encode(), f"Bearer {self.token}".encode()):
+                raise ErroHttp(401, "token ausente ou inválido")
+        
+        if pedido.caminho == "/api":
+            return 200, {"leitura": sorted(METODOS_LEITURA), "escrita": sorted(METODOS_ESCRITA)}
+        if pedido.caminho == "/estado":
+            return 200, {
+                "conexoes": self.conexoes, "leitores": len(self.leitores), "escritas": self.escritas_feitas,
+                "commits": self.commits, "fila_escrita": self.escritas.qsize(), "ultimo_evento": self.ultimo_evento,
+            }
+        if pedido.caminho == "/eventos":
+            try:
+                desde = int(pedido.consulta.get("desde", ["-1"])[0])
+                espera = float(pedido.consulta.get("espera", ["0"])[0])
+            except ValueError:
+                raise ErroHttp(400, "desde e espera devem ser números")
+            return 200, await self.buscar_eventos(desde, espera)
+        
+        if not pedido.caminho.startswith("/api/"):
+            raise ErroHttp(404, f"rota desconhecida: {pedido.caminho}")
+        metodo = pedido.caminho[len("/api/"):]
+        if metodo not in METODOS_LEITURA and metodo not in METODOS_ESCRITA:
+            raise ErroHttp(404, f"método desconhecido: {metodo}")
+        if pedido.metodo != "POST":
+            raise ErroHttp(405, "use POST")
+        
+        try:
+            dados = json.loads(pedido.corpo or b"{}")
+        except ValueError as e:
+            raise ErroHttp(400, f"JSON inválido: {e}")
+        args = dados.get("args", []) if isinstance(dados, dict) else None
+        kwargs = dados.get("kwargs", {}) if isinstance(dados, dict) else None
+        if not isinstance(args, list) or not isinstance(kwargs, dict):
+            raise ErroHttp(400, 'o corpo deve ser {"args": [...], "kwargs": {...}}')
+        
+        try:
+            return 200, {"resultado": await self.chamar(metodo, args, kwargs)}
+        except TypeError as e:
+            raise ErroHttp(400, f"argumentos inválidos para {metodo}: {e}")
+    
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        # UMA CONEXÃO DE CLIENTE, COM VÁRIOS PEDIDOS EM SEQUÊNCIA (keep-alive)
+        self.conexoes += 1
+        try:
+            while True:
+                try:
+                    pedido = await asyncio.wait_for(ler_pedido(leitor), TEMPO_OCIOSO)
+                except asyncio.TimeoutError:
+                    return
+                except ErroHttp as e:
+                    escritor.write(montar_resposta(e.status, {"erro": str(e)}, False))
+                    await escritor.drain()
+                    return
+                if pedido is None:
+                    return
+                
+                try:
+                    status, dados = await self.responder(pedido)
+                except ErroHttp as e:
+                    status, dados = e.status, {"erro": str(e)}
+                except Exception as e:
+                    print(f"Erro ao atender {pedido.metodo} {pedido.caminho}: {e}", file=sys.stderr)
+                    status, dados = 500, {"erro": str(e)}
+                escritor.write(montar_resposta(status, dados, pedido.manter_conexao))
+                await escritor.drain()
+                if not pedido.manter_conexao:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # SERVIDOR FECHANDO (Ctrl+C): A CONEXÃO SÓ TERMINA, SEM ERRO NO LOG
+            pass
+        finally:
+            self.conexoes -= 1
+            escritor.close()
+
+
+async def _servir(args):
+    servidor = ServidorNotas(args.banco, args.leitores, args.perfil, args.token)
+    await servidor.iniciar(args.host, args.porta)
+    for host, porta in servidor.enderecos():
+        print(f"Servindo {args.banco} em http://{host}:{porta} ({args.leitores} leitores)", file=sys.stderr)
+    try:
+        await servidor.servir()
+    finally:
+        await servidor.fechar()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="servidor", description="Servidor HTTP/JSON do banco de notas.")
+    parser.add_argument("--banco", default="notas_alunos.db", help="arquivo do banco (padrão: notas_alunos.db)")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço (padrão: 127.0.0.1; 0.0.0.0 para a rede)")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help=f"porta (padrão: {PORTA_PADRAO})")
+    parser.add_argument("--leitores", type=int, default=LEITORES_PADRAO,
+                        help=f"conexões de leitura em paralelo (padrão: {LEITORES_PADRAO})")
+    parser.add_argument("--perfil", default=PERFIL_PADRAO, help="perfil de conexão: seguro (padrão), rapido ou compativel")
+    parser.add_argument("--token", help="exige o cabeçalho 'Authorization: Bearer TOKEN' em todo pedido")
+    args = parser.parse_args(argv)
+    
+    try:
+        asyncio.run(_servir(args))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())